@@ -0,0 +1,301 @@
+# Plotting Benchmarks
+#
+# Headless (Agg) timings of standard_figure operations across grid sizes
+# and data sizes, with peak memory, written as JSON to compare versions.
+# Features are detected first, so the suite also runs against older
+# versions; benchmarks of missing features are recorded as unsupported.
+#
+# python benchmarks/benchmark_plot.py --output results.json
+# python benchmarks/benchmark_plot.py --compare results.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import inspect
+import argparse
+import functools
+import platform
+import datetime
+import tempfile
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+import sciscripttools
+from sciscripttools import standard_font, standard_figure
+
+# feature detection -----------------------------------------------------------
+
+try:
+    from sciscripttools.latex import latex_available
+except ImportError:
+    def latex_available():
+        return shutil.which("latex") is not None
+
+def has_parameter(function, name):
+    try:
+        return name in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+def has_method(name):
+    def supported():
+        return hasattr(standard_figure, name)
+    return supported
+
+def set_standard_font(usetex):
+    if has_parameter(standard_font.__init__, "draft"):
+        standard_font(font_size=10.95, draft=not usetex)
+    else:
+        # older versions always set LaTeX
+        standard_font(font_size=10.95)
+        matplotlib.rcParams["text.usetex"] = usetex
+    return 0
+
+@functools.lru_cache(maxsize=None)
+def standard_font_supported():
+    # older versions may set rcParams the installed matplotlib rejects
+    try:
+        with matplotlib.rc_context():
+            set_standard_font(False)
+    except ValueError as error:
+        print("standard_font unsupported: {}".format(error))
+        return False
+    return True
+
+# benchmarks ------------------------------------------------------------------
+#
+# each benchmark is setup(n, size) -> state, and run(state), only run is timed;
+# n is the grid size (n x n axes) and size the number of data points per axes
+
+def new_figure(n, size=0):
+    fig, axes = plt.subplots(n, n, squeeze=False)
+    axes = axes.flatten()
+    if size > 0:
+        x = np.linspace(1, 10, size)
+        y = x + np.random.default_rng(0).random(size)
+        for ax in axes:
+            ax.plot(x, y)
+    return fig, axes
+
+def setup_figure(n, size):
+    return new_figure(n, size)
+
+def setup_standard(n, size):
+    fig, axes = new_figure(n, size)
+    return fig, axes, standard_figure(fig, axes)
+
+def setup_loglog(n, size):
+    fig, axes = new_figure(n, size)
+    for ax in axes:
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+    return fig, axes, standard_figure(fig, axes)
+
+def run_standard_figure(state):
+    fig, axes = state
+    standard_figure(fig, axes)
+
+def run_standard_font(state):
+    set_standard_font(matplotlib.rcParams["text.usetex"])
+
+def run_subplot_labels(state):
+    fig, axes, sf = state
+    sf.add_subplot_labels()
+
+def run_schematic_arrow_axis(state):
+    fig, axes, sf = state
+    for ax in axes:
+        sf.schematic_arrow_axis(ax)
+
+def run_schematic_arrow_axes(state):
+    fig, axes, sf = state
+    sf.schematic_arrow_axes()
+
+def run_vector_arrows_2D(state):
+    fig, axes, sf = state
+    for ax in axes:
+        sf.vector_arrows_2D(ax, length=1.0)
+
+def run_loglog_ticks(state):
+    fig, axes, sf = state
+    sf.loglog_ticks()
+
+def run_draw(state):
+    fig, axes, sf = state
+    fig.canvas.draw()
+
+def run_savefig_png(state):
+    fig, axes, sf = state
+    with tempfile.TemporaryDirectory() as directory:
+        fig.savefig(os.path.join(directory, "figure.png"), dpi=150)
+
+def run_savefig_pdf(state):
+    fig, axes, sf = state
+    with tempfile.TemporaryDirectory() as directory:
+        fig.savefig(os.path.join(directory, "figure.pdf"))
+
+# name : (setup, run, vary data size, supported)
+# supported is None, or a function which is False when the version being
+# benchmarked does not have the feature
+benchmarks = {
+    "standard_figure" : (setup_figure, run_standard_figure, False, None),
+    "standard_font" : (setup_figure, run_standard_font, False,
+                                        standard_font_supported),
+    "add_subplot_labels" : (setup_standard, run_subplot_labels, False,
+                                        has_method("add_subplot_labels")),
+    "schematic_arrow_axis" : (setup_standard, run_schematic_arrow_axis, False,
+                                        has_method("schematic_arrow_axis")),
+    "schematic_arrow_axes" : (setup_standard, run_schematic_arrow_axes, False,
+                                        has_method("schematic_arrow_axes")),
+    "vector_arrows_2D" : (setup_standard, run_vector_arrows_2D, False,
+                                        has_method("vector_arrows_2D")),
+    "loglog_ticks" : (setup_loglog, run_loglog_ticks, False,
+                                        has_method("loglog_ticks")),
+    "draw" : (setup_standard, run_draw, True, None),
+    "savefig_png" : (setup_standard, run_savefig_png, True, None),
+    "savefig_pdf" : (setup_standard, run_savefig_pdf, True, None),
+}
+
+# running ---------------------------------------------------------------------
+
+def time_benchmark(setup, run, n, size, repeat):
+    """
+    Times of each repeat, and the peak memory of one extra traced run.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup(n, size)
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+        plt.close("all")
+
+    # memory tracing slows python down, so trace a separate run
+    state = setup(n, size)
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close("all")
+
+    return times, peak
+
+def run_benchmarks(names, grids, sizes, repeat, usetex_modes):
+    results = []
+    for usetex in usetex_modes:
+        if standard_font_supported():
+            set_standard_font(usetex)
+        else:
+            matplotlib.rcParams["text.usetex"] = usetex
+        for name in names:
+            setup, run, vary_size, supported = benchmarks[name]
+            for n in grids:
+                for size in (sizes if vary_size else [sizes[0]]):
+                    if supported is not None and not supported():
+                        results.append({"name" : name, "grid" : n,
+                                        "size" : size, "usetex" : usetex,
+                                        "unsupported" : True})
+                        print("{:<22} usetex={:<5} grid={:>2}x{:<2} size={:<8} "
+                              "unsupported".format(name, str(usetex), n, n,
+                                                                    size))
+                        continue
+                    times, peak = time_benchmark(setup, run, n, size, repeat)
+                    result = {"name" : name, "grid" : n, "size" : size,
+                              "usetex" : usetex, "times" : times,
+                              "min" : min(times),
+                              "median" : float(np.median(times)),
+                              "peak_memory" : peak}
+                    results.append(result)
+                    print("{:<22} usetex={:<5} grid={:>2}x{:<2} size={:<8} "
+                          "min {:8.4f} s  median {:8.4f} s  peak {:8.2f} MB".format(
+                              name, str(usetex), n, n, size, result["min"],
+                              result["median"], peak / 2**20))
+    return results
+
+def metadata():
+    return {
+        "sciscripttools" : getattr(sciscripttools, "__version__", None),
+        "matplotlib" : matplotlib.__version__,
+        "numpy" : np.__version__,
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "processor" : platform.processor(),
+        "date" : datetime.datetime.now().isoformat(timespec="seconds"),
+        "latex" : latex_available(),
+    }
+
+def result_key(result):
+    return (result["name"], result["grid"], result["size"], result["usetex"])
+
+def compare(results, filename):
+    """
+    Print the ratio of the new minimum times to those in a previous run.
+    Benchmarks unsupported by either run are listed without a ratio.
+    """
+    with open(filename) as f:
+        previous = {result_key(r) : r for r in json.load(f)["results"]}
+
+    print("\nCompared with {} (new / old minimum time):".format(filename))
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        if result.get("unsupported") or old.get("unsupported"):
+            print("{:<22} usetex={:<5} grid={:>2}x{:<2} size={:<8} "
+                  "unsupported".format(result["name"], str(result["usetex"]),
+                                result["grid"], result["grid"], result["size"]))
+            continue
+        ratio = result["min"] / old["min"] if old["min"] > 0 else float("nan")
+        print("{:<22} usetex={:<5} grid={:>2}x{:<2} size={:<8} {:6.2f}x".format(
+                result["name"], str(result["usetex"]), result["grid"],
+                result["grid"], result["size"], ratio))
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+                description="Benchmark standard_figure operations (Agg).")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file for the results.")
+    parser.add_argument("--compare", default=None,
+                        help="JSON results of a previous run to compare with.")
+    parser.add_argument("--benchmarks", nargs="+", default=list(benchmarks),
+                        choices=list(benchmarks), metavar="NAME",
+                        help="Benchmarks to run, default all.")
+    parser.add_argument("--grids", nargs="+", type=int, default=[1, 4, 10],
+                        help="Grid sizes, n for n x n axes.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 100000],
+                        help="Data points per axes, for draw and savefig.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--usetex", choices=["auto", "on", "off"], default="auto",
+                        help="auto runs with and without LaTeX if it is available.")
+    args = parser.parse_args(argv)
+
+    if args.usetex == "off":
+        usetex_modes = [False]
+    elif args.usetex == "on":
+        if not latex_available():
+            print("LaTeX is not available.")
+            return 1
+        usetex_modes = [True]
+    else:
+        usetex_modes = [False, True] if latex_available() else [False]
+
+    results = run_benchmarks(args.benchmarks, args.grids, args.sizes,
+                             args.repeat, usetex_modes)
+
+    if args.compare is not None:
+        compare(results, args.compare)
+
+    with open(args.output, "w") as f:
+        json.dump({"meta" : metadata(), "results" : results}, f, indent=1)
+    print("\nResults written to {}.".format(args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,16 @@
+__version__ = "0.2.2"
+
 # Expose functions to top level of package
 from .generic import create_dictionary
 from .conversion import dictionary_to_arrays, dictionary_items_to_numpy_arrays
-from .io import load_data, load_item, load_dictionary, save_data
-from .plot import figure_parameters, standard_font, standard_figure, move_view
\ No newline at end of file
+from .io import load_data, load_item, load_dictionary, save_data, iter_data
+from .io import load_summary
+from .formats import format_handler, register_format
+from .reductions import key_statistics, key_histogram
+from .plot import figure_parameters, standard_font, standard_figure, standard_subplots, move_view
+from .plot import get_profile
+from .profiles import register_profile
+from .render import figure_job, render_figures
+from .latex import warm_up, set_tex_cache
+from .export import save_pdf_pages
+from .tracing import trace, span
@@ -0,0 +1,248 @@
+# View Animations
+#
+# Zoom / pan fly-through animations around move_view(): a path of view
+# windows computed as arrays, rendered frame by frame on a reused Agg
+# canvas (in parallel processes), with the PNG files compressed and
+# written by threads.
+
+import os
+import pickle
+import logging
+import concurrent.futures
+
+import numpy as np
+import matplotlib
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .latex import get_tex_cache
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def view_path(ax, points, widths, frames=100, heights=None,
+                                        maintain_aspect_ratio=True, ease=True):
+    """
+    Path of view windows through key frames, as arrays of axis limits.
+
+    The centre moves linearly between key frames and the width changes
+    geometrically, so zooming looks like a constant speed.
+
+    Parameters
+    ----------
+    ax : matplotlib axis
+        Single matplotlib axis, for the aspect ratio.
+    points : array, (number of key frames, 2)
+        Centre points [x, y] of the key frame views.
+    widths : float, array
+        Width of the key frame views.
+    frames : int
+        Total number of frames.
+    heights : None, float, array
+        Height of the key frame views. Default is the widths.
+    maintain_aspect_ratio : True, Bool
+        Retain the axis's current aspect ratio, as in move_view().
+    ease : True, Bool
+        Ease in and out of each key frame.
+
+    Returns
+    -------
+    limits : array, (frames, 4)
+        xmin, xmax, ymin, ymax of each frame.
+
+    Example
+    -------
+    limits = view_path(ax, [[0, 0], [5, 2]], [10, 0.1], frames=300)
+    """
+
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    keys = len(points)
+    widths = np.broadcast_to(np.asarray(widths, dtype=float), (keys,))
+    if heights is None:
+        heights = widths
+    heights = np.broadcast_to(np.asarray(heights, dtype=float), (keys,))
+
+    if np.any(widths <= 0) or np.any(heights <= 0):
+        raise Exception("View widths and heights need to be positive.")
+
+    # position of each frame between the key frames
+    if keys == 1:
+        segment = np.zeros(frames, dtype=np.int64)
+        t = np.zeros(frames)
+        points = np.concatenate([points, points])
+        widths = np.concatenate([widths, widths])
+        heights = np.concatenate([heights, heights])
+    else:
+        s = np.linspace(0, keys - 1, frames)
+        segment = np.minimum(np.floor(s).astype(np.int64), keys - 2)
+        t = s - segment
+
+    if ease:
+        t = t * t * (3.0 - 2.0 * t)
+
+    centres = points[segment] * (1.0 - t)[:, np.newaxis] \
+                + points[segment + 1] * t[:, np.newaxis]
+
+    def geometric(values):
+        log_values = np.log(values)
+        return np.exp(log_values[segment] * (1.0 - t)
+                            + log_values[segment + 1] * t)
+
+    width = geometric(widths)
+    height = geometric(heights)
+
+    if maintain_aspect_ratio == True:
+        xl1, xl2 = ax.get_xlim()
+        yl1, yl2 = ax.get_ylim()
+        axis_ratio = (np.abs(xl2 - xl1))/(np.abs(yl2 - yl1))
+        height = height / axis_ratio
+
+    return np.stack([centres[:, 0] - 0.5*width, centres[:, 0] + 0.5*width,
+                     centres[:, 1] - 0.5*height, centres[:, 1] + 0.5*height],
+                     axis=1)
+
+def write_png(filename, image, compress_level=1):
+    """
+    Write an RGBA image array to a PNG file. Run in the writer threads,
+    compression releases the GIL.
+    """
+    Image.fromarray(image, "RGBA").save(filename, compress_level=compress_level)
+    return filename
+
+def frame_filename(directory, name, i):
+    return os.path.join(directory, "{}_{:05d}.png".format(name, i))
+
+def draw_frames(fig, ax, limits, filenames, writers=2, compress_level=1):
+    """
+    Draw views of a figure on one Agg canvas, reused between frames, while
+    a pool of threads compresses and writes the PNG files.
+    """
+
+    canvas = FigureCanvasAgg(fig)
+
+    with concurrent.futures.ThreadPoolExecutor(writers) as executor:
+        pending = set()
+        for (xmin, xmax, ymin, ymax), filename in zip(limits, filenames):
+            ax.set_xlim(xmin, xmax)
+            ax.set_ylim(ymin, ymax)
+            canvas.draw()
+
+            # the buffer is reused by the next draw, so copy it
+            image = np.array(canvas.buffer_rgba(), copy=True)
+            pending.add(executor.submit(write_png, filename, image,
+                                                        compress_level))
+
+            # bound the number of frames held in memory
+            if len(pending) >= 2 * writers:
+                done, pending = concurrent.futures.wait(pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+
+        for future in concurrent.futures.as_completed(pending):
+            future.result()
+
+    return len(filenames)
+
+# the figure of each worker process, unpickled once
+_worker = {}
+
+def _initialise_worker(figure, axis_index, rc_params, tex_cache, compress_level):
+    import warnings
+    from .latex import set_tex_cache
+    rc_params.pop("backend", None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        matplotlib.rcParams.update(rc_params)
+    set_tex_cache(tex_cache)
+
+    fig = pickle.loads(figure)
+    _worker["fig"] = fig
+    _worker["ax"] = fig.axes[axis_index]
+    _worker["compress_level"] = compress_level
+
+def _draw_chunk(limits, filenames):
+    return draw_frames(_worker["fig"], _worker["ax"], limits, filenames,
+                        compress_level=_worker["compress_level"])
+
+def render_frames(fig, ax, limits, directory, name="frame", dpi=None,
+                                            workers=None, compress_level=1):
+    """
+    Render a sequence of views of a figure to numbered PNG files.
+
+    The figure is drawn for each frame on one Agg canvas, reused between
+    frames, so the figure is not set up again for each frame as with
+    savefig(), and rendered text (including LaTeX) is reused from the
+    matplotlib caches. The frames are compressed and written to disk by
+    threads while the next frame is drawn.
+
+    With workers, the figure is pickled once and the frames are split into
+    contiguous chunks, drawn by a pool of processes, each with its own copy
+    of the figure and canvas.
+
+    Parameters
+    ----------
+    fig : matplotlib figure
+    ax : matplotlib axis
+        Single matplotlib axis, whose view is moved.
+    limits : array, (frames, 4)
+        xmin, xmax, ymin, ymax of each frame, see view_path().
+    directory : str
+        Output directory, created if it does not exist.
+    name : str
+        Start of the filenames, e.g. frame_00000.png.
+    dpi : None, float
+        Resolution. Default is the figure dpi.
+    workers : None, int
+        Number of worker processes. Default draws in this process.
+    compress_level : int
+        PNG compression, 0 (none, fastest) to 9 (smallest).
+
+    Returns
+    -------
+    filenames : list
+        The frame filenames, in order.
+
+    Example
+    -------
+    limits = view_path(ax, [[0, 0], [5, 2]], [10, 0.1], frames=300)
+    render_frames(fig, ax, limits, "frames", workers=8)
+    # ffmpeg -i frames/frame_%05d.png movie.mp4
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    limits = np.asarray(limits, dtype=float).reshape(-1, 4)
+    filenames = [frame_filename(directory, name, i) for i in range(len(limits))]
+
+    # draw with Agg, without changing the figure's own canvas
+    original_canvas = fig.canvas
+    original_dpi = fig.dpi
+    original_limits = (ax.get_xlim(), ax.get_ylim())
+
+    if dpi is not None:
+        fig.set_dpi(dpi)
+
+    try:
+        if workers is None:
+            draw_frames(fig, ax, limits, filenames, compress_level=compress_level)
+        else:
+            figure = pickle.dumps(fig)
+            chunks = np.array_split(np.arange(len(limits)), workers)
+            with concurrent.futures.ProcessPoolExecutor(
+                        workers, initializer=_initialise_worker,
+                        initargs=(figure, fig.axes.index(ax),
+                                  dict(matplotlib.rcParams), get_tex_cache(),
+                                  compress_level)) as executor:
+                futures = [executor.submit(_draw_chunk, limits[chunk],
+                                           [filenames[i] for i in chunk])
+                           for chunk in chunks if len(chunk) > 0]
+                for future in futures:
+                    future.result()
+    finally:
+        fig.set_dpi(original_dpi)
+        ax.set_xlim(original_limits[0])
+        ax.set_ylim(original_limits[1])
+        fig.set_canvas(original_canvas)
+
+    logger.info("Rendered %d frames to %s.", len(filenames), directory)
+    return filenames
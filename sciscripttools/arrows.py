@@ -0,0 +1,284 @@
+# Batched Arrows
+#
+# Arrow geometry computed for many axes at once, drawn as one collection
+# of shafts and one collection of heads per figure, for the batched
+# schematic arrow methods of standard_figure.
+#
+# All geometry is in figure inches, so heads keep their shape whatever
+# the aspect ratio of each axes. It is computed when the figure is drawn,
+# from the axes positions and limits at that time, so the arrows follow
+# any later layout change (subplots_adjust, layout engines, resizing, new
+# limits).
+
+import logging
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def axes_boxes(fig, axes):
+    """
+    Position and size of axes in figure inches.
+
+    Parameters
+    ----------
+    fig : matplotlib figure
+    axes : list of matplotlib.axes
+
+    Returns
+    -------
+    x0, y0, width, height : array
+        Lower left corner, width and height of each axes, in inches.
+    """
+    fig_width, fig_height = fig.get_size_inches()
+    bounds = np.array([ax.get_position().bounds for ax in axes], dtype=float)
+    bounds = bounds.reshape(-1, 4)
+    return (bounds[:, 0] * fig_width, bounds[:, 1] * fig_height,
+            bounds[:, 2] * fig_width, bounds[:, 3] * fig_height)
+
+def axes_limits(axes):
+    """
+    x and y limits of axes.
+
+    Returns
+    -------
+    xmin, xmax, ymin, ymax : array
+    """
+    limits = np.array([ax.get_xlim() + ax.get_ylim() for ax in axes], dtype=float)
+    limits = limits.reshape(-1, 4)
+    return limits[:, 0], limits[:, 1], limits[:, 2], limits[:, 3]
+
+def arrow_geometry(starts, ends, head_widths, head_lengths):
+    """
+    Shaft segments and head triangles of arrows, computed together.
+
+    Parameters
+    ----------
+    starts : array, (n, 2)
+        Tail of each arrow.
+    ends : array, (n, 2)
+        Tip of each arrow, the head is included in the length.
+    head_widths : array, (n,)
+    head_lengths : array, (n,)
+
+    Returns
+    -------
+    shafts : array, (n, 2, 2)
+        Line segments from the tail to the base of the head.
+    heads : array, (n, 3, 2)
+        Triangles of the heads.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    head_widths = np.asarray(head_widths, dtype=float).reshape(-1, 1)
+    head_lengths = np.asarray(head_lengths, dtype=float).reshape(-1, 1)
+
+    vectors = ends - starts
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1]).reshape(-1, 1)
+    directions = vectors / np.where(lengths == 0, 1, lengths)
+    normals = np.stack([-directions[:, 1], directions[:, 0]], axis=1)
+
+    # the head is included in the arrow length
+    head_lengths = np.minimum(head_lengths, lengths)
+    bases = ends - directions * head_lengths
+
+    shafts = np.stack([starts, bases], axis=1)
+    heads = np.stack([bases + normals * head_widths / 2, ends,
+                      bases - normals * head_widths / 2], axis=1)
+
+    return shafts, heads
+
+class arrow_shafts(LineCollection):
+    """
+    Line collection of arrow shafts, with the segments computed from a
+    geometry function each time it is drawn.
+
+    Class Variables
+    ---------------
+    geometry : function
+        Returns (shafts, heads), see arrow_geometry().
+    """
+
+    def __init__(self, geometry, **kwargs):
+        self.geometry = geometry
+        super().__init__(geometry()[0], **kwargs)
+
+    def draw(self, renderer):
+        self.set_segments(self.geometry()[0])
+        super().draw(renderer)
+
+class arrow_heads(PolyCollection):
+    """
+    Polygon collection of arrow heads, with the triangles computed from a
+    geometry function each time it is drawn.
+
+    Class Variables
+    ---------------
+    geometry : function
+        Returns (shafts, heads), see arrow_geometry().
+    """
+
+    def __init__(self, geometry, **kwargs):
+        self.geometry = geometry
+        super().__init__(geometry()[1], **kwargs)
+
+    def draw(self, renderer):
+        self.set_verts(self.geometry()[1])
+        super().draw(renderer)
+
+def add_arrow_collections(fig, geometry, linewidth=0.5, colour="k"):
+    """
+    Add arrows to a figure as one line collection of shafts and one
+    polygon collection of heads, in figure inches.
+
+    Parameters
+    ----------
+    fig : matplotlib figure
+    geometry : function
+        Called without arguments when the figure is drawn, returns
+        (shafts, heads) in figure inches, see arrow_geometry().
+    linewidth : float
+    colour : str
+
+    Returns
+    -------
+    shafts, heads : arrow_shafts, arrow_heads
+    """
+    transform = fig.dpi_scale_trans
+
+    shaft_collection = arrow_shafts(geometry, colors=colour,
+                                    linewidths=linewidth,
+                                    transform=transform, clip_on=False)
+    head_collection = arrow_heads(geometry, facecolors=colour,
+                                  edgecolors=colour, linewidths=linewidth,
+                                  transform=transform, clip_on=False)
+
+    fig.add_artist(shaft_collection)
+    fig.add_artist(head_collection)
+
+    return shaft_collection, head_collection
+
+def axis_arrows(fig, axes, xaxis=True, yaxis=True, set_yaxis_zero=None,
+                                                                log=False):
+    """
+    Geometry of schematic axis arrows, along the bottom (or at
+    set_yaxis_zero) and left of every axes. See
+    standard_figure.schematic_arrow_axes().
+
+    Returns
+    -------
+    shafts, heads : array
+        See arrow_geometry().
+    """
+    x0, y0, width, height = axes_boxes(fig, axes)
+    xmin, xmax, ymin, ymax = axes_limits(axes)
+
+    # axes fraction of the x axis arrow
+    if set_yaxis_zero is None:
+        y_fraction = np.zeros(len(axes))
+    elif log:
+        y_fraction = (np.log(set_yaxis_zero) - np.log(ymin)) \
+                                    / (np.log(ymax) - np.log(ymin))
+    else:
+        y_fraction = (set_yaxis_zero - ymin) / (ymax - ymin)
+    y_fraction = np.broadcast_to(y_fraction, x0.shape)
+
+    # arrowhead width and length in inches, matching the single axis methods
+    if log:
+        x_head_width, x_head_length = 0.015 * height, 0.006 * width
+        y_head_width, y_head_length = 0.006 * width, 0.015 * height
+    else:
+        x_head_width, x_head_length = height / 70., width / 140.
+        y_head_width, y_head_length = height / 70., width / 140.
+
+    starts = []
+    ends = []
+    head_widths = []
+    head_lengths = []
+
+    if xaxis:
+        y_start = y0 + y_fraction * height
+        starts.append(np.stack([x0, y_start], axis=1))
+        ends.append(np.stack([x0 + width, y_start], axis=1))
+        head_widths.append(x_head_width)
+        head_lengths.append(x_head_length)
+
+    if yaxis:
+        starts.append(np.stack([x0, y0], axis=1))
+        ends.append(np.stack([x0, y0 + height], axis=1))
+        head_widths.append(y_head_width)
+        head_lengths.append(y_head_length)
+
+    if len(starts) == 0:
+        return np.empty((0, 2, 2)), np.empty((0, 3, 2))
+
+    return arrow_geometry(np.concatenate(starts), np.concatenate(ends),
+                          np.concatenate(head_widths),
+                          np.concatenate(head_lengths))
+
+def vector_bases(axes, x_offset=0.0, y_offset=0.0):
+    """
+    Base of the vector arrows of each axes, the bottom left corner plus
+    offsets, in data coordinates.
+
+    Returns
+    -------
+    bases : array, (n, 2)
+    """
+    xmin, xmax, ymin, ymax = axes_limits(axes)
+    return np.stack(np.broadcast_arrays(xmin + x_offset, ymin + y_offset),
+                                                                    axis=1)
+
+def vector_arrows(fig, axes, bases, xaxis=True, yaxis=True, length=5.0):
+    """
+    Geometry of small 2D vector arrows, from bases in data coordinates,
+    with a length in data units. Assumes linear axes.
+    See standard_figure.vector_arrows_2D_axes().
+
+    Returns
+    -------
+    shafts, heads : array
+        See arrow_geometry().
+    """
+    x0, y0, width, height = axes_boxes(fig, axes)
+    xmin, xmax, ymin, ymax = axes_limits(axes)
+
+    # inches per data unit
+    x_scale = width / (xmax - xmin)
+    y_scale = height / (ymax - ymin)
+
+    xbase = bases[:, 0]
+    ybase = bases[:, 1]
+
+    x_start = x0 + (xbase - xmin) * x_scale
+    y_start = y0 + (ybase - ymin) * y_scale
+    start = np.stack([x_start, y_start], axis=1)
+
+    # arrowheads a tenth of the length, in data units
+    head = 0.1 * length
+
+    starts = []
+    ends = []
+    head_widths = []
+    head_lengths = []
+
+    if xaxis:
+        starts.append(start)
+        ends.append(np.stack([x_start + length * x_scale, y_start], axis=1))
+        head_widths.append(head * y_scale)
+        head_lengths.append(head * x_scale)
+
+    if yaxis:
+        starts.append(start)
+        ends.append(np.stack([x_start, y_start + length * y_scale], axis=1))
+        head_widths.append(head * x_scale)
+        head_lengths.append(head * y_scale)
+
+    if len(starts) == 0:
+        return np.empty((0, 2, 2)), np.empty((0, 3, 2))
+
+    return arrow_geometry(np.concatenate(starts), np.concatenate(ends),
+                          np.concatenate(head_widths),
+                          np.concatenate(head_lengths))
@@ -73,10 +73,7 @@ def dictionary_items_to_numpy_arrays(dictionary):
     Recurivse function: a dictionary within a dictionary will also
     be converted.
     
-    Returns
-    -------
-    dictionary : dict
-        Similar dictionary, now with some items as numpy arrays.
+    The dictionary is converted in place.
     """
     
     for key, item in dictionary.items():
@@ -84,8 +81,8 @@ def dictionary_items_to_numpy_arrays(dictionary):
         if isinstance(item, dict):
             logger.info("Recursive call, dictionary within a dictionary.")
             logger.info("Also converting %s dictionary items to numpy arrays.", key)
-            item = dictionary_items_to_numpy_arrays(item)
-            dictionary[key] = item
+            # converted in place
+            dictionary_items_to_numpy_arrays(item)
         
         else:
             # if not a singular item or a string
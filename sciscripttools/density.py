@@ -0,0 +1,336 @@
+# Density Plots
+#
+# Bin millions of scatter points into a 2D histogram at the pixel resolution
+# of the axes, one chunk at a time, and draw the counts as a single image,
+# rather than one marker per point.
+
+import logging
+
+import numpy as np
+import matplotlib.colors
+import matplotlib.colorbar
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def axes_pixel_size(ax):
+    """
+    Width and height of an axes in pixels, from the figure size, dpi and
+    axes position. Does not need the figure to be drawn.
+
+    Parameters
+    ----------
+    ax : matplotlib axis
+        Single axis.
+
+    Returns
+    -------
+    width, height : int
+    """
+    fig = ax.get_figure()
+    position = ax.get_position()
+    width = position.width * fig.get_figwidth() * fig.dpi
+    height = position.height * fig.get_figheight() * fig.dpi
+    return max(int(np.ceil(width)), 1), max(int(np.ceil(height)), 1)
+
+def scale_values(values, log):
+    """
+    Values as a float array, log10 of the values for a log axis,
+    with non-positive values becoming NaN.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    if log:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log10(np.where(values > 0, values, np.nan))
+    return values
+
+class running_density:
+    """
+    Accumulate 2D histogram counts of points on a regular grid,
+    one chunk at a time. The grid is regular in log10 of the data for log
+    axes. Points outside of the extent, and non-finite points (or
+    non-positive on a log axis), are counted separately.
+
+    Methods
+    -------
+    update(self, x, y)
+        Add a chunk of points.
+    merge(self, other)
+        Merge another running_density object, with the same grid.
+    edges(self)
+        Bin edges in data coordinates.
+
+    Class Variables
+    ---------------
+    extent : tuple
+        (x0, x1, y0, y1) in data coordinates.
+    shape : tuple
+        Number of bins, (ny, nx).
+    log : tuple of Bool
+        If the x and y axes are log.
+    counts : array
+        Number of points in each bin, shape (ny, nx), row 0 at y0.
+    outside : int
+        Number of points outside of the extent.
+    nan_count : int
+        Number of points which can not be placed.
+    """
+
+    def __init__(self, extent, shape, log=(False, False)):
+        self.extent = tuple(float(e) for e in extent)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.log = (bool(log[0]), bool(log[1]))
+
+        if len(self.extent) != 4:
+            raise Exception("Expected an extent of (x0, x1, y0, y1).")
+        if self.shape[0] < 1 or self.shape[1] < 1:
+            raise Exception("Expected at least one bin in each direction.")
+
+        x0, x1, y0, y1 = self.extent
+        self.bounds = (scale_values(x0, self.log[0])[0],
+                       scale_values(x1, self.log[0])[0],
+                       scale_values(y0, self.log[1])[0],
+                       scale_values(y1, self.log[1])[0])
+        if not np.all(np.isfinite(self.bounds)):
+            raise Exception("Extent {} is not valid for the axis scales."
+                                                        .format(self.extent))
+        if self.bounds[1] <= self.bounds[0] or self.bounds[3] <= self.bounds[2]:
+            raise Exception("Expected an increasing extent.")
+
+        self.counts = np.zeros(self.shape, dtype=np.int64)
+        self.outside = 0
+        self.nan_count = 0
+
+    def update(self, x, y):
+        """
+        Add a chunk of points.
+
+        Parameters
+        ----------
+        x : array
+            x values, flattened before use.
+        y : array
+            y values, flattened before use.
+        """
+        x = scale_values(x, self.log[0])
+        y = scale_values(y, self.log[1])
+        if len(x) != len(y):
+            raise Exception("x and y need to be the same length.")
+
+        finite = np.isfinite(x) & np.isfinite(y)
+        self.nan_count += len(x) - int(np.count_nonzero(finite))
+
+        u0, u1, v0, v1 = self.bounds
+        inside = finite & (x >= u0) & (x <= u1) & (y >= v0) & (y <= v1)
+        self.outside += int(np.count_nonzero(finite)) - int(np.count_nonzero(inside))
+        x = x[inside]
+        y = y[inside]
+
+        ny, nx = self.shape
+        column = ((x - u0) * (nx / (u1 - u0))).astype(np.int64)
+        row = ((y - v0) * (ny / (v1 - v0))).astype(np.int64)
+        # points on the upper edges go in the last bins
+        np.minimum(column, nx - 1, out=column)
+        np.minimum(row, ny - 1, out=row)
+
+        counts = np.bincount(row * nx + column, minlength=nx * ny)
+        self.counts += counts.reshape(self.shape)
+        return 0
+
+    def merge(self, other):
+        """
+        Merge another running_density object, with the same grid.
+        """
+        if (self.extent, self.shape, self.log) != (other.extent, other.shape,
+                                                                    other.log):
+            raise Exception("Can only merge densities with the same grid.")
+
+        self.counts += other.counts
+        self.outside += other.outside
+        self.nan_count += other.nan_count
+        return 0
+
+    def edges(self):
+        """
+        Bin edges in data coordinates.
+
+        Returns
+        -------
+        xedges : array
+            nx + 1 edges.
+        yedges : array
+            ny + 1 edges.
+        """
+        u0, u1, v0, v1 = self.bounds
+        xedges = np.linspace(u0, u1, self.shape[1] + 1)
+        yedges = np.linspace(v0, v1, self.shape[0] + 1)
+        if self.log[0]:
+            xedges = np.power(10.0, xedges)
+        if self.log[1]:
+            yedges = np.power(10.0, yedges)
+        return xedges, yedges
+
+def data_extent(x, y, log=(False, False), chunk_size=2**20):
+    """
+    Extent (x0, x1, y0, y1) of the finite points (positive on a log axis),
+    found one chunk at a time.
+    """
+    lower = np.full(2, np.inf)
+    upper = np.full(2, -np.inf)
+
+    for start in range(0, len(x), chunk_size):
+        u = scale_values(x[start:start + chunk_size], log[0])
+        v = scale_values(y[start:start + chunk_size], log[1])
+        finite = np.isfinite(u) & np.isfinite(v)
+        if not np.any(finite):
+            continue
+        u = u[finite]
+        v = v[finite]
+        lower = np.minimum(lower, [u.min(), v.min()])
+        upper = np.maximum(upper, [u.max(), v.max()])
+
+    if not np.all(np.isfinite(lower)):
+        raise Exception("No finite points to plot.")
+
+    # widen a single value, so the extent has a size
+    for i in range(2):
+        if upper[i] == lower[i]:
+            pad = 0.5 if (log[i] or lower[i] == 0) else 0.05 * abs(lower[i])
+            lower[i] -= pad
+            upper[i] += pad
+
+    extent = []
+    for i in range(2):
+        bounds = [lower[i], upper[i]]
+        if log[i]:
+            bounds = list(np.power(10.0, bounds))
+        extent.extend(float(b) for b in bounds)
+    return tuple(extent)
+
+def density_counts(x, y, extent=None, shape=(100, 100), log=(False, False),
+                                                        chunk_size=2**20):
+    """
+    2D histogram of points, binned one chunk at a time so memory use does
+    not grow with the number of points.
+
+    Parameters
+    ----------
+    x : array
+        x values; anything which can be sliced, e.g. a numpy memmap.
+    y : array
+        y values, the same length as x.
+    extent : None, tuple
+        (x0, x1, y0, y1) in data coordinates.
+        Default is the extent of the points, which takes an extra pass.
+    shape : tuple
+        Number of bins, (ny, nx).
+    log : tuple of Bool
+        If the x and y axes are log; the bins are then log spaced.
+    chunk_size : int
+        Number of points binned at a time.
+
+    Returns
+    -------
+    density : running_density
+        Holds the counts, density.counts, and density.edges().
+    """
+    if len(x) != len(y):
+        raise Exception("x and y need to be the same length.")
+
+    if extent is None:
+        extent = data_extent(x, y, log, chunk_size)
+
+    density = running_density(extent, shape, log)
+    for start in range(0, len(x), chunk_size):
+        density.update(x[start:start + chunk_size], y[start:start + chunk_size])
+
+    if density.outside > 0 or density.nan_count > 0:
+        logger.debug("%d points outside of the extent, %d points not placed.",
+                                        density.outside, density.nan_count)
+    return density
+
+def density_image(ax, x, y, bins=None, extent=None, norm="log", cmap=None,
+                    colorbar=False, label=None, chunk_size=2**20, **kwargs):
+    """
+    Draw a scatter of many points as an image of the number of points in
+    each pixel.
+
+    Linear axes are drawn with imshow(); a log axis needs log spaced bins,
+    so is drawn with pcolormesh(), rasterized to a single image in vector
+    files.
+
+    Parameters
+    ----------
+    ax : matplotlib axis
+        Single axis, with the axis scales already set.
+    x : array
+        x values; anything which can be sliced, e.g. a numpy memmap.
+    y : array
+        y values.
+    bins : None, int, tuple
+        Number of bins, nx or (nx, ny). Default is one bin per pixel.
+    extent : None, tuple
+        (x0, x1, y0, y1). Default is the extent of the points.
+    norm : "log", "linear", matplotlib.colors.Normalize
+        Colour scale of the counts. Empty bins are left transparent.
+    cmap : None, str, matplotlib colormap
+    colorbar : Bool
+        Add a colour bar, next to the axis.
+    label : None, str
+        Label of the colour bar.
+    chunk_size : int
+        Number of points binned at a time.
+    **kwargs
+        Passed onto ax.imshow() or ax.pcolormesh().
+
+    Returns
+    -------
+    image : matplotlib AxesImage, QuadMesh
+    cbar : None, matplotlib Colorbar
+    """
+    fig = ax.get_figure()
+    log = (ax.get_xscale() == "log", ax.get_yscale() == "log")
+
+    # make room for the colour bar first, so the bins match the pixels
+    cax = None
+    if colorbar:
+        cax, cbar_kwargs = matplotlib.colorbar.make_axes(ax)
+
+    if bins is None:
+        nx, ny = axes_pixel_size(ax)
+    elif np.ndim(bins) == 0:
+        nx = ny = int(bins)
+    else:
+        nx, ny = bins
+
+    density = density_counts(x, y, extent=extent, shape=(ny, nx), log=log,
+                                                    chunk_size=chunk_size)
+    counts = np.ma.masked_equal(density.counts, 0)
+    vmax = max(int(density.counts.max()), 1)
+
+    if norm == "log":
+        norm = matplotlib.colors.LogNorm(vmin=1, vmax=vmax)
+    elif norm == "linear":
+        norm = matplotlib.colors.Normalize(vmin=0, vmax=vmax)
+
+    if log[0] or log[1]:
+        xedges, yedges = density.edges()
+        kwargs.setdefault("rasterized", True)
+        image = ax.pcolormesh(xedges, yedges, counts, norm=norm, cmap=cmap,
+                                                                    **kwargs)
+    else:
+        kwargs.setdefault("interpolation", "nearest")
+        image = ax.imshow(counts, origin="lower", extent=density.extent,
+                            aspect="auto", norm=norm, cmap=cmap, **kwargs)
+
+    x0, x1, y0, y1 = density.extent
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+
+    cbar = None
+    if colorbar:
+        cbar = fig.colorbar(image, cax=cax, **cbar_kwargs)
+        if label is not None:
+            cbar.set_label(label)
+
+    return image, cbar
@@ -0,0 +1,277 @@
+# Downsampling for Line Plots
+#
+# Reduce dense series to the points that change the rendered line, based
+# on the pixel width of the axes, so plotting stays fast and vector files
+# stay small.
+
+import logging
+
+import numpy as np
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def axes_pixel_width(ax):
+    """
+    Width of an axes in pixels, from the figure size, dpi and axes position.
+    Does not need the figure to be drawn.
+
+    Parameters
+    ----------
+    ax : matplotlib axis
+        Single axis.
+    """
+    fig = ax.get_figure()
+    width = ax.get_position().width * fig.get_figwidth() * fig.dpi
+    return max(int(np.ceil(width)), 1)
+
+def sort_series(x, y):
+    """
+    Return x and y as arrays, sorted by x if they are not already.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) != len(y):
+        raise Exception("x and y need to be the same length.")
+    if len(x) > 1 and np.any(x[1:] < x[:-1]):
+        logger.debug("Sorting series by x.")
+        order = np.argsort(x, kind="stable")
+        x = x[order]
+        y = y[order]
+    return x, y
+
+def minmax_indices(x, y, buckets):
+    """
+    Indices of the first, minimum, maximum, and last points in each of
+    a number of equal width x buckets (the M4 method).
+
+    Drawn at one bucket per pixel, the line through these points covers
+    the same pixels as the line through all of the points.
+
+    Parameters
+    ----------
+    x : array
+        x values, increasing.
+    y : array
+        y values.
+    buckets : int
+        Number of buckets, e.g. the pixel width of the axes.
+
+    Returns
+    -------
+    indices : array
+        Sorted indices of the points to keep.
+    """
+
+    n = len(x)
+    if n <= 4 * buckets:
+        return np.arange(n)
+
+    x0 = x[0]
+    x1 = x[-1]
+    if x1 == x0:
+        bucket = np.zeros(n, dtype=np.int64)
+    else:
+        bucket = ((x - x0) * (buckets / (x1 - x0))).astype(np.int64)
+        np.clip(bucket, 0, buckets - 1, out=bucket)
+
+    # start and end of each non-empty bucket, x is sorted so buckets are too
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n]
+    bucket_of = np.repeat(np.arange(len(starts)), ends - starts)
+
+    # fmin/fmax ignore NaNs
+    mins = np.fmin.reduceat(y, starts)
+    maxs = np.fmax.reduceat(y, starts)
+
+    def first_match(matches):
+        # index of the first matching point in each bucket
+        index = np.flatnonzero(matches)
+        first = np.r_[True, bucket_of[index][1:] != bucket_of[index][:-1]]
+        return index[first]
+
+    argmins = first_match(y == mins[bucket_of])
+    argmaxs = first_match(y == maxs[bucket_of])
+
+    indices = np.concatenate([starts, ends - 1, argmins, argmaxs])
+    return np.unique(indices)
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points chosen by the Largest-Triangle-Three-Buckets
+    method, which keeps the visual shape of a series with n_out points.
+
+    Parameters
+    ----------
+    x : array
+        x values, increasing.
+    y : array
+        y values.
+    n_out : int
+        Number of points to keep, at least 3.
+
+    Returns
+    -------
+    indices : array
+        Sorted indices of the points to keep.
+    """
+
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # bucket edges, first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # average point of each bucket, used as the third point of the triangle
+    sums_x = np.add.reduceat(x[:n-1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n-1], edges[:-1])
+    counts = np.diff(edges)
+    means_x = sums_x / counts
+    means_y = sums_y / counts
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = edges[i]
+        end = edges[i + 1]
+
+        if i + 1 < n_out - 2:
+            cx = means_x[i + 1]
+            cy = means_y[i + 1]
+        else:
+            cx = x[n - 1]
+            cy = y[n - 1]
+
+        # twice the area of the triangles a, point, c
+        areas = np.abs((x[a] - cx) * (y[start:end] - y[a])
+                            - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.nanargmax(areas)) if np.any(np.isfinite(areas)) \
+                else start
+        indices[i + 1] = a
+
+    return indices
+
+def downsample(x, y, n, method="minmax", log=False):
+    """
+    Downsample a series for plotting.
+
+    Parameters
+    ----------
+    x : array
+        x values.
+    y : array
+        y values.
+    n : int
+        Number of buckets for "minmax" (up to 4 points each), or number of
+        points for "lttb". Typically the pixel width of the axes.
+    method : "minmax", "lttb"
+        Downsampling method. "minmax" looks the same as the full data,
+        "lttb" keeps fewer points but only the overall shape.
+    log : False, Bool
+        Bucket in log x, for log scale x axes.
+
+    Returns
+    -------
+    x, y : array
+        The downsampled series.
+    """
+    x, y = sort_series(x, y)
+
+    x_bucket = x
+    if log:
+        # non-positive values are not shown on a log axis
+        positive = x > 0
+        x = x[positive]
+        y = y[positive]
+        x_bucket = np.log10(x)
+
+    if method == "minmax":
+        indices = minmax_indices(x_bucket, y, n)
+    elif method == "lttb":
+        indices = lttb_indices(x_bucket, y, n)
+    else:
+        raise Exception("Incorrect string for method argument.")
+
+    return x[indices], y[indices]
+
+class downsampled_line:
+    """
+    A line plotted from a downsampled series, which is downsampled again
+    for the visible x range whenever the x limits change (e.g. after
+    move_view()), so zooming in shows the full detail.
+
+    Class Variables
+    ---------------
+    ax : matplotlib axis
+        The axis of the line.
+    line : matplotlib Line2D
+        The plotted line.
+    x, y : array
+        The full series, sorted by x.
+    method : "minmax", "lttb"
+        Downsampling method.
+    buckets : None, int
+        Number of buckets / points. Default is the axes pixel width.
+
+    Methods
+    -------
+    update(self, ax=None)
+        Downsample the series for the current view and update the line.
+    disconnect(self)
+        Stop updating the line when the limits change.
+    """
+
+    def __init__(self, ax, x, y, method="minmax", buckets=None, **kwargs):
+        self.ax = ax
+        self.x, self.y = sort_series(x, y)
+        self.method = method
+        self.buckets = buckets
+
+        x_view, y_view = downsample(self.x, self.y, self.n(), self.method,
+                                            self.log())
+        self.line, = ax.plot(x_view, y_view, **kwargs)
+
+        self.cid = ax.callbacks.connect("xlim_changed", self.update)
+
+    def n(self):
+        """
+        Number of buckets / points to downsample to.
+        """
+        if self.buckets is not None:
+            return self.buckets
+        return axes_pixel_width(self.ax)
+
+    def log(self):
+        """
+        Check if the x axis is log scale.
+        """
+        return self.ax.get_xscale() == "log"
+
+    def update(self, ax=None):
+        """
+        Downsample the series for the current view and update the line.
+        """
+        xmin, xmax = sorted(self.ax.get_xlim())
+
+        # keep a point either side of the view so the line reaches the edges
+        start = max(np.searchsorted(self.x, xmin, side="left") - 1, 0)
+        end = min(np.searchsorted(self.x, xmax, side="right") + 1, len(self.x))
+
+        x_view, y_view = downsample(self.x[start:end], self.y[start:end],
+                                            self.n(), self.method, self.log())
+        self.line.set_data(x_view, y_view)
+        return 0
+
+    def disconnect(self):
+        """
+        Stop updating the line when the limits change.
+        """
+        self.ax.callbacks.disconnect(self.cid)
+        return 0
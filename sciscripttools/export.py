@@ -0,0 +1,297 @@
+# Figure Export
+#
+# Helpers for saving figures, used by the standard_figure export methods.
+
+import os
+import time
+import logging
+import tempfile
+
+import numpy as np
+import matplotlib
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def artist_vertex_count(artist):
+    """
+    Number of vertices (or markers) drawn by an artist.
+
+    Parameters
+    ----------
+    artist : matplotlib artist
+        Line, collection, or patch.
+
+    Returns
+    -------
+    count : int
+    """
+
+    # lines
+    if hasattr(artist, "get_xydata"):
+        return len(artist.get_xydata())
+
+    count = 0
+
+    # collections, e.g. scatter, line and poly collections, meshes
+    if hasattr(artist, "get_offsets"):
+        offsets = artist.get_offsets()
+        if offsets is not None and len(offsets) > 1:
+            count += len(offsets)
+
+    if hasattr(artist, "get_paths"):
+        paths = artist.get_paths()
+        if paths is not None:
+            count += sum(len(path.vertices) for path in paths)
+    elif hasattr(artist, "get_path"):
+        count += len(artist.get_path().vertices)
+
+    return count
+
+def heavy_artists(fig, threshold):
+    """
+    Data artists of a figure which draw more vertices than a threshold.
+    Only the lines, collections and patches in each axes are checked, so
+    the axes, ticks, labels and text are never included.
+
+    Parameters
+    ----------
+    fig : matplotlib figure
+    threshold : int
+        Number of vertices.
+
+    Returns
+    -------
+    artists : list
+        List of (artist, vertex count).
+    """
+    artists = []
+    for ax in fig.axes:
+        for artist in list(ax.lines) + list(ax.collections) + list(ax.patches):
+            count = artist_vertex_count(artist)
+            if count > threshold:
+                artists.append((artist, count))
+    return artists
+
+def timed_save(fig, filename, **kwargs):
+    """
+    Save a figure, returning the time taken and the file size.
+    """
+    start = time.perf_counter()
+    fig.savefig(filename, **kwargs)
+    save_time = time.perf_counter() - start
+    return save_time, os.path.getsize(filename)
+
+def save_rasterized(fig, filename, threshold=10000, dpi=300, compare=False,
+                                                                    **kwargs):
+    """
+    Save a figure with only its heavy data artists rasterized.
+    See standard_figure.savefig_rasterized().
+
+    Returns
+    -------
+    report : dict
+        rasterized (number of artists), vertices (rasterized), save_time,
+        and size; with compare, also vector_save_time, vector_size, and
+        the time_saving and size_saving fractions.
+    """
+
+    artists = heavy_artists(fig, threshold)
+    report = {"rasterized" : len(artists),
+              "vertices" : int(np.sum([count for _, count in artists]))}
+
+    if compare:
+        # save a fully vector version, in the same format, to compare with
+        extension = os.path.splitext(filename)[1]
+        with tempfile.TemporaryDirectory() as directory:
+            vector_filename = os.path.join(directory, "vector" + extension)
+            vector_time, vector_size = timed_save(fig, vector_filename,
+                                                        dpi=dpi, **kwargs)
+        report["vector_save_time"] = vector_time
+        report["vector_size"] = vector_size
+
+    states = [artist.get_rasterized() for artist, _ in artists]
+    try:
+        for artist, _ in artists:
+            artist.set_rasterized(True)
+        save_time, size = timed_save(fig, filename, dpi=dpi, **kwargs)
+    finally:
+        for (artist, _), state in zip(artists, states):
+            artist.set_rasterized(state)
+
+    report["save_time"] = save_time
+    report["size"] = size
+
+    if compare:
+        report["time_saving"] = 1.0 - save_time / report["vector_save_time"]
+        report["size_saving"] = 1.0 - size / report["vector_size"]
+        logger.info("Rasterized %d artists: size %.1f%% smaller, save %.1f%% faster.",
+                        len(artists), 100*report["size_saving"],
+                        100*report["time_saving"])
+
+    return report
+
+# multi-format export --------------------------------------------------------
+
+# formats written from the Agg buffer, extension : PIL format
+raster_formats = {".png" : "PNG", ".jpg" : "JPEG", ".jpeg" : "JPEG",
+                  ".tif" : "TIFF", ".tiff" : "TIFF", ".webp" : "WEBP"}
+
+# savefig rcParams, and the values at which savefig() output is the plain
+# Agg draw, so raster formats can share one draw
+plain_savefig_rc = {"savefig.bbox" : [None, "standard"],
+                    "savefig.facecolor" : ["auto"],
+                    "savefig.edgecolor" : ["auto"],
+                    "savefig.transparent" : [False]}
+
+def plain_savefig():
+    """
+    If savefig() with no options gives the plain Agg draw of a figure,
+    with the current rcParams.
+    """
+    return all(matplotlib.rcParams[key] in values
+                    for key, values in plain_savefig_rc.items())
+
+def format_extension(file_format):
+    """
+    Format as a lower case extension with a dot, e.g. "PDF" gives ".pdf".
+    """
+    file_format = file_format.lower()
+    if not file_format.startswith("."):
+        file_format = "." + file_format
+    return file_format
+
+def write_raster(filename, image, extension, dpi):
+    """
+    Write an RGBA image array with PIL, flattening formats without alpha.
+    """
+    picture = Image.fromarray(image, "RGBA")
+    if extension in [".jpg", ".jpeg"]:
+        picture = picture.convert("RGB")
+    picture.save(filename, raster_formats[extension], dpi=(dpi, dpi))
+    return 0
+
+def save_formats(fig, filename, formats=(".pdf", ".png"), dpi=300, **kwargs):
+    """
+    Save a figure in several formats and resolutions, from as few draws as
+    possible. See standard_figure.savefig_formats().
+
+    Returns
+    -------
+    report : dict
+        outputs, a list of dict with filename, format, dpi, time and size
+        of each file; draw_time, the time of each Agg draw by dpi; and 
+        total_time.
+    """
+
+    start = time.perf_counter()
+    base, extension = os.path.splitext(filename)
+    if extension == "":
+        base = filename
+
+    extensions = list(dict.fromkeys(format_extension(f) for f in formats))
+    dpis = list(dict.fromkeys(np.atleast_1d(dpi).tolist()))
+    many_dpi = len(dpis) > 1
+
+    def output_filename(extension, dpi):
+        if many_dpi and extension in raster_formats:
+            return "{}_{}dpi{}".format(base, dpi, extension)
+        return base + extension
+
+    report = {"outputs" : [], "draw_time" : {}}
+
+    # options (or savefig rcParams, e.g. savefig.bbox = "tight") which 
+    # change the saved area or colours need savefig itself
+    shared_buffer = len(kwargs) == 0 and plain_savefig()
+
+    original_canvas = fig.canvas
+    original_dpi = fig.dpi
+    try:
+        raster = [e for e in extensions if e in raster_formats and shared_buffer]
+        for resolution in dpis:
+            if len(raster) == 0:
+                break
+
+            # one draw for every raster format at this resolution, the
+            # layout engine (if any) runs in the draw, at this resolution,
+            # as in savefig
+            draw_start = time.perf_counter()
+            canvas = FigureCanvasAgg(fig)
+            fig.set_dpi(resolution)
+            canvas.draw()
+            image = np.asarray(canvas.buffer_rgba())
+            report["draw_time"][resolution] = time.perf_counter() - draw_start
+
+            for extension in raster:
+                output = output_filename(extension, resolution)
+                write_start = time.perf_counter()
+                write_raster(output, image, extension, resolution)
+                report["outputs"].append({"filename" : output, 
+                        "format" : extension, "dpi" : resolution,
+                        "time" : time.perf_counter() - write_start,
+                        "size" : os.path.getsize(output)})
+
+        fig.set_dpi(original_dpi)
+        fig.set_canvas(original_canvas)
+
+        # vector formats, and raster formats with savefig options
+        for extension in extensions:
+            if extension in raster:
+                continue
+            resolutions = dpis if extension in raster_formats else dpis[-1:]
+            for resolution in resolutions:
+                output = output_filename(extension, resolution)
+                save_time, size = timed_save(fig, output, dpi=resolution, **kwargs)
+                report["outputs"].append({"filename" : output, 
+                        "format" : extension, "dpi" : resolution,
+                        "time" : save_time, "size" : size})
+    finally:
+        fig.set_dpi(original_dpi)
+        fig.set_canvas(original_canvas)
+
+    report["total_time"] = time.perf_counter() - start
+    for output in report["outputs"]:
+        logger.info("Saved %s in %.3f s.", output["filename"], output["time"])
+    return report
+
+def save_pdf_pages(figures, filename, **kwargs):
+    """
+    Save many figures as the pages of one PDF file, in a single pass.
+
+    Parameters
+    ----------
+    figures : list
+        Matplotlib figures or standard_figures, one per page.
+    filename : str
+        Output PDF filename.
+    **kwargs
+        Passed onto savefig() for each page, e.g. bbox_inches="tight".
+
+    Returns
+    -------
+    report : dict
+        pages, the time to write each page; total_time; and size.
+
+    Example
+    -------
+    save_pdf_pages([sf1, sf2, fig3], "figures.pdf")
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    start = time.perf_counter()
+    page_times = []
+    with PdfPages(filename) as pdf:
+        for fig in figures:
+            # standard_figure
+            fig = getattr(fig, "fig", fig)
+            page_start = time.perf_counter()
+            pdf.savefig(fig, **kwargs)
+            page_times.append(time.perf_counter() - page_start)
+
+    report = {"pages" : page_times, "total_time" : time.perf_counter() - start,
+              "size" : os.path.getsize(filename)}
+    logger.info("Saved %d pages to %s in %.3f s.", len(figures), filename,
+                                                    report["total_time"])
+    return report
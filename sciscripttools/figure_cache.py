@@ -0,0 +1,245 @@
+# Figure Cache
+#
+# Skip rendering figures whose inputs have not changed. A content hash of
+# everything a figure depends on (data files, parameters, plot function,
+# rcParams, versions and the sciscripttools source) is stored next to each
+# output, and compared on the next run.
+
+import os
+import json
+import pickle
+import inspect
+import hashlib
+import logging
+import functools
+
+import numpy as np
+import matplotlib
+
+from .io import prepare_filename
+from .locks import temporary_filename
+from .profiles import resolve_profile
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+def cache_filename(output):
+    """
+    Hidden sidecar file holding the input hash of an output figure.
+    """
+    directory, name = os.path.split(output)
+    return os.path.join(directory, "." + name + ".hash")
+
+def file_digest(filename, known=None):
+    """
+    SHA-256 of a file. Reuses a known digest if the file modification time
+    and size have not changed.
+
+    Parameters
+    ----------
+    filename : str
+    known : None, dict
+        Previous digests, path : [mtime, size, digest], updated in place.
+
+    Returns
+    -------
+    digest : str
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+
+    if known is not None:
+        entry = known.get(path)
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return entry[2]
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    if known is not None:
+        known[path] = [stat.st_mtime_ns, stat.st_size, digest]
+    return digest
+
+def function_source(function):
+    """
+    Source code of a function, or its byte code if the source is not
+    available (e.g. defined interactively).
+    """
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        code = getattr(function, "__code__", None)
+        if code is None:
+            return repr(function)
+        return code.co_code.hex() + repr(code.co_consts)
+
+@functools.lru_cache(maxsize=None)
+def package_digest():
+    """
+    SHA-256 of the source of every sciscripttools module, so changes to the
+    helpers a plot function calls (not only its own source) are seen.
+    Computed once per process.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    sha = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".py"):
+            continue
+        sha.update(name.encode() + b"\0")
+        with open(os.path.join(directory, name), "rb") as f:
+            sha.update(f.read())
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+def rc_dictionary(rc_params=None):
+    """
+    rcParams as JSON, without the backend, for hashing.
+    """
+    if rc_params is None:
+        rc_params = matplotlib.rcParams
+    return json.dumps({key : str(value) for key, value in rc_params.items()
+                       if key != "backend"}, sort_keys=True)
+
+def parameters_dictionary(fig_params):
+    """
+    Figure parameters as a plain dictionary, from a profile name or file,
+    dictionary, or figure_parameters.
+    """
+    if isinstance(fig_params, str):
+        _, parameters = resolve_profile(fig_params)
+        return dict(parameters)
+    if isinstance(fig_params, dict):
+        return dict(fig_params)
+    if hasattr(fig_params, "create_dictionary"):
+        return fig_params.create_dictionary()
+    raise Exception("Failed to process argument fig_params.")
+
+def data_files(data, files=()):
+    """
+    Data files of a figure: the files given, and data given as a filename
+    (as in figure_job), resolved to the saved file.
+    """
+    filenames = [prepare_filename(f, None, "") for f in files]
+    if isinstance(data, str):
+        filenames.append(prepare_filename(data, None, ""))
+    return filenames
+
+def figure_hash(plot, data=None, files=(), fig_params="report", extra=None,
+                                                known=None, rc_params=None):
+    """
+    Hash of everything a figure depends on.
+
+    Parameters
+    ----------
+    plot : callable
+        The plot function; its source code is hashed.
+    data : None, str, object
+        Data of the figure. A string is a filename (e.g. from save_data())
+        and its file contents are hashed; other data is pickled and hashed.
+    files : list of str
+        Other data files read by the plot function.
+    fig_params : str, dict, figure_parameters
+        Figure parameters or profile; the parameter values are hashed.
+    extra : None, object
+        Anything else to include, e.g. nrows, ncols and savefig options;
+        must be JSON serialisable.
+    known : None, dict
+        Previous file digests, see file_digest().
+    rc_params : None, dict
+        rcParams the figure is rendered with, e.g. those of the worker
+        processes. Default is the rcParams of this process.
+
+    Returns
+    -------
+    digest : str
+    """
+    from . import __version__
+
+    sha = hashlib.sha256()
+
+    def add(label, value):
+        sha.update(label.encode())
+        sha.update(b"\0")
+        sha.update(value if isinstance(value, bytes) else str(value).encode())
+        sha.update(b"\0")
+
+    add("sciscripttools", __version__)
+    add("sciscripttools source", package_digest())
+    add("matplotlib", matplotlib.__version__)
+    add("numpy", np.__version__)
+    add("rc", rc_dictionary(rc_params))
+
+    add("plot", function_source(plot))
+    add("fig_params", json.dumps(parameters_dictionary(fig_params),
+                                 sort_keys=True, default=str))
+    add("extra", json.dumps(extra, sort_keys=True, default=str))
+
+    for filename in data_files(data, files):
+        add("file", file_digest(filename, known))
+    if data is not None and not isinstance(data, str):
+        add("data", hashlib.sha256(pickle.dumps(data, protocol=4)).hexdigest())
+
+    return sha.hexdigest()
+
+def read_cache(output):
+    """
+    The stored hash and file digests of an output, or None.
+    """
+    try:
+        with open(cache_filename(output)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cache(output, digest, known):
+    """
+    Store the hash and file digests of an output, atomically.
+    """
+    filename = cache_filename(output)
+    temporary = temporary_filename(filename)
+    with open(temporary, "w") as f:
+        json.dump({"hash" : digest, "files" : known}, f)
+    os.replace(temporary, filename)
+    return 0
+
+def job_hash(job, known=None, settings=None, rc_params=None):
+    """
+    Hash of the inputs of a figure_job, see figure_hash().
+
+    Parameters
+    ----------
+    settings : None, dict
+        Other rendering settings of the workers, e.g. the backend of
+        render_figures().
+    rc_params : None, dict
+        rcParams the workers render with, see render.worker_rc_params().
+    """
+    extra = {"nrows" : job.nrows, "ncols" : job.ncols,
+             "subplots_kw" : job.subplots_kw, "savefig_kw" : job.savefig_kw,
+             "settings" : settings}
+    return figure_hash(job.plot, data=job.data, files=getattr(job, "files", ()),
+                       fig_params=job.fig_params, extra=extra, known=known,
+                       rc_params=rc_params)
+
+def unchanged(job, settings=None, rc_params=None):
+    """
+    Check if the output of a figure_job exists and was made from the same
+    inputs and rendering settings (see job_hash()).
+
+    Returns
+    -------
+    unchanged : Bool
+    digest : str
+        The current input hash.
+    known : dict
+        File digests, to store with write_cache() after rendering.
+    """
+    cache = read_cache(job.output)
+    known = dict(cache["files"]) if cache is not None else {}
+    digest = job_hash(job, known, settings, rc_params)
+    same = (cache is not None and cache.get("hash") == digest
+                and os.path.exists(job.output))
+    return same, digest, known
@@ -0,0 +1,391 @@
+# File Format Handlers
+
+import json
+import pickle
+import struct
+import logging
+
+import numpy as np
+
+from .conversion import prepare_json_dictionary
+from .index import load_index, read_indexed_items, iter_indexed_values
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+class format_handler:
+    """
+    Base class for a file format handler used by the io functions.
+
+    A handler is registered against a file extension with register_format(),
+    after which save_data(), load_data(), load_item() and load_dictionary()
+    dispatch to it based on the extension of each file.
+
+    Subclasses must define encode() and decode(); the partial key read and
+    streaming methods default to decoding the whole file and can be
+    overridden by formats that support random access.
+
+    Class Variables
+    ---------------
+    extension : str
+        The file extension, including the dot, e.g. ".json".
+    binary : Bool
+        Open the file in binary mode.
+
+    Methods
+    -------
+    encode(self, data, file)
+        Write a dictionary to an open file.
+    decode(self, file)
+        Read a dictionary from an open file.
+    save(self, filename, data)
+        Write a dictionary to a file.
+    load(self, filename)
+        Read the dictionary from a file.
+    load_keys(self, filename, keys, index=False)
+        Read only the given keys from a file.
+    keys(self, filename, index=False)
+        List the keys stored in a file.
+    iter_items(self, filename, keys=None, index=False)
+        Yield (key, item) pairs from a file, one at a time.
+    iter_values(self, filename, key, chunk_size, index=False)
+        Yield the values of a numeric item in flat chunks.
+
+    The index argument asks the handler to use a key index for formats
+    that support one; other formats ignore it.
+    """
+
+    extension = None
+    binary = False
+
+    def encode(self, data, file):
+        raise NotImplementedError
+
+    def decode(self, file):
+        raise NotImplementedError
+
+    def open(self, filename, mode="r"):
+        """
+        Open a file in the mode required by the format.
+        """
+        if self.binary:
+            mode += "b"
+        return open(filename, mode)
+
+    def save(self, filename, data):
+        """
+        Write a dictionary to a file.
+        """
+        with self.open(filename, "w") as file:
+            self.encode(data, file)
+        return 0
+
+    def load(self, filename):
+        """
+        Read the dictionary from a file.
+        """
+        with self.open(filename) as file:
+            return self.decode(file)
+
+    def load_keys(self, filename, keys, index=False):
+        """
+        Read only the given keys from a file.
+
+        Returns
+        -------
+        data : dict
+            Dictionary of the given keys, in the order given.
+        """
+        data = self.load(filename)
+        return {key: data[key] for key in keys}
+
+    def keys(self, filename, index=False):
+        """
+        List the keys stored in a file.
+        """
+        return list(self.load(filename).keys())
+
+    def iter_items(self, filename, keys=None, index=False):
+        """
+        Yield (key, item) pairs from a file, one at a time.
+
+        Parameters
+        ----------
+        filename : str
+            Full path of the file.
+        keys : None, list
+            Keys to read. Default will read all keys.
+        index : False, Bool
+            Use a key index, if the format supports one.
+        """
+        if keys is None:
+            data = self.load(filename)
+        else:
+            data = self.load_keys(filename, keys, index=index)
+
+        for key, item in data.items():
+            yield key, item
+
+    def iter_values(self, filename, key, chunk_size, index=False):
+        """
+        Yield the values of a numeric item in flat chunks of at most 
+        chunk_size values, e.g. for reductions.
+
+        By default the whole item is read, then split; formats which can
+        read part of an item override this, so only a chunk is in memory.
+        """
+        for _, item in self.iter_items(filename, [key], index=index):
+            values = np.asarray(item).ravel()
+            for start in range(0, len(values), chunk_size):
+                yield values[start:start + chunk_size]
+
+class json_handler(format_handler):
+    """
+    Handler for .json files, the default format.
+
+    Items are converted with prepare_json_dictionary() before writing,
+    so numpy arrays are written as lists.
+
+    With index=True, partial reads use a sidecar key index (see index.py)
+    which records the byte range of each top-level value, so only the
+    requested values are read and decoded.
+    """
+
+    extension = ".json"
+    binary = False
+
+    def encode(self, data, file):
+        # convert dictionary items for writing to a json file
+        prepare_json_dictionary(data)
+        json.dump(data, file)
+        return 0
+
+    def decode(self, file):
+        return json.load(file)
+
+    def load_keys(self, filename, keys, index=False):
+        if not index:
+            return format_handler.load_keys(self, filename, keys)
+        return dict(read_indexed_items(filename, keys))
+
+    def keys(self, filename, index=False):
+        if not index:
+            return format_handler.keys(self, filename)
+        return list(load_index(filename).keys())
+
+    def iter_items(self, filename, keys=None, index=False):
+        if not index:
+            return format_handler.iter_items(self, filename, keys)
+        return read_indexed_items(filename, keys)
+
+    def iter_values(self, filename, key, chunk_size, index=False):
+        # with the index, numbers are parsed a block at a time
+        if not index:
+            return format_handler.iter_values(self, filename, key, chunk_size)
+        return iter_indexed_values(filename, key, chunk_size)
+
+class pickle_handler(format_handler):
+    """
+    Handler for .pkl files, written with pickle protocol 5.
+
+    Each top-level item is pickled separately, with large contiguous
+    buffers (e.g. numpy arrays) written out-of-band rather than copied into
+    the pickle stream. A small header at the start of the file records where
+    each item and its buffers are, so single keys can be read without
+    reading the rest of the file.
+
+    File layout
+    -----------
+    magic (8 bytes) | header length (8 bytes) | header | items and buffers
+
+    Note: only load pickle files from trusted sources.
+    """
+
+    extension = ".pkl"
+    binary = True
+
+    magic = b"SSTPKL5\n"
+    protocol = 5
+    alignment = 64 # byte alignment of the out-of-band buffers
+
+    def encode(self, data, file):
+
+        # pickle each item, keeping hold of the out-of-band buffers
+        items = []
+        for key, item in data.items():
+            buffers = []
+            payload = pickle.dumps(item, protocol=self.protocol,
+                                   buffer_callback=buffers.append)
+            buffers = [buffer.raw() for buffer in buffers]
+            items.append((key, payload, buffers))
+
+        # work out where each item and buffer will sit, relative to the
+        # end of the header
+        entries = []
+        offset = 0
+        for key, payload, buffers in items:
+            entry_buffers = []
+            item_offset = offset
+            offset += len(payload)
+            for buffer in buffers:
+                offset += -offset % self.alignment
+                entry_buffers.append((offset, buffer.nbytes))
+                offset += buffer.nbytes
+            entries.append((key, item_offset, len(payload), entry_buffers))
+
+        header = pickle.dumps(entries, protocol=self.protocol)
+
+        file.write(self.magic)
+        file.write(struct.pack("<Q", len(header)))
+        file.write(header)
+
+        position = 0
+        for key, payload, buffers in items:
+            file.write(payload)
+            position += len(payload)
+            for buffer in buffers:
+                padding = -position % self.alignment
+                file.write(b"\0" * padding)
+                file.write(buffer)
+                position += padding + buffer.nbytes
+
+        return 0
+
+    def read_header(self, file):
+        """
+        Read the header of an open file.
+
+        Returns
+        -------
+        entries : dict
+            key: (offset, length, buffers), with offsets from the data start.
+        start : int
+            Position in the file where the data starts.
+        """
+        magic = file.read(len(self.magic))
+        if magic != self.magic:
+            raise Exception("Not a sciscripttools pickle file.")
+
+        header_length, = struct.unpack("<Q", file.read(8))
+        entries = pickle.loads(file.read(header_length))
+        start = len(self.magic) + 8 + header_length
+
+        entries = {key: (offset, length, buffers)
+                        for key, offset, length, buffers in entries}
+        return entries, start
+
+    def read_item(self, file, entry, start):
+        """
+        Read a single item from an open file, given its header entry.
+        """
+        offset, length, buffers = entry
+
+        file.seek(start + offset)
+        payload = file.read(length)
+
+        # read buffers into writable memory, so loaded arrays are writable
+        out_of_band = []
+        for buffer_offset, buffer_length in buffers:
+            buffer = bytearray(buffer_length)
+            file.seek(start + buffer_offset)
+            file.readinto(buffer)
+            out_of_band.append(buffer)
+
+        return pickle.loads(payload, buffers=out_of_band)
+
+    def decode(self, file):
+        entries, start = self.read_header(file)
+        return {key: self.read_item(file, entry, start)
+                    for key, entry in entries.items()}
+
+    def load_keys(self, filename, keys, index=False):
+        with self.open(filename) as file:
+            entries, start = self.read_header(file)
+            return {key: self.read_item(file, entries[key], start)
+                        for key in keys}
+
+    def keys(self, filename, index=False):
+        with self.open(filename) as file:
+            entries, _ = self.read_header(file)
+        return list(entries.keys())
+
+    def iter_items(self, filename, keys=None, index=False):
+        with self.open(filename) as file:
+            entries, start = self.read_header(file)
+            if keys is None:
+                keys = entries.keys()
+            for key in keys:
+                yield key, self.read_item(file, entries[key], start)
+
+    def iter_values(self, filename, key, chunk_size, index=False):
+        # the out-of-band buffers are memory mapped rather than read, so
+        # an array is only read a chunk at a time
+        with self.open(filename) as file:
+            entries, start = self.read_header(file)
+            offset, length, buffers = entries[key]
+            file.seek(start + offset)
+            payload = file.read(length)
+
+        mapped = []
+        for buffer_offset, buffer_length in buffers:
+            if buffer_length == 0:
+                mapped.append(bytearray(0))
+                continue
+            mapped.append(np.memmap(filename, dtype=np.uint8, mode="r",
+                                    offset=start + buffer_offset,
+                                    shape=(buffer_length,)))
+
+        # any memory order, so a Fortran ordered array is not copied
+        values = np.asarray(pickle.loads(payload, buffers=mapped)).ravel(order="K")
+        for chunk_start in range(0, len(values), chunk_size):
+            yield values[chunk_start:chunk_start + chunk_size]
+
+# registry of handlers, keyed by file extension
+# registration order is the order used to search for a file with no extension
+format_handlers = {}
+
+def register_format(handler):
+    """
+    Register a file format handler against its file extension.
+    An existing handler for the extension is replaced.
+
+    Parameters
+    ----------
+    handler : format_handler
+        Handler object, with the extension class variable set.
+
+    Example
+    -------
+    class npz_handler(format_handler):
+        extension = ".npz"
+        ...
+    register_format(npz_handler())
+    """
+    if not isinstance(handler, format_handler):
+        raise Exception("Expected a format_handler object.")
+    if handler.extension is None or not handler.extension.startswith("."):
+        raise Exception("Handler extension should start with a '.'.")
+
+    logger.debug("Registering format: %s", handler.extension)
+    format_handlers[handler.extension] = handler
+    return 0
+
+def get_format_handler(file_format):
+    """
+    Get the handler registered for a file format / extension.
+
+    Parameters
+    ----------
+    file_format : str
+        The file format / extension, e.g. ".json".
+    """
+    try:
+        return format_handlers[file_format]
+    except KeyError:
+        supported = ", ".join(format_handlers.keys())
+        raise Exception(
+                "File format {} is not supported, supported formats are: {}."
+                .format(file_format, supported))
+
+register_format(json_handler())
+register_format(pickle_handler())
@@ -0,0 +1,331 @@
+# Key Index for JSON Files
+
+import os
+import re
+import json
+import logging
+
+import numpy as np
+
+from .locks import temporary_filename
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+index_extension = ".index"
+index_version = 2
+
+# characters of interest when scanning a json file
+# at the top level, inside a nested value, and inside a string
+_pattern_top = re.compile(rb'[\[\]{}",:]')
+_pattern_nested = re.compile(rb'[\[\]{}"]')
+_pattern_string = re.compile(rb'["\\]')
+
+# indices already read in by this process
+# filename: ((mtime, size, inode), index)
+_index_cache = {}
+
+def file_identity(stat):
+    """
+    Modification time, size and inode of a file, which change when it is
+    modified or replaced.
+    """
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def index_filename(filename):
+    """
+    Filename of the sidecar index for a json file.
+    """
+    return filename + index_extension
+
+def scan_json_keys(filename, chunk_size=2**22):
+    """
+    Scan a json file for the byte range of each top-level key's value.
+
+    The file is read in chunks and only the brackets, quotes, and
+    separators are inspected, the values themselves are not decoded.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the json file.
+    chunk_size : int
+        Number of bytes to read at a time.
+
+    Returns
+    -------
+    index : dict
+        key: (start, end), byte range of the value of each key.
+    """
+
+    entries = []
+
+    depth = 0
+    in_string = False
+    expect_key = False
+    key_start = None
+    key_end = None
+    value_start = None
+
+    with open(filename, "rb") as file:
+        buffer = file.read(chunk_size)
+        base = 0 # position of the buffer in the file
+        pos = 0 # position to search from in the buffer
+
+        while True:
+            if in_string:
+                pattern = _pattern_string
+            elif depth <= 1:
+                pattern = _pattern_top
+            else:
+                pattern = _pattern_nested
+
+            match = pattern.search(buffer, pos)
+            if match is None:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise Exception(
+                            "Unexpected end of json file: {}".format(filename))
+                # pos can be past the end of the buffer after an escape
+                pos = max(pos - len(buffer), 0)
+                base += len(buffer)
+                buffer = chunk
+                continue
+
+            i = match.start()
+            c = buffer[i:i+1]
+            at = base + i
+            pos = i + 1
+
+            if in_string:
+                if c == b"\\":
+                    # skip the escaped character
+                    pos = i + 2
+                    continue
+                in_string = False
+                if key_start is not None and key_end is None:
+                    key_end = at + 1
+                continue
+
+            if depth == 0 and c != b"{":
+                raise Exception(
+                        "Expected a json object in file: {}".format(filename))
+
+            if c == b'"':
+                in_string = True
+                if depth == 1 and expect_key:
+                    key_start = at
+                    key_end = None
+                    expect_key = False
+            elif c in b"{[":
+                depth += 1
+                if depth == 1:
+                    expect_key = True
+            elif c in b"}]":
+                depth -= 1
+                if depth == 0:
+                    if value_start is not None:
+                        entries.append((key_start, key_end, value_start, at))
+                    break
+            elif c == b":":
+                if depth == 1:
+                    value_start = at + 1
+            elif c == b",":
+                if depth == 1:
+                    entries.append((key_start, key_end, value_start, at))
+                    key_start = None
+                    value_start = None
+                    expect_key = True
+
+        # decode the keys, which are short reads
+        index = {}
+        for key_start, key_end, value_start, value_end in entries:
+            file.seek(key_start)
+            key = json.loads(file.read(key_end - key_start))
+            index[key] = (value_start, value_end)
+
+    return index
+
+def build_index(filename):
+    """
+    Scan a json file and write its sidecar index.
+    If the sidecar can not be written, the index is only kept in memory.
+    If another writer replaces the file during the scan, the index is 
+    returned but not kept, so it is built again for the new file.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the json file.
+
+    Returns
+    -------
+    index : dict
+        key: (start, end), byte range of the value of each key.
+    """
+
+    logger.info("Building key index: %s", filename)
+    stat = os.stat(filename)
+    index = scan_json_keys(filename)
+
+    if file_identity(os.stat(filename)) != file_identity(stat):
+        logger.info("File replaced while building key index: %s", filename)
+        return index
+
+    sidecar = {
+        "version" : index_version,
+        "mtime" : stat.st_mtime_ns,
+        "size" : stat.st_size,
+        "inode" : stat.st_ino,
+        "keys" : [[key, start, end] for key, (start, end) in index.items()]
+        }
+
+    # written whole, so concurrent readers never see part of the sidecar
+    sidecar_filename = index_filename(filename)
+    temporary = temporary_filename(sidecar_filename)
+    try:
+        with open(temporary, "w") as file:
+            json.dump(sidecar, file)
+        os.replace(temporary, sidecar_filename)
+    except OSError:
+        logger.warning("Could not write key index for %s.", filename)
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    _index_cache[filename] = (file_identity(stat), index)
+
+    return index
+
+def load_index(filename):
+    """
+    Load the key index of a json file.
+    The index is (re)built if it does not exist, or if the json file has
+    been modified since the index was built.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the json file.
+
+    Returns
+    -------
+    index : dict
+        key: (start, end), byte range of the value of each key.
+    """
+
+    stat = os.stat(filename)
+
+    # index already read in by this process
+    if filename in _index_cache:
+        identity, index = _index_cache[filename]
+        if identity == file_identity(stat):
+            return index
+
+    # sidecar index
+    try:
+        with open(index_filename(filename)) as file:
+            sidecar = json.load(file)
+    except (OSError, ValueError):
+        logger.debug("No valid key index for %s.", filename)
+        return build_index(filename)
+
+    if (sidecar.get("version") != index_version
+            or (sidecar.get("mtime"), sidecar.get("size"),
+                sidecar.get("inode")) != file_identity(stat)):
+        logger.info("Key index out of date: %s", filename)
+        return build_index(filename)
+
+    index = {key: (start, end) for key, start, end in sidecar["keys"]}
+    _index_cache[filename] = (file_identity(stat), index)
+
+    return index
+
+def read_indexed_items(filename, keys=None):
+    """
+    Read the values of keys from a json file, using its key index.
+    Only the bytes of the requested values are read and decoded.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the json file.
+    keys : None, list
+        Keys to read. Default will read all keys, one at a time.
+
+    Yields
+    ------
+    key : str
+    item
+    """
+
+    index = load_index(filename)
+    if keys is None:
+        keys = index.keys()
+
+    with open(filename, "rb") as file:
+        for key in keys:
+            start, end = index[key]
+            file.seek(start)
+            yield key, json.loads(file.read(end - start))
+
+def parse_numbers(text):
+    """
+    Parse comma separated json numbers (with NaN, Infinity and null) into
+    a float array.
+    """
+    tokens = [token for token in text.split(b",") if token != b""]
+    tokens = [b"NaN" if token == b"null" else token for token in tokens]
+    try:
+        return np.array(tokens, dtype=bytes).astype(float)
+    except ValueError:
+        raise Exception("Expected only numbers in the value.")
+
+def iter_indexed_values(filename, key, chunk_size=2**20, block_size=2**18):
+    """
+    Read the numbers of a key of a json file, a number or (nested) lists
+    of numbers, as flat chunks, using its key index. The value is read
+    block_size bytes at a time and never decoded as a whole.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the json file.
+    key : str
+        Key of the value.
+    chunk_size : int
+        Most values in a chunk.
+    block_size : int
+        Bytes read at a time.
+
+    Yields
+    ------
+    values : array
+        Flat float array of at most chunk_size values.
+    """
+
+    start, end = load_index(filename)[key]
+    remaining = end - start
+    pending = b""
+
+    with open(filename, "rb") as file:
+        file.seek(start)
+        while remaining > 0:
+            block = file.read(min(block_size, remaining))
+            if len(block) == 0:
+                break
+            remaining -= len(block)
+
+            # the nesting does not matter for flat values
+            text = pending + block.translate(None, b"[] \t\r\n")
+            pending = b""
+            if remaining > 0:
+                # keep a number split across blocks for the next block
+                cut = text.rfind(b",")
+                text, pending = text[:max(cut, 0)], text[cut + 1:]
+
+            values = parse_numbers(text)
+            for chunk_start in range(0, len(values), chunk_size):
+                yield values[chunk_start:chunk_start + chunk_size]
+
+        if pending != b"":
+            yield parse_numbers(pending)
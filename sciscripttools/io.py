@@ -2,12 +2,14 @@
 
 import os
 import logging
-import json
+import collections.abc
 
 from .checks import check_argument_pairs
 from .arguments import process_arguement_pairs
-from .conversion import prepare_json_dictionary
 from .generic import create_dictionary
+from .formats import format_handlers, get_format_handler
+from .locks import file_lock, link_unique_filename, temporary_filename
+from .summaries import write_summary, read_summary, merge_summaries
 
 # setup logging
 logger = logging.getLogger(__name__)
@@ -20,9 +22,14 @@ def prepare_filename(filename, file_format, directory):
     Parameters
     ----------
     filename : str
-        The file name.
-    file_format : str
+        The file name. A suffix which is not a registered format (e.g. 
+        "power_1.5") is part of the name and the format is added, unless 
+        a file of exactly this name exists (e.g. "data.txt"), which is 
+        then used as it is.
+    file_format : None, str
         The file formart / extension.
+        If None, the registered formats are searched in order for an
+        existing file, defaulting to ".json".
     directory : str
         The path for the file.
         
@@ -33,18 +40,121 @@ def prepare_filename(filename, file_format, directory):
         
     """
 
-    # if file format does not exist in filename, add file format
-    file_format_in = os.path.splitext(filename)[1]
-    if len(file_format_in) == 0:
-        filename += file_format
-
     # add directory to filename
     if directory != "":
         filename = os.path.join(directory, filename)
 
+    # if file format does not exist in filename, add file format
+    file_format_in = os.path.splitext(filename)[1]
+    if file_format_in not in format_handlers:
+        if file_format_in != "" and os.path.isfile(filename):
+            # an existing file with its own suffix, e.g. "data.txt"
+            return filename
+
+        if file_format is None:
+            file_format = ".json"
+            for extension in format_handlers.keys():
+                if os.path.exists(filename + extension):
+                    file_format = extension
+                    break
+        filename += file_format
+
     return filename
 
-def load_dictionary(*args, keys=[], directory=""):
+def filename_handler(filename, file_format=None):
+    """
+    Get the format handler for a file, based on its extension.
+    Falls back to the handler for file_format if the extension 
+    is not a registered format (e.g. "data.txt"), or to json.
+
+    Parameters
+    ----------
+    filename : str
+        The file name, with extension.
+    file_format : None, str
+        The file formart / extension to fall back to.
+    """
+
+    extension = os.path.splitext(filename)[1]
+    if extension in format_handlers:
+        return get_format_handler(extension)
+    if file_format is None:
+        return get_format_handler(".json")
+    
+    return get_format_handler(file_format)
+
+def process_filenames(filenames):
+    """
+    Process the filename arguments of the load functions.
+
+    Parameters
+    ----------
+    filenames : tuple
+        A string, multiple strings, or collection of strings with the 
+        filename(s).
+    """
+
+    # if single item in filenames
+    # and not singluar string, filenames is (likely) a list of filenames
+    if len(filenames) == 1 and isinstance(filenames[0], str) == False:
+        logger.debug("Filenames type: %s", type(filenames))
+        filenames = filenames[0]
+    
+    return filenames
+
+class lazy_dictionary(collections.abc.Mapping):
+    """
+    Read-only dictionary of the items in a file, where each item is only
+    read from the file when first accessed, and then kept.
+    Returned by load_dictionary(..., lazy=True).
+
+    The keys are listed when the object is created. For formats with a key
+    index (.pkl, and .json through its sidecar index) accessing an item 
+    reads only the bytes of that item.
+
+    Class Variables
+    ---------------
+    filename : str
+        Full path of the file.
+    handler : format_handler
+        Handler for the format of the file.
+    loaded : dict
+        The items read from the file so far.
+    """
+
+    def __init__(self, filename, handler, keys=None):
+        self.filename = filename
+        self.handler = handler
+        if keys is None:
+            keys = handler.keys(filename, index=True)
+        self._keys = list(keys)
+        self._key_set = set(self._keys)
+        self.loaded = {}
+
+    def __getitem__(self, key):
+        if key not in self.loaded:
+            if key not in self._key_set:
+                raise KeyError(key)
+            logger.debug("Reading item %s from %s", key, self.filename)
+            item = self.handler.load_keys(self.filename, [key], index=True)
+            self.loaded[key] = item[key]
+        return self.loaded[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._key_set
+
+    def __repr__(self):
+        return "lazy_dictionary({!r}, keys={!r}, loaded={!r})".format(
+                    self.filename, self._keys, list(self.loaded.keys()))
+
+def load_dictionary(*args, file_format=None, keys=[], directory="", index=False,
+                                                                lazy=False):
     """
     Load a dictionary(ies) from a file, or multiple files.
     
@@ -54,6 +164,9 @@ def load_dictionary(*args, keys=[], directory=""):
         A string, multiple strings, or collection of strings with the 
         filename(s).
 
+    file_format : None, str, optional
+        The file formart / extension, used for filenames without one.
+        Default will search the registered formats for an existing file.
     keys : [], list, array, str, optional
         Names of items to load from the file(s).
         Default will load all items from the file(s).
@@ -61,6 +174,12 @@ def load_dictionary(*args, keys=[], directory=""):
     directory : "", str, optional
         The path for the file.
         Default will output to the working directory.
+    index : False, Bool, optional
+        Use a key index to read only the given keys, for formats that 
+        support one. For .json files a sidecar index is built on first use.
+    lazy : False, Bool, optional
+        Return lazy_dictionary objects, which read each item from the file
+        on first access. Key indices are always used in lazy mode.
         
     Returns
     -------
@@ -70,21 +189,16 @@ def load_dictionary(*args, keys=[], directory=""):
     Example
     -------
     exp_info = load_dictionary("exp_01_info", keys=["id", "wire"], directory="exps/")
+    exp_info = load_dictionary("exp_01_info", lazy=True)
+    wire = exp_info["wire"] # only the wire item is read from the file
     """ 
 
-    filenames = args
-    file_format = ".json"
-
     keys_arg = keys
     # if a singular string, add it to an array
     if isinstance(keys, str):
         keys_arg = [keys]
     
-    # if single item in filenames
-    # and not singluar string, filenames is (likely) a list of filenames
-    if len(filenames) == 1 and isinstance(filenames[0], str) == False:
-        logger.debug("Filenames type: %s", type(filenames))
-        filenames = filenames[0]
+    filenames = process_filenames(args)
     
     dictionaries = []
     
@@ -92,13 +206,15 @@ def load_dictionary(*args, keys=[], directory=""):
     for filename in filenames:
         logger.info("Reading file: %s", filename)
         filename = prepare_filename(filename, file_format, directory)
-        
-        dictionary = json.load(open(filename))
+        handler = filename_handler(filename, file_format)
         
         # keys to read in
-        if keys_arg != []:
-            keys_arg, data = load_data(filename, keys=keys_arg)
-            dictionary = create_dictionary(keys_arg, data)
+        if lazy:
+            dictionary = lazy_dictionary(filename, handler, keys_arg or None)
+        elif keys_arg == []:
+            dictionary = handler.load(filename)
+        else:
+            dictionary = handler.load_keys(filename, keys_arg, index=index)
         
         dictionaries.append(dictionary)
     
@@ -108,11 +224,12 @@ def load_dictionary(*args, keys=[], directory=""):
     
     return dictionaries
 
-def load_data(*args, file_format=".json", keys=[], directory=""):
+def load_data(*args, file_format=None, keys=[], directory="", index=False):
     """
     Load a item(s) from a file, or multiple files.
     
-    Note: currently only deals with .json files.
+    The format of each file is taken from its extension, so files of 
+    different registered formats can be loaded in one call.
     
     Parameters
     ----------
@@ -120,8 +237,9 @@ def load_data(*args, file_format=".json", keys=[], directory=""):
         A string, multiple strings, or collection of strings with the 
         filename(s).
 
-    file_format = : ".json", str, optional
-        The file formart / extension.
+    file_format = : None, str, optional
+        The file formart / extension, used for filenames without one.
+        Default will search the registered formats for an existing file.
     keys : [], list, array, str, optional
         Names of items to load from the file(s).
         Default will load all items from the file(s).
@@ -129,6 +247,11 @@ def load_data(*args, file_format=".json", keys=[], directory=""):
     directory : "", str, optional
         The path for the file.
         Default will output to the working directory.
+    index : False, Bool, optional
+        Use a key index to read only the given keys, for formats that 
+        support one. For .json files a sidecar index, recording the byte 
+        range of each key's value, is built on first use and rebuilt when 
+        the file is modified.
         
     Returns
     -------
@@ -145,50 +268,19 @@ def load_data(*args, file_format=".json", keys=[], directory=""):
     power, voltages = load_data(["power_output_01", "power_output_02"],
                                     keys=["1.2, 1.4, 2.2"])
     wire_id, _ = load_data("wire_001", keys = "id")
+    wire_id, _ = load_data("wire_001", keys = "id", index = True)
+    power, voltages = load_data("power_output_01.json", "power_output_02.pkl")
     """
 
-    filenames = args
-
     keys_arg = keys
-    # if a singular string, add it to an array
-    if isinstance(keys, str):
-        keys_arg = [keys]
 
     keys = []
     data = []
 
-    # if single item in filenames
-    # and not singluar string, filenames is (likely) a list of filenames
-    if len(filenames) == 1 and isinstance(filenames[0], str) == False:
-        logger.debug("Filenames type: %s", type(filenames))
-        filenames = filenames[0]
-
-    # iterate through filenames and load
-    for filename in filenames:
-        logger.info("Reading file: %s", filename)
-        filename = prepare_filename(filename, file_format, directory)
-
-        keys_in = None
-        data_in = None
-
-        if file_format == ".json":
-            data_in = json.load(open(filename))
-
-            # sort which keys to read in
-            if keys_arg == []:
-                # default to read in all keys
-                keys_in = data_in.keys()
-            else:
-                # user given keys
-                keys_in = keys_arg
-
-            for key in keys_in:
-                keys.append(key)
-                data.append(data_in[key])
-            
-        else: 
-            raise Exception(
-                    "Only the .json file format is currently supported.")
+    for key, item in iter_data(*args, file_format=file_format, keys=keys_arg, 
+                                            directory=directory, index=index):
+        keys.append(key)
+        data.append(item)
 
     # if single key loaded, remove outter container
     if len(data) == 1:
@@ -197,7 +289,48 @@ def load_data(*args, file_format=".json", keys=[], directory=""):
 
     return keys, data
 
-def load_item(*args, file_format=".json", keys=[], directory=""):
+def iter_data(*args, file_format=None, keys=[], directory="", index=False):
+    """
+    Iterate over the item(s) in a file, or multiple files.
+    Items are read one at a time, where the file format allows it, so the
+    whole of the data does not need to be held in memory.
+
+    See load_data() for more information on the arguments.
+
+    Yields
+    ------
+    key : str
+        The key of the item.
+    item
+        The data of the item.
+
+    Example
+    -------
+    for key, power in iter_data(filenames, keys = "power"):
+        total += np.sum(power)
+    """
+
+    keys_arg = keys
+    # if a singular string, add it to an array
+    if isinstance(keys, str):
+        keys_arg = [keys]
+    
+    # sort which keys to read in, default to read in all keys
+    if keys_arg == []:
+        keys_arg = None
+
+    filenames = process_filenames(args)
+
+    # iterate through filenames and load
+    for filename in filenames:
+        logger.info("Reading file: %s", filename)
+        filename = prepare_filename(filename, file_format, directory)
+        handler = filename_handler(filename, file_format)
+
+        for key, item in handler.iter_items(filename, keys_arg, index=index):
+            yield key, item
+
+def load_item(*args, file_format=None, keys=[], directory="", index=False):
     """
     Load a item(s) from a file, or multiple files.
     Similar to the function load_data(), but this one does not 
@@ -217,15 +350,17 @@ def load_item(*args, file_format=".json", keys=[], directory=""):
 
     """
     key, item = load_data(args, file_format=file_format, 
-                          keys=keys, directory=directory)
+                          keys=keys, directory=directory, index=index)
     
     return item
 
-def save_data(*args, file_format=".json", directory=""):
+def save_data(*args, file_format=".json", directory="", lock=False, 
+                                                unique=False, summary=False):
     """
     Save a variable(s) to a file(s).
-    
-    Note: currently only deals with .json files.
+
+    Each file is written to a temporary file in the same directory and then 
+    moved into place, so readers never see a partially written file.
     
     Parameters
     ----------
@@ -234,50 +369,191 @@ def save_data(*args, file_format=".json", directory=""):
         Multiple pairs can be inputted.
 
     file_format = : ".json", str, optional
-        The file formart / extension.
+        The file formart / extension, used for filenames without one.
+        Any registered format can be used, e.g. ".json" or ".pkl".
     directory : ".", str, optional
         The path for the file, which will be created if it does not exist.
         Default will output to the working directory.
+    lock : False, Bool, optional
+        Hold an exclusive advisory lock (filename + ".lock") while writing,
+        so concurrent writers to the same file take turns.
+    unique : False, Bool, optional
+        Never overwrite, and do not lock: if the filename is taken, 
+        a counter is added, "name_1.json", "name_2.json", ...
+        Safe for many writers saving into the same directory at once;
+        the file only appears at its name once complete.
+    summary : False, Bool, optional
+        Also write a summary of each numeric item (filename + ".summary"):
+        count, NaN count, minimum, maximum, smallest positive value, and 
+        coarse quantiles, read by load_summary() to set up plots without 
+        reading the data. The summary records the file it was made from, 
+        so a summary of data replaced by another writer is not used.
+
+    Returns
+    -------
+    0, or filenames : list
+        With unique=True, the list of the filenames written.
         
     Example
     -------
     save_data("wire_001", wire, dir="data/20180903")
     save_data("power_output_01", output_01,
                 "power_output_02", output_02)
+    save_data("power_output_03", output_03, file_format=".pkl")
+    save_data("summary", summary, directory="data/", lock=True)
+    filenames = save_data("run", run, directory="data/", unique=True)
+    save_data("field", field, summary=True)
     """
     
     check_argument_pairs(args)
 
-    # if the directory does not exist, create it
-    if directory != "" and os.path.exists(directory) == False:
-        logger.info("Creating directory: %s", directory)
-        os.makedirs(directory)
+    if lock and unique:
+        raise Exception("Use one of the lock or unique arguments.")
+
+    # create the directory if it does not exist
+    # (safe if another process creates it at the same time)
+    if directory != "":
+        logger.debug("Creating directory: %s", directory)
+        os.makedirs(directory, exist_ok=True)
 
     # create name and data pairs
     pairs = process_arguement_pairs(args)
 
+    filenames = []
+
     # iterate through pairs and output
     for pair in pairs:
         filename = pair[0]
         data = pair[1]
         
         filename = prepare_filename(filename, file_format, directory)
+        handler = filename_handler(filename, file_format)
         logger.info("Saving file: %s", filename)
         
-        if file_format == ".json":
-            # if data is not a dictionary already, create a dictionary
-            if isinstance(data, dict) == False:
-                data = create_dictionary("d", data)
-            
-            # convert dictionary items for writing to a json file
-            prepare_json_dictionary(data)
-
-            # output json file
-            with open(filename,'w') as file :
-                json.dump(data, file)
-
-        else: 
-            raise Exception(
-                    "Only the .json file format is currently supported.")
+        # if data is not a dictionary already, create a dictionary
+        if isinstance(data, dict) == False:
+            data = create_dictionary("d", data)
+        
+        if lock:
+            with file_lock(filename):
+                filename, stat = write_file(handler, filename, data)
+                if summary:
+                    write_summary(filename, data, stat)
+        else:
+            filename, stat = write_file(handler, filename, data, unique)
+            if summary:
+                write_summary(filename, data, stat)
+
+        filenames.append(filename)
     
-    return 0
\ No newline at end of file
+    if unique:
+        return filenames
+
+    return 0
+
+def load_summary(*args, file_format=None, keys=[], directory="", merge=False):
+    """
+    Load the summaries of the items in a file, or multiple files, written 
+    with save_data(..., summary=True), without reading the data.
+    A file without an up to date summary is read once to summarise it.
+
+    Parameters
+    ----------
+    *args : str, multiple str, list of str, array of str etc.
+        A string, multiple strings, or collection of strings with the 
+        filename(s).
+    file_format : None, str, optional
+        The file formart / extension, used for filenames without one.
+    keys : [], list, array, str, optional
+        Names of items to return. Default will return all numeric items.
+    directory : "", str, optional
+        The path for the file.
+    merge : False, Bool, optional
+        Combine the summaries of each key across the files.
+
+    Returns
+    -------
+    summaries : dict, list
+        key: summary, or a list of them for multiple files. Each summary
+        is a dictionary of count, nan_count, min, max, positive_min, and
+        quantiles. With merge, a single dictionary.
+
+    Example
+    -------
+    summary = load_summary("field")["values"]
+    summaries = load_summary(filenames, keys="power", merge=True)
+    """
+
+    keys_arg = keys
+    if isinstance(keys, str):
+        keys_arg = [keys]
+
+    filenames = process_filenames(args)
+
+    summaries = []
+    for filename in filenames:
+        filename = prepare_filename(filename, file_format, directory)
+        handler = filename_handler(filename, file_format)
+        file_summaries = read_summary(filename, handler)
+
+        if keys_arg != []:
+            missing = [key for key in keys_arg if key not in file_summaries]
+            if len(missing) > 0:
+                raise Exception("No numeric summary of {} in {}.".format(
+                                                ", ".join(missing), filename))
+            file_summaries = {key : file_summaries[key] for key in keys_arg}
+        summaries.append(file_summaries)
+
+    if merge:
+        keys = []
+        for file_summaries in summaries:
+            keys.extend(key for key in file_summaries if key not in keys)
+        return {key : merge_summaries([s[key] for s in summaries if key in s])
+                    for key in keys}
+
+    # if single file loaded, remove outter container
+    if len(summaries) == 1:
+        summaries = summaries[0]
+
+    return summaries
+
+def write_file(handler, filename, data, unique=False):
+    """
+    Write a file through a temporary file, which is moved into place once
+    complete.
+
+    Parameters
+    ----------
+    handler : format_handler
+        Handler for the format of the file.
+    filename : str
+        Full path of the file.
+    data : dict
+        Dictionary to write.
+    unique : False, Bool
+        Never overwrite, see link_unique_filename().
+
+    Returns
+    -------
+    filename : str
+        Full path of the file written.
+    stat : os.stat_result
+        Of the file written, to tell it apart from a file which later
+        replaces it.
+    """
+
+    temporary = temporary_filename(filename)
+    try:
+        handler.save(temporary, data)
+        stat = os.stat(temporary)
+        if unique:
+            filename = link_unique_filename(temporary, filename)
+            logger.info("Unique file: %s", filename)
+        else:
+            os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    return filename, stat
@@ -0,0 +1,291 @@
+# LaTeX Text Helpers
+#
+# Preamble, TeX cache and warm-up for figures using text.usetex,
+# and a mathtext translation of siunitx units for fast draft figures.
+
+import os
+import re
+import shutil
+import logging
+import concurrent.futures
+from pathlib import Path
+
+import matplotlib
+from matplotlib.texmanager import TexManager
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+# amsmath # maths package
+# siunitx     # si units
+# bm           # maths bold symbols
+latex_preamble = r"\usepackage{amsmath} \usepackage{siunitx} \usepackage{bm}"
+
+def latex_available():
+    """
+    Check if latex (and dvipng, used for some outputs) can be found.
+    """
+    return shutil.which("latex") is not None
+
+def set_tex_cache(directory):
+    """
+    Set the directory where matplotlib keeps rendered TeX (dvi) files.
+
+    Matplotlib caches the output of every LaTeX run on disk, keyed on the
+    text, font size, preamble and font settings, and writes new entries
+    atomically, so one directory can be shared between processes, and
+    between runs, e.g. a directory on a shared file system for cluster jobs.
+    Must be called in each process, before figures are drawn.
+
+    Parameters
+    ----------
+    directory : str
+        Cache directory, created if it does not exist.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    # the cache directory attribute has changed name between versions
+    if hasattr(TexManager, "_cache_dir"):
+        TexManager._cache_dir = Path(directory)
+    else:
+        TexManager.texcache = directory
+
+    logger.info("TeX cache directory: %s", directory)
+    return 0
+
+def get_tex_cache():
+    """
+    The directory where matplotlib keeps rendered TeX (dvi) files.
+    """
+    if hasattr(TexManager, "_cache_dir"):
+        return str(TexManager._cache_dir)
+    return TexManager.texcache
+
+def render_tex(tex, font_size):
+    """
+    Render a string with LaTeX into the TeX cache, if not already there.
+    Used by warm_up(), and run within each worker process.
+    """
+    TexManager().make_dvi(tex, font_size)
+    return tex
+
+def warm_up(labels=(), font_size=None, workers=None, cache_directory=None):
+    """
+    Fill the TeX cache with the given labels, before drawing figures.
+
+    The first LaTeX run also loads the standard preamble packages, so later
+    runs (including in other processes sharing the cache) start warm.
+    Labels already in the cache are skipped.
+
+    Parameters
+    ----------
+    labels : list of str
+        Text to render, as it will be given to matplotlib,
+        e.g. sf.latex_unit("\\meter") or a full axis label.
+    font_size : None, float
+        Font size. Default is the current matplotlib font size.
+    workers : None, int
+        Number of worker processes to render with.
+        Default will render in this process.
+    cache_directory : None, str
+        Shared cache directory, see set_tex_cache().
+
+    Returns
+    -------
+    n : int
+        Number of labels rendered, including the preamble warm up.
+
+    Example
+    -------
+    standard_font(font_size=fig_params.font_size)
+    warm_up(["Power", "Time", sf.latex_unit("\\watt")])
+    """
+
+    if not latex_available():
+        raise Exception("LaTeX is required to warm up the TeX cache.")
+
+    if cache_directory is not None:
+        set_tex_cache(cache_directory)
+    if font_size is None:
+        font_size = matplotlib.rcParams["font.size"]
+
+    # a simple string first, which loads the preamble packages
+    labels = ["0"] + list(dict.fromkeys(labels))
+
+    if workers is None:
+        for label in labels:
+            render_tex(label, font_size)
+        return len(labels)
+
+    # workers use the same rc settings, so the cache keys match
+    with concurrent.futures.ProcessPoolExecutor(
+                    workers, initializer=_initialise_worker,
+                    initargs=(dict(matplotlib.rcParams), get_tex_cache())) as executor:
+        list(executor.map(render_tex, labels, [font_size]*len(labels)))
+
+    return len(labels)
+
+def _initialise_worker(rc_params, cache_directory):
+    import warnings
+    rc_params.pop("backend", None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        matplotlib.rcParams.update(rc_params)
+    set_tex_cache(cache_directory)
+
+# siunitx to mathtext ---------------------------------------------------------
+
+si_prefixes = {
+    "yocto" : "y", "zepto" : "z", "atto" : "a", "femto" : "f", "pico" : "p",
+    "nano" : "n", "micro" : "\\mu", "milli" : "m", "centi" : "c", "deci" : "d",
+    "deca" : "da", "deka" : "da", "hecto" : "h", "kilo" : "k", "mega" : "M",
+    "giga" : "G", "tera" : "T", "peta" : "P", "exa" : "E", "zetta" : "Z",
+    "yotta" : "Y",
+}
+
+si_units = {
+    "metre" : "m", "meter" : "m", "second" : "s", "gram" : "g",
+    "kilogram" : "kg", "ampere" : "A", "kelvin" : "K", "mole" : "mol",
+    "candela" : "cd", "hertz" : "Hz", "newton" : "N", "pascal" : "Pa",
+    "joule" : "J", "watt" : "W", "coulomb" : "C", "volt" : "V", "farad" : "F",
+    "ohm" : "\\Omega", "siemens" : "S", "weber" : "Wb", "tesla" : "T",
+    "henry" : "H", "lumen" : "lm", "lux" : "lx", "becquerel" : "Bq",
+    "gray" : "Gy", "sievert" : "Sv", "katal" : "kat", "radian" : "rad",
+    "steradian" : "sr", "minute" : "min", "hour" : "h", "day" : "d",
+    "litre" : "L", "liter" : "L", "tonne" : "t", "electronvolt" : "eV",
+    "dalton" : "Da", "bar" : "bar", "angstrom" : "\\AA", "barn" : "b",
+    "bel" : "B", "decibel" : "dB", "neper" : "Np", "hectare" : "ha",
+    "atomicmassunit" : "u", "percent" : "\\%", "astronomicalunit" : "au",
+    "degreeCelsius" : "\\degree\\mathrm{C}", "degree" : "\\degree",
+    "arcminute" : "\\prime", "arcsecond" : "\\prime\\prime",
+}
+
+# common siunitx abbreviations, (prefix, unit)
+si_abbreviations = {
+    "m" : ("", "m"), "s" : ("", "s"), "g" : ("", "g"), "kg" : ("k", "g"),
+    "fm" : ("f", "m"), "pm" : ("p", "m"), "nm" : ("n", "m"),
+    "um" : ("\\mu", "m"), "mm" : ("m", "m"), "cm" : ("c", "m"),
+    "dm" : ("d", "m"), "km" : ("k", "m"),
+    "fs" : ("f", "s"), "ps" : ("p", "s"), "ns" : ("n", "s"),
+    "us" : ("\\mu", "s"), "ms" : ("m", "s"),
+    "mg" : ("m", "g"), "ug" : ("\\mu", "g"),
+    "Hz" : ("", "Hz"), "kHz" : ("k", "Hz"), "MHz" : ("M", "Hz"),
+    "GHz" : ("G", "Hz"), "THz" : ("T", "Hz"),
+    "A" : ("", "A"), "pA" : ("p", "A"), "nA" : ("n", "A"),
+    "uA" : ("\\mu", "A"), "mA" : ("m", "A"), "kA" : ("k", "A"),
+    "V" : ("", "V"), "mV" : ("m", "V"), "kV" : ("k", "V"),
+    "W" : ("", "W"), "nW" : ("n", "W"), "uW" : ("\\mu", "W"),
+    "mW" : ("m", "W"), "kW" : ("k", "W"), "MW" : ("M", "W"),
+    "GW" : ("G", "W"),
+    "J" : ("", "J"), "kJ" : ("k", "J"), "eV" : ("", "eV"),
+    "meV" : ("m", "eV"), "keV" : ("k", "eV"), "MeV" : ("M", "eV"),
+    "GeV" : ("G", "eV"), "TeV" : ("T", "eV"),
+    "N" : ("", "N"), "mN" : ("m", "N"), "kN" : ("k", "N"),
+    "MN" : ("M", "N"),
+    "Pa" : ("", "Pa"), "kPa" : ("k", "Pa"), "MPa" : ("M", "Pa"),
+    "GPa" : ("G", "Pa"),
+    "K" : ("", "K"), "mK" : ("m", "K"),
+    "mol" : ("", "mol"), "mmol" : ("m", "mol"), "umol" : ("\\mu", "mol"),
+    "L" : ("", "L"), "l" : ("", "l"), "mL" : ("m", "L"), "ml" : ("m", "l"),
+    "uL" : ("\\mu", "L"), "ul" : ("\\mu", "l"),
+    "C" : ("", "C"), "F" : ("", "F"), "T" : ("", "T"), "H" : ("", "H"),
+}
+
+_si_token = re.compile(r"\\([a-zA-Z]+)\s*(?:\{([^}]*)\})?|([^\\]+)")
+
+def _si_symbol(symbol):
+    """
+    Upright mathtext for a unit symbol; symbols with commands stay as they are.
+    """
+    if symbol == "" or "\\" in symbol:
+        return symbol
+    return "\\mathrm{" + symbol + "}"
+
+def si_to_mathtext(unit):
+    """
+    Translate a siunitx unit into mathtext, for figures without LaTeX.
+
+    Supports the SI prefixes and units, common abbreviations (e.g. \\mm,
+    \\kHz), \\per, \\square, \\cubic, \\squared, \\cubed and \\tothe{n}.
+    Follows the siunitx default of writing \\per as a negative power.
+    Unknown commands are written as upright text.
+
+    Parameters
+    ----------
+    unit : str
+        String with unit as defined with the latex SI package.
+        E.g. "\\meter\\per\\second"
+
+    Returns
+    -------
+    mathtext : str
+        E.g. "\\mathrm{m}\\,\\mathrm{s}^{-1}", without $ signs.
+    """
+
+    units = [] # [prefix, symbol, power]
+    prefix = ""
+    per = False
+    pre_power = None
+
+    def add(symbol, unit_prefix=""):
+        nonlocal prefix, per, pre_power
+        power = 1 if pre_power is None else pre_power
+        if per:
+            power = -power
+        units.append([prefix + unit_prefix, symbol, power])
+        prefix = ""
+        per = False
+        pre_power = None
+
+    def set_power(power):
+        if len(units) == 0:
+            return
+        sign = -1 if units[-1][2] < 0 else 1
+        units[-1][2] = sign * power
+
+    for command, argument, text in _si_token.findall(unit):
+        if text:
+            text = text.strip()
+            if text != "":
+                add(text)
+        elif command in si_prefixes:
+            prefix += si_prefixes[command]
+        elif command in si_units:
+            add(si_units[command])
+        elif command in si_abbreviations:
+            unit_prefix, symbol = si_abbreviations[command]
+            add(symbol, unit_prefix)
+        elif command == "per":
+            per = True
+        elif command == "square":
+            pre_power = 2
+        elif command == "cubic":
+            pre_power = 3
+        elif command == "squared":
+            set_power(2)
+        elif command == "cubed":
+            set_power(3)
+        elif command == "tothe":
+            power = argument.strip()
+            try:
+                power = int(power)
+            except ValueError:
+                power = float(power)
+            set_power(power)
+        else:
+            logger.warning("Unknown siunitx command \\%s, written as text.",
+                                                                    command)
+            add(command)
+
+    parts = []
+    for unit_prefix, symbol, power in units:
+        if "\\" in unit_prefix or "\\" in symbol:
+            part = _si_symbol(unit_prefix) + _si_symbol(symbol)
+        else:
+            part = _si_symbol(unit_prefix + symbol)
+        if power != 1:
+            part = "{" + part + "}^{" + str(power) + "}"
+        parts.append(part)
+
+    return "\\,".join(parts)
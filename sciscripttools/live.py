@@ -0,0 +1,259 @@
+# Live Figures
+#
+# Update the data of a standard figure quickly, for watching streaming
+# data, by blitting the data lines onto a cached background.
+
+import logging
+
+import numpy as np
+import matplotlib.lines
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+class live_figure:
+    """
+    A standard_figure that updates its data lines with blitting.
+
+    The figure background (axes, ticks, labels, LaTeX text) is drawn once
+    and cached; each update restores the background and draws only the
+    data lines. New data is appended into a preallocated buffer of a
+    fixed capacity; when it is full, its line is frozen into the cached
+    background and a new line continues from its last point, so the cost
+    of an append and an update does not grow with the length of the run.
+    The axes are only rescaled (with a full redraw) when data goes outside
+    of the current limits.
+
+    Class Variables
+    ---------------
+    sf : standard_figure
+        The standard figure being updated.
+    margin : float
+        Fractional margin added around the data when rescaling.
+    lines : list
+        The live lines, see add_line(). Each has the line being appended
+        to, "line", and the frozen lines before it, "chunks".
+
+    Methods
+    -------
+    add_line(self, ax, capacity=10000, **kwargs)
+        Add a line to be updated with new data.
+    append(self, line, x, y)
+        Append data onto a line.
+    freeze(self, entry)
+        Freeze a full line into the background and start a new one.
+    update(self)
+        Redraw the lines with blitting, rescaling if needed.
+    redraw(self)
+        Redraw the whole figure and cache the background.
+    rescale(self)
+        Expand the limits of any axes whose data is outside of them.
+
+    Example
+    -------
+    sf = standard_figure(fig, ax, fig_params)
+    live = live_figure(sf)
+    line = live.add_line(ax)
+    plt.show(block=False)
+    while running:
+        x, y = acquire()
+        live.append(line, x, y)
+        live.update()
+    """
+
+    def __init__(self, sf, margin=0.1):
+        self.sf = sf
+        self.fig = sf.fig
+        self.canvas = sf.fig.canvas
+        self.margin = margin
+        self.lines = []
+        self.background = None
+
+        # re-cache the background after any full draw, e.g. a window resize
+        self.cid = self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def add_line(self, ax, capacity=10000, **kwargs):
+        """
+        Add a line to be updated with new data.
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single axis.
+        capacity : int
+            Number of points to preallocate, the most points drawn on 
+            each update. When full, the points are frozen into the 
+            background and a new buffer is started.
+        **kwargs
+            Passed onto ax.plot().
+
+        Returns
+        -------
+        line : int
+            Index of the line, for append().
+        """
+        line, = ax.plot([], [], animated=True, **kwargs)
+        # at least two points, so each new buffer continues the last one
+        capacity = max(int(capacity), 2)
+        self.lines.append({
+            "ax" : ax,
+            "line" : line,
+            "chunks" : [],
+            "x" : np.empty(capacity),
+            "y" : np.empty(capacity),
+            "n" : 0,
+            "bounds" : [np.inf, -np.inf, np.inf, -np.inf], # x and y min, max
+            })
+        self.background = None
+        return len(self.lines) - 1
+
+    def append(self, line, x, y):
+        """
+        Append data onto a line. Drawn on the next update().
+
+        Parameters
+        ----------
+        line : int
+            Index of the line from add_line().
+        x : float, array
+        y : float, array
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if len(x) != len(y):
+            raise Exception("x and y need to be the same length.")
+
+        entry = self.lines[line]
+
+        # keep track of the data bounds, for rescaling
+        bounds = entry["bounds"]
+        if np.any(np.isfinite(x)) and np.any(np.isfinite(y)):
+            bounds[0] = min(bounds[0], np.nanmin(x))
+            bounds[1] = max(bounds[1], np.nanmax(x))
+            bounds[2] = min(bounds[2], np.nanmin(y))
+            bounds[3] = max(bounds[3], np.nanmax(y))
+
+        # fill the buffer, freezing it and starting another when full
+        start = 0
+        while start < len(x):
+            if entry["n"] == len(entry["x"]):
+                self.freeze(entry)
+            n = entry["n"]
+            stop = min(start + len(entry["x"]) - n, len(x))
+            entry["x"][n:n + stop - start] = x[start:stop]
+            entry["y"][n:n + stop - start] = y[start:stop]
+            entry["n"] = n + stop - start
+            start = stop
+
+        # set_data copies the points, at most the capacity of the buffer
+        n = entry["n"]
+        entry["line"].set_data(entry["x"][:n], entry["y"][:n])
+        return 0
+
+    def freeze(self, entry):
+        """
+        Freeze the full line of an entry into the cached background, and
+        start a new line from its last point.
+        """
+        full = entry["line"]
+        full.set_data(entry["x"].copy(), entry["y"].copy())
+        full.set_animated(False)
+        entry["chunks"].append(full)
+
+        # add the frozen line to the cached background, drawn in full redraws
+        if self.background is not None:
+            self.canvas.restore_region(self.background)
+            entry["ax"].draw_artist(full)
+            self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+        line = matplotlib.lines.Line2D([], [])
+        line.update_from(full)
+        line.set_label("_" + full.get_label().lstrip("_"))
+        line.set_animated(True)
+        entry["ax"].add_line(line)
+        entry["line"] = line
+
+        entry["x"][0] = entry["x"][-1]
+        entry["y"][0] = entry["y"][-1]
+        entry["n"] = 1
+        return 0
+
+    def on_draw(self, event):
+        """
+        Cache the background after a full draw.
+        """
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for entry in self.lines:
+            entry["ax"].draw_artist(entry["line"])
+        return 0
+
+    def redraw(self):
+        """
+        Redraw the whole figure and cache the background.
+        """
+        self.canvas.draw()
+        if self.background is None:
+            # backends which do not emit draw events
+            self.on_draw(None)
+        return 0
+
+    def rescale(self):
+        """
+        Expand the limits of any axes whose data is outside of them.
+
+        Returns
+        -------
+        rescaled : Bool
+            True if any limits changed.
+        """
+        rescaled = False
+
+        bounds = {}
+        for entry in self.lines:
+            limits = entry["bounds"]
+            if not np.all(np.isfinite(limits)):
+                continue
+            ax = entry["ax"]
+            if ax in bounds:
+                old = bounds[ax]
+                limits = (min(old[0], limits[0]), max(old[1], limits[1]),
+                          min(old[2], limits[2]), max(old[3], limits[3]))
+            bounds[ax] = limits
+
+        for ax, (xmin, xmax, ymin, ymax) in bounds.items():
+            for (dmin, dmax), (lmin, lmax), set_lim in [
+                        ((xmin, xmax), ax.get_xlim(), ax.set_xlim),
+                        ((ymin, ymax), ax.get_ylim(), ax.set_ylim)]:
+                low, high = min(lmin, lmax), max(lmin, lmax)
+                if dmin < low or dmax > high:
+                    span = dmax - dmin
+                    if span == 0:
+                        span = abs(dmax) if dmax != 0 else 1.0
+                    pad = self.margin * span
+                    set_lim(min(low, dmin - pad), max(high, dmax + pad))
+                    rescaled = True
+
+        return rescaled
+
+    def update(self):
+        """
+        Redraw the lines with blitting, rescaling (with a full redraw) only
+        when data has gone outside of the current limits.
+        """
+        if self.rescale() or self.background is None:
+            self.redraw()
+        else:
+            self.canvas.restore_region(self.background)
+            for entry in self.lines:
+                entry["ax"].draw_artist(entry["line"])
+            self.canvas.blit(self.fig.bbox)
+
+        self.canvas.flush_events()
+        return 0
+
+    def disconnect(self):
+        """
+        Stop caching the background on draw events.
+        """
+        self.canvas.mpl_disconnect(self.cid)
+        return 0
@@ -0,0 +1,151 @@
+# File Locking
+#
+# Helpers for processes writing into the same directory at once.
+
+import os
+import time
+import uuid
+import logging
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, fall back to lock files
+    fcntl = None
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+lock_extension = ".lock"
+
+@contextlib.contextmanager
+def file_lock(filename, timeout=None, poll_interval=0.05):
+    """
+    Hold an exclusive advisory lock for a file, for use in a with statement.
+
+    The lock is taken on a separate file, filename + ".lock", which is left
+    in place afterwards. On Linux (and other systems with fcntl) this is an
+    flock() lock, which is released if the process dies. Otherwise the lock
+    file is created exclusively and removed on release.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the file to lock.
+    timeout : None, float
+        Seconds to wait for the lock before raising an exception.
+        Default will wait forever.
+    poll_interval : float
+        Seconds between attempts to take the lock.
+
+    Example
+    -------
+    with file_lock("data/results.json"):
+        ... # write the file
+    """
+
+    lock_filename = filename + lock_extension
+    start = time.monotonic()
+
+    def wait():
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise Exception("Timed out waiting for lock: {}".format(lock_filename))
+        time.sleep(poll_interval)
+
+    if fcntl is not None:
+        descriptor = os.open(lock_filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    wait()
+            yield lock_filename
+        finally:
+            # closing the file releases the lock
+            os.close(descriptor)
+        return
+
+    while True:
+        try:
+            descriptor = os.open(lock_filename,
+                                 os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+            break
+        except FileExistsError:
+            wait()
+    try:
+        yield lock_filename
+    finally:
+        os.close(descriptor)
+        os.remove(lock_filename)
+
+def unique_candidates(filename):
+    """
+    The filename, then with a counter added before the extension,
+    "name_1.json", "name_2.json", ...
+    """
+    root, extension = os.path.splitext(filename)
+    yield filename
+    counter = 0
+    while True:
+        counter += 1
+        yield "{}_{}{}".format(root, counter, extension)
+
+def link_unique_filename(temporary, filename):
+    """
+    Move a complete file into place at a filename no other file has,
+    without a lock.
+
+    Each candidate name (see unique_candidates()) is tried with a hard
+    link, which fails if the name exists, so the file only appears once
+    complete and never replaces another. On file systems without hard
+    links, the name is reserved by creating it exclusively and the file
+    moved over it, so the name is briefly an empty file.
+
+    Parameters
+    ----------
+    temporary : str
+        Full path of the complete file, removed once moved.
+    filename : str
+        Full path of the wanted file.
+
+    Returns
+    -------
+    filename : str
+        Full path the file was moved to.
+    """
+
+    for candidate in unique_candidates(filename):
+        try:
+            os.link(temporary, candidate)
+        except FileExistsError:
+            continue
+        except OSError:
+            # no hard links, e.g. some network and FAT file systems
+            break
+        os.remove(temporary)
+        return candidate
+
+    for candidate in unique_candidates(filename):
+        try:
+            descriptor = os.open(candidate,
+                                 os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            continue
+        os.close(descriptor)
+        try:
+            os.replace(temporary, candidate)
+        except BaseException:
+            os.remove(candidate)
+            raise
+        return candidate
+
+def temporary_filename(filename):
+    """
+    A unique temporary filename in the same directory as a file,
+    so it can be moved into place with os.replace().
+    """
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, ".{}.{}.tmp".format(name, uuid.uuid4().hex))
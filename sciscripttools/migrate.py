@@ -0,0 +1,343 @@
+# Archive Migration
+#
+# Command line tool to convert files written by save_data() to another
+# registered file format, e.g. .json to .pkl.
+#
+# sciscripttools-migrate data/ --format .pkl --workers 8
+
+import os
+import copy
+import json
+import time
+import logging
+import argparse
+import concurrent.futures
+
+import numpy as np
+
+from .io import load_dictionary, save_data
+from .conversion import dictionary_items_to_numpy_arrays
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+journal_default = ".sciscripttools_migrate.jsonl"
+
+def find_files(root, file_format=".json"):
+    """
+    Walk a directory tree for files of a given format.
+
+    Parameters
+    ----------
+    root : str
+        Top directory to walk.
+    file_format : ".json", str
+        The file format / extension of the files to find.
+
+    Yields
+    ------
+    filename : str
+        Full path of each file, in sorted order.
+    """
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] == file_format:
+                yield os.path.join(directory, filename)
+
+def values_equal(a, b):
+    """
+    Check two loaded items are equal.
+    Array-like items must have the same shape and dtype, and equal values;
+    NaNs are treated as equal.
+
+    Recursive function: dictionaries within dictionaries are also compared.
+    """
+
+    if isinstance(a, dict) or isinstance(b, dict):
+        if not (isinstance(a, dict) and isinstance(b, dict)):
+            return False
+        if list(a.keys()) != list(b.keys()):
+            return False
+        return all(values_equal(a[key], b[key]) for key in a.keys())
+
+    if isinstance(a, str) or isinstance(b, str):
+        return a == b
+
+    try:
+        a_array = np.asarray(a)
+        b_array = np.asarray(b)
+    except ValueError:
+        logger.debug("Probably not an array-like item.")
+        try:
+            if len(a) != len(b):
+                return False
+            return all(values_equal(x, y) for x, y in zip(a, b))
+        except TypeError:
+            return bool(np.all(a == b))
+
+    # object arrays (e.g. [1, None]) are compared item by item,
+    # as == gives an array rather than a Bool
+    if a_array.dtype == object or b_array.dtype == object:
+        if a_array.shape != b_array.shape:
+            return False
+        if a_array.ndim == 0:
+            a_item = a_array.item()
+            b_item = b_array.item()
+            if isinstance(a_item, (dict, str)) or isinstance(b_item, (dict, str)):
+                return values_equal(a_item, b_item)
+            return bool(np.all(a_item == b_item))
+        return all(values_equal(x, y) for x, y in zip(a_array.flat, b_array.flat))
+
+    if a_array.shape != b_array.shape or a_array.dtype != b_array.dtype:
+        return False
+
+    equal_nan = np.issubdtype(a_array.dtype, np.inexact)
+    return bool(np.array_equal(a_array, b_array, equal_nan=equal_nan))
+
+def convert_file(filename, file_format=".pkl", verify=True, remove=False):
+    """
+    Convert a single file to another file format.
+
+    Array-like items are converted to numpy arrays before saving, so that
+    binary formats can store them natively. The new file is written to a
+    temporary name and moved into place, so an interrupted conversion never
+    leaves a partial file.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the file to convert.
+    file_format : ".pkl", str
+        The file format / extension to convert to.
+    verify : True, Bool
+        Load the converted file and check it against the original.
+    remove : False, Bool
+        Remove the original file once converted (and verified).
+
+    Returns
+    -------
+    result : dict
+        source, target, status ("ok" or "failed"), error, file sizes, and
+        load times of the original and converted file.
+    """
+
+    target = os.path.splitext(filename)[0] + file_format
+    result = {"source" : filename, "target" : target, "status" : "failed",
+              "error" : None}
+
+    try:
+        start = time.perf_counter()
+        original = load_dictionary(filename)
+        result["source_load_time"] = time.perf_counter() - start
+        result["source_size"] = os.path.getsize(filename)
+
+        data = copy.deepcopy(original)
+        dictionary_items_to_numpy_arrays(data)
+
+        # write under a temporary name, then move into place
+        directory, name = os.path.split(target)
+        # ending with the format, so save_data() does not add it again
+        temporary = os.path.join(directory, ".{}.{}.tmp{}".format(name, 
+                                                os.getpid(), file_format))
+        save_data(temporary, data, file_format=file_format)
+        os.replace(temporary, target)
+        result["target_size"] = os.path.getsize(target)
+
+        if verify:
+            start = time.perf_counter()
+            converted = load_dictionary(target)
+            result["target_load_time"] = time.perf_counter() - start
+
+            if not values_equal(original, converted):
+                os.remove(target)
+                raise Exception("Converted file does not match the original.")
+
+        if remove:
+            os.remove(filename)
+
+        result["status"] = "ok"
+
+    except Exception as error:
+        logger.warning("Failed to convert %s: %s", filename, error)
+        result["error"] = str(error)
+
+    return result
+
+def read_journal(journal):
+    """
+    Read the filenames already converted from a migration journal.
+    """
+    done = set()
+    if not os.path.exists(journal):
+        return done
+
+    with open(journal) as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # likely a line cut short by an interruption
+                continue
+            if result.get("status") == "ok":
+                done.add(result["source"])
+
+    return done
+
+def end_journal_line(journal):
+    """
+    Finish a line of a migration journal cut short by an interruption, so
+    the next result starts on a line of its own.
+    """
+    if not os.path.exists(journal) or os.path.getsize(journal) == 0:
+        return 0
+
+    with open(journal, "rb+") as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) != b"\n":
+            file.write(b"\n")
+    return 0
+
+def migrate(root, file_format=".pkl", source_format=".json", workers=None,
+                    verify=True, remove=False, journal=None):
+    """
+    Convert a directory tree of files to another file format, in parallel.
+
+    Each result is appended to a journal file as it completes, and files
+    already in the journal are skipped, so an interrupted migration can be
+    resumed by running it again.
+
+    Parameters
+    ----------
+    root : str
+        Top directory to walk.
+    file_format : ".pkl", str
+        The file format / extension to convert to.
+    source_format : ".json", str
+        The file format / extension of the files to convert.
+    workers : None, int
+        Number of worker processes. Default is the number of processors.
+    verify : True, Bool
+        Load each converted file and check it against the original.
+    remove : False, Bool
+        Remove the original files once converted (and verified).
+    journal : None, str
+        Journal filename. Default is a hidden file in root.
+
+    Returns
+    -------
+    summary : dict
+        Counts of converted, skipped, and failed files, with the total
+        sizes and load times before and after.
+    """
+
+    if journal is None:
+        journal = os.path.join(root, journal_default)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    done = read_journal(journal)
+    end_journal_line(journal)
+    logger.info("%d files already converted.", len(done))
+
+    summary = {"converted" : 0, "skipped" : 0, "failed" : 0,
+               "source_size" : 0, "target_size" : 0,
+               "source_load_time" : 0.0, "target_load_time" : 0.0}
+
+    def record(result, file):
+        file.write(json.dumps(result) + "\n")
+        file.flush()
+        if result["status"] != "ok":
+            summary["failed"] += 1
+            return
+        summary["converted"] += 1
+        for key in ["source_size", "target_size",
+                    "source_load_time", "target_load_time"]:
+            summary[key] += result.get(key, 0)
+
+    with open(journal, "a") as file, \
+            concurrent.futures.ProcessPoolExecutor(workers) as executor:
+
+        # keep a bounded number of files in flight, as the tree may hold
+        # millions of files
+        pending = set()
+        for filename in find_files(root, source_format):
+            if filename in done:
+                summary["skipped"] += 1
+                continue
+
+            pending.add(executor.submit(convert_file, filename, file_format,
+                                        verify, remove))
+            if len(pending) >= 4 * workers:
+                finished, pending = concurrent.futures.wait(pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result(), file)
+
+        for future in concurrent.futures.as_completed(pending):
+            record(future.result(), file)
+
+    return summary
+
+def print_summary(summary):
+    """
+    Print the size and load time savings of a migration.
+    """
+
+    def saving(before, after):
+        if before == 0:
+            return 0.0
+        return 100.0 * (before - after) / before
+
+    print("Converted: {converted}, skipped: {skipped}, failed: {failed}"
+                .format(**summary))
+    print("Size: {:.3e} B -> {:.3e} B ({:.1f}% saving)".format(
+                summary["source_size"], summary["target_size"],
+                saving(summary["source_size"], summary["target_size"])))
+    if summary["target_load_time"] > 0:
+        print("Load time: {:.3f} s -> {:.3f} s ({:.1f}% saving)".format(
+                summary["source_load_time"], summary["target_load_time"],
+                saving(summary["source_load_time"], summary["target_load_time"])))
+    return 0
+
+def main(argv=None):
+    """
+    Command line entry point, sciscripttools-migrate.
+    """
+
+    parser = argparse.ArgumentParser(
+            prog="sciscripttools-migrate",
+            description="Convert files written by save_data() to another "
+                        "file format. Rerun to resume an interrupted migration.")
+    parser.add_argument("root", help="top directory of the files to convert")
+    parser.add_argument("--format", default=".pkl", dest="file_format",
+                        help="file format to convert to (default: .pkl)")
+    parser.add_argument("--source-format", default=".json",
+                        help="file format to convert from (default: .json)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all)")
+    parser.add_argument("--journal", default=None,
+                        help="journal file used to resume (default: in root)")
+    parser.add_argument("--no-verify", action="store_false", dest="verify",
+                        help="do not check converted files against originals")
+    parser.add_argument("--remove", action="store_true",
+                        help="remove original files once converted")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log progress")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    summary = migrate(args.root, file_format=args.file_format,
+                      source_format=args.source_format, workers=args.workers,
+                      verify=args.verify, remove=args.remove,
+                      journal=args.journal)
+    print_summary(summary)
+
+    if summary["failed"] > 0:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
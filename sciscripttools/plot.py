@@ -1,5 +1,5 @@
 import numpy as np
-import json
+import functools
 import logging
 import pprint
 
@@ -13,6 +13,18 @@ from matplotlib.ticker import ScalarFormatter, FormatStrFormatter
 # import .plot_defaults
 from .io import save_data
 from .plot_defaults import fig_params_report
+from .profiles import resolve_profile, read_only_dict
+from .latex import latex_preamble, si_to_mathtext
+from .downsample import downsampled_line
+from .density import density_image
+from .pyramid import pyramid_imshow
+from .reductions import key_histogram
+from .summaries import summary_limits, summary_range
+from .export import save_rasterized, save_formats
+from .live import live_figure
+from .arrows import (axis_arrows, vector_arrows, vector_bases,
+                     add_arrow_collections)
+from .animate import view_path, render_frames
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +56,10 @@ class figure_parameters:
     The parameters can also be outputed to a dictionary and also saved to a
     json file.
 
+    Named profiles (e.g. "report", "thesis", "slides", see profiles.py) are 
+    loaded with get_profile(), which returns cached read only (frozen) 
+    objects. 
+
     Note: 
     - Note all variables need to be defined; however some methods of
     standard_figure class may fail as they do not have any defaults.
@@ -54,7 +70,12 @@ class figure_parameters:
     -------
     __init__(self, parameters=fig_params_report) : initialisation
         Generate a figure_parameters object either using the default from 
-        plot_defaults.py, a user given dictionary, or a json file.
+        plot_defaults.py, a user given dictionary, a profile name, or a json 
+        file.
+    freeze(self)
+        Make the parameters read only.
+    copy(self)
+        A modifiable copy of the parameters.
     create_dictionary(self)
         Generate a dictionary object of the variables.
     update_dictionary(self)
@@ -114,26 +135,25 @@ class figure_parameters:
         
         def load_parameter(parameter):
             """
-            Try and load the parameter from the dictionary.
+            Load the parameter from the dictionary, None if missing.
             """
-            value = None
-            try:
-                value = self.parameters_dictionary[parameter]
-            except: 
+            if parameter not in self.parameters_dictionary:
                 logger.info("Could not load {}.".format(parameter))
-
-            return value
+            return self.parameters_dictionary.get(parameter)
     
-        # if given a string, try and load the string
+        # if given a string, load the profile or file (parsed once and cached)
         if isinstance(parameters, str):
-            try:
-                parameters = json.load(open(parameters))
-            except:
-                logger.info("parameters was a string, {}, could not load.".format(parameter))
+            _, parameters = resolve_profile(parameters)
+
+        # a modifiable copy of read only (profile) parameters
+        if isinstance(parameters, read_only_dict):
+            parameters = dict(parameters)
 
         if not isinstance(parameters, dict):
             raise Exception("Expecting a dictionary or parameters.")
         
+        self._frozen = False
+
         # store dictionary
         self.parameters_dictionary = parameters
         
@@ -167,6 +187,25 @@ class figure_parameters:
     
     def __repr__(self):
         return pprint.pformat(self.parameters_dictionary)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise Exception("figure_parameters are frozen, modify a copy().")
+        object.__setattr__(self, name, value)
+
+    def freeze(self):
+        """
+        Make the parameters read only, e.g. for shared cached profiles.
+        """
+        self.parameters_dictionary = read_only_dict(self.parameters_dictionary)
+        self._frozen = True
+        return self
+
+    def copy(self):
+        """
+        A modifiable copy of the parameters, with the current values.
+        """
+        return figure_parameters(self.create_dictionary())
     
     def create_dictionary(self):
         parameters = {
@@ -202,27 +241,87 @@ class figure_parameters:
         """
         Export the default values to a json file.
         """
-        self.update_dictionary()
-        save_data(filename, self.parameters_dictionary, directory = directory)
+        if not self._frozen:
+            self.update_dictionary()
+        save_data(filename, dict(self.parameters_dictionary), directory = directory)
         return 0
 
+# cached figure_parameters of profiles, key : figure_parameters
+_profile_cache = {}
+
+def get_profile(profile):
+    """
+    Frozen figure_parameters of a named profile or a json file of parameters.
+
+    Profiles are validated once when registered (see profiles.py) and files
+    are parsed once when read. The figure_parameters objects are cached,
+    and files are only read again when they change, so this is cheap to 
+    call for every figure.
+
+    Parameters
+    ----------
+    profile : str
+        Profile name, e.g. "report", "thesis" or "slides", or a json filename.
+
+    Returns
+    -------
+    fig_params : figure_parameters
+        Read only; use fig_params.copy() to modify.
+
+    Example
+    -------
+    fig_params = get_profile("slides")
+    sf = standard_figure(fig, axes, fig_params) # shares the frozen object
+    """
+    key, parameters = resolve_profile(profile)
+    fig_params = _profile_cache.get(key)
+    if fig_params is None:
+        fig_params = figure_parameters(dict(parameters)).freeze()
+        _profile_cache[key] = fig_params
+    return fig_params
+
+def argument_fig_params(fig_params):
+    """
+    Process input argument of 'fig_params' into a figure_parameters object.
+
+    Parameters
+    ----------
+    fig_params : str, dict, figure_parameters
+        Profile name or json filename (see get_profile()), dictionary, or
+        figure_parameters object. A name or filename gives a modifiable 
+        copy of the cached profile, without parsing it again; an object is 
+        used as it is.
+    """
+    if isinstance(fig_params, figure_parameters):
+        return fig_params
+    if isinstance(fig_params, str):
+        return get_profile(fig_params).copy()
+    if isinstance(fig_params, dict):
+        # process fig_params into an object
+        return figure_parameters(fig_params)
+    raise Exception("Failed to process argument fig_params.")
+
 class standard_font:
     """
     Standardise the figure fonts.
 
+    Draft mode uses matplotlib's mathtext instead of LaTeX, which is much 
+    faster to render; standard_figure units are then written in mathtext.
+
     Methods
     -------
-     __init__(self, font_size=12) : initialisation
+     __init__(self, font_size=12, draft=False) : initialisation
         Set the font to use LaTeX and standardise the font sizes within a figure.
     set_font(self)
-        Set the font to use LaTeX.
+        Set the font to use LaTeX, or mathtext in draft mode.
     set_font_size(self, font_size=None)
         Standardise the font sizes within a figure.
     """
 
-    def __init__(self, font_size=12):
+    def __init__(self, font_size=12, draft=False):
 
         self.font_size = font_size
+        self.draft = draft
         
         # standardise plots
         self.setup_standard_font()
@@ -230,11 +329,14 @@ class standard_font:
     def set_font(self):
         """Set the defaults fonts."""
 
-        rc('text', usetex = True)
-        plt.rcParams['text.latex.preamble']=[r"\usepackage{amsmath} \usepackage{siunitx} \usepackage{bm}"] 
-        # amsmath # maths package
-        # siunitx     # si units
-        # bm           # maths bold symbols
+        if self.draft:
+            # mathtext with computer modern, to look close to the LaTeX output
+            rc('text', usetex = False)
+            rc('mathtext', fontset = 'cm')
+        else:
+            rc('text', usetex = True)
+            # amsmath, siunitx, and bm, see latex.py
+            plt.rcParams['text.latex.preamble'] = latex_preamble
 
         rc('font',**{'family':'sans-serif','sans-serif':['Helvetica']})
         rc('font', family='serif')   
@@ -271,6 +373,141 @@ class standard_font:
         self.set_font_size()
         plt.close()  
 
+# rcParams of the standard axes ticks, see standard_figure.standard_axes_ticks()
+standard_ticks_rc = {
+    "xtick.direction" : "in", "ytick.direction" : "in",
+    "xtick.top" : True, "xtick.bottom" : True,
+    "ytick.left" : True, "ytick.right" : True,
+    "xtick.minor.visible" : True, "ytick.minor.visible" : True,
+}
+
+def subplot_labels(n, scheme=None):
+    """
+    Labels for n subplots.
+
+    Parameters
+    ----------
+    n : int
+        Number of subplots.
+    scheme : None, "alphabet", "ALPHABET", "roman", "ROMAN", "number", 
+                                                        list, callable
+        "alphabet" a..z, aa, ab, ..., az, ba, ... (the default),
+        "ALPHABET" the same in upper case, "roman" i, ii, iii, ..., 
+        "ROMAN" the same in upper case, "number" 1, 2, 3, ...,
+        a list of labels, or a function of the subplot index (from 0).
+
+    Returns
+    -------
+    labels : list of str
+    """
+
+    if scheme is None:
+        scheme = "alphabet"
+
+    def alphabet(i):
+        # bijective base 26, as spreadsheet columns
+        label = ""
+        i = i + 1
+        while i > 0:
+            i, remainder = divmod(i - 1, 26)
+            label = chr(ord("a") + remainder) + label
+        return label
+
+    def roman(i):
+        numerals = [(1000, "m"), (900, "cm"), (500, "d"), (400, "cd"), 
+                    (100, "c"), (90, "xc"), (50, "l"), (40, "xl"), 
+                    (10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i")]
+        label = ""
+        i = i + 1
+        for value, numeral in numerals:
+            count, i = divmod(i, value)
+            label += numeral * count
+        return label
+
+    if callable(scheme):
+        return [str(scheme(i)) for i in range(n)]
+    if scheme == "alphabet":
+        return [alphabet(i) for i in range(n)]
+    if scheme == "ALPHABET":
+        return [alphabet(i).upper() for i in range(n)]
+    if scheme == "roman":
+        return [roman(i) for i in range(n)]
+    if scheme == "ROMAN":
+        return [roman(i).upper() for i in range(n)]
+    if scheme == "number":
+        return [str(i + 1) for i in range(n)]
+    if isinstance(scheme, str):
+        raise Exception("Incorrect string for scheme argument.")
+
+    labels = [str(label) for label in scheme]
+    if len(labels) < n:
+        raise Exception("Not enough subplot labels, {} for {} subplots.".format(
+                                                                len(labels), n))
+    return labels[:n]
+
+def standard_subplots(nrows=1, ncols=1, fig_params="report", **kwargs):
+    """
+    Create a figure and a grid of subplots with the standard size and ticks,
+    and its standard_figure.
+
+    The ticks are created with the standard style (standard_ticks_rc) and
+    the figure with the standard size and margins, so nothing is changed 
+    afterwards axis by axis; much faster than plt.subplots() followed by 
+    standard_figure() for large grids.
+
+    Parameters
+    ----------
+    nrows, ncols : int
+        Number of rows and columns of subplots.
+    fig_params : str, dict, figure_parameters
+        Profile name (default "report"), dicitionary or figure_parameters 
+        object with the figure parameters.
+    **kwargs
+        Passed onto plt.subplots(), e.g. sharex=True.
+
+    Returns
+    -------
+    fig : matplotlib figure
+    axes : matplotlib.axes
+        Singluar matplotlib.axes or array of axes objects, 
+        as from plt.subplots().
+    sf : standard_figure
+        With sf.axes as a flat list of the axes.
+
+    Example
+    -------
+    fig, axes, sf = standard_subplots(20, 20)
+    sf.add_subplot_labels()
+    """
+
+    fig_params = argument_fig_params(fig_params)
+
+    # the standard margins from the start, so no later layout pass
+    subplotpars = matplotlib.figure.SubplotParams(left=fig_params.adjust_left,
+                                                  bottom=fig_params.adjust_bottom)
+
+    with matplotlib.rc_context(standard_ticks_rc):
+        fig, axes = plt.subplots(nrows, ncols, 
+                                 figsize=(fig_params.width, fig_params.height),
+                                 subplotpars=subplotpars, **kwargs)
+
+    sf = standard_figure(fig, list(np.ravel(axes)), fig_params, axes_ticks=False)
+    return fig, axes, sf
+
+def deferrable(method):
+    """
+    Decorator for standard_figure methods which depend on the figure layout.
+    In deferred mode the call is recorded, and run by apply() once the 
+    final figure size and layout are set.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.deferred:
+            self.operations.append((method, args, kwargs))
+            return None
+        return method(self, *args, **kwargs)
+    return wrapper
+
 class standard_figure:
     """
     Class to standarise figures given a set of parameters.
@@ -286,6 +523,10 @@ class standard_figure:
         Singluar matplotlib.axes or array of axes objects.
     fig_params : dict, figure_parameters
         Dicitionary or figure_parameters object with the figure parameters
+    deferred : Bool
+        Record layout changes and layout dependent methods until apply().
+    operations : list
+        The recorded (method, args, kwargs) in deferred mode.
 
     Example
     -------
@@ -298,10 +539,20 @@ class standard_figure:
 
     Methods
     -------
-    __init__(self, fig, axes, fig_params=fig_params_report) : initialisation
+    __init__(self, fig, axes, fig_params="report", axes_ticks=True, 
+                                                        deferred=False)
+        : initialisation
         Create a standard_figure object, which stores the figure, axes, and 
         parameters.
         It also sets the size and ticks for the figure.
+    apply(self)
+        Apply the recorded layout and operations of deferred mode.
+    savefig(self, filename, **kwargs)
+        Apply any deferred operations and save the figure.
+    set_size_inches(self, size)
+        Set the figure size, recorded until apply() in deferred mode.
+    subplots_adjust(self, **kwargs)
+        Adjust the subplot layout, merged until apply() in deferred mode.
     standard_size(self)
         Sets the size of the figure.
         Used within __init__.
@@ -317,9 +568,11 @@ class standard_figure:
     standard_legend(self, axes=None, title=None, loc=1, ncol=1, 
                                                 columnspacing=None)
         Standarise the legend.
-    add_subplot_labels(self, axes=None, adjust=None, fig_adjust_bottom=None)
+    add_subplot_labels(self, axes=None, adjust=None, fig_adjust_bottom=None,
+                                                                scheme=None)
         Add subplot labels to the axes.
-    add_subplot_labels_right(self, axes=None, adjust_x=None, adjust_y=None)
+    add_subplot_labels_right(self, axes=None, adjust_x=None, adjust_y=None,
+                                                                scheme=None)
         Add subplot labels to the right of the axes.
     reduce_axes_clutter(self, axes=None, axis_xy=None, nticks=False, 
                                                                 order=False)
@@ -367,13 +620,64 @@ class standard_figure:
                         ylabel_x_offset=0.0, ylabel_y_offset=0.0)
         Plot small vector arrows to help define 2D directions
 
+    schematic_arrow_axes(self, axes=None, xaxis=True, yaxis=True,
+                                            remove_defaults=True,
+                                            set_yaxis_zero=None, linewidth=0.5)
+        Replace axis lines with arrows over many axes, drawn as collections.
+    schematic_log_arrow_axes(self, axes=None, xaxis=True, yaxis=True,
+                                            remove_defaults=True,
+                                            set_yaxis_zero=None, linewidth=0.5)
+        Replace axis lines with arrows over many log axes, drawn as collections.
+    vector_arrows_2D_axes(self, axes=None, xaxis=True, yaxis=True,
+                        length=5.0, x_offset=0.0, y_offset=0.0,
+                        xlabel="", ylabel="",
+                        xlabel_x_offset=0.0, xlabel_y_offset=0.0,
+                        ylabel_x_offset=0.0, ylabel_y_offset=0.0,
+                        linewidth=0.5)
+        Plot small vector arrows over many axes, drawn as collections.
+
     loglog_ticks(self, axes=None, axis_xy=None)
         Display the loglog ticks. 
     loglog_remove_labels(self, axes=None, axis_xy=None)
         Remove the log 10^(a) labels.
+
+    plot_downsampled(self, ax, x, y, method="minmax", buckets=None, **kwargs)
+        Plot a dense series, downsampled to the pixel width of the axis.
+    scatter_density(self, ax, x, y, bins=None, extent=None, norm="log",
+                        cmap=None, colorbar=False, label=None, 
+                        chunk_size=2**20, **kwargs)
+        Plot many points as an image of the number of points per pixel.
+    imshow_pyramid(self, ax, data, extent=None, directory=None, name=None,
+                        min_size=256, tile_size=256, origin="lower", **kwargs)
+        Show a large image, reading only the resolution and tiles in view.
+    hist_key(self, ax, *args, key, edges=None, bins=50, log=None, 
+                        density=False, histtype="step", **kwargs)
+        Plot a histogram of a key in saved files, read one chunk at a time.
+
+    limits_from_summary(self, axes=None, x=None, y=None, quantiles=None, 
+                                                margin=0.05, nice=True)
+        Set the axis limits from summaries of the data, see load_summary().
+    norm_from_summary(self, summary, log=False, quantiles=None)
+        Colour scale from a summary of the data, see load_summary().
+
+    savefig_rasterized(self, filename, threshold=10000, dpi=300, 
+                                                compare=False, **kwargs)
+        Save the figure with only heavy data artists rasterized.
+    savefig_formats(self, filename, formats=(".pdf", ".png"), dpi=300, 
+                                                                **kwargs)
+        Save the figure in several formats and resolutions from one draw.
+
+    live(self, margin=0.1)
+        Create a live_figure, to update streaming data with blitting.
+
+    animate_view(self, ax, points, widths, directory, frames=100, 
+                                heights=None, maintain_aspect_ratio=True,
+                                ease=True, name="frame", dpi=None, workers=None)
+        Render a zoom / pan animation through key frame views to PNG files.
     """
 
-    def __init__(self, fig, axes, fig_params=fig_params_report):
+    def __init__(self, fig, axes, fig_params="report", axes_ticks=True,
+                                                            deferred=False):
         """
         Initialise the standard figure. 
         Sets the figure size and axes ticks.
@@ -384,12 +688,27 @@ class standard_figure:
             Matplotlib figure object.
         axes : matplotlib.axes
             Singluar matplotlib.axes or array of axes objects.
-        fig_params : dict, figure_parameters
-            Dicitionary or figure_parameters object with the figure parameters.
-            Default is a fig_params_report define in plot_defaults.py
+        fig_params : str, dict, figure_parameters
+            Profile name or json filename (see get_profile()), dicitionary or
+            figure_parameters object with the figure parameters.
+            Default is the "report" profile, fig_params_report define in 
+            plot_defaults.py. Names and filenames give each figure its own 
+            modifiable copy of the cached profile.
+        axes_ticks : True, Bool
+            Set the standard axes ticks. Not needed for axes created with 
+            the standard ticks already, see standard_subplots().
+        deferred : False, Bool
+            Record the figure size, subplot adjustments, and layout dependent
+            methods (e.g. the schematic arrows), and apply them all in one 
+            pass with apply(), or when saving with sf.savefig().
         """
 
         self.fig = fig
+
+        self.deferred = deferred
+        self.operations = []
+        self._pending_size = None
+        self._pending_adjust = {}
         
         self.axes = axes
         # if its only one axis, put into array
@@ -398,31 +717,117 @@ class standard_figure:
         except:
             self.axes = [axes]
         
-        if isinstance(fig_params, figure_parameters):
-            self.fig_params = fig_params
-        elif isinstance(fig_params, dict):
-            # process fig_params into an object
-            self.fig_params = figure_parameters(fig_params)
-        else:
-            raise Exception("Failed to process argument fig_params.")
+        self.fig_params = argument_fig_params(fig_params)
 
         # set the figure size and axes ticks
         self.standard_size()
-        self.standard_axes_ticks()
+        if axes_ticks == True:
+            self.standard_axes_ticks()
         
     def standard_size(self):
         """
         Set the size of the figure.
         """
 
-        self.fig.set_size_inches([self.fig_params.width, self.fig_params.height])
+        self.set_size_inches([self.fig_params.width, self.fig_params.height])
 
         # even up the padding to better match right side
-        self.fig.subplots_adjust(left = self.fig_params.adjust_left, 
-                                                bottom = self.fig_params.adjust_bottom) 
+        self.subplots_adjust(left = self.fig_params.adjust_left, 
+                                        bottom = self.fig_params.adjust_bottom) 
+
+        return 0
+
+    def set_size_inches(self, size):
+        """
+        Set the figure size, recorded until apply() in deferred mode.
+
+        Parameters
+        ----------
+        size : [width, height]
+            Size in inches.
+        """
+        if self.deferred:
+            self._pending_size = list(size)
+        else:
+            self.fig.set_size_inches(size)
+        return 0
+
+    def get_size_inches(self):
+        """
+        The figure size, including a size recorded in deferred mode.
+        """
+        if self._pending_size is not None:
+            return np.array(self._pending_size)
+        return self.fig.get_size_inches()
+
+    def subplots_adjust(self, **kwargs):
+        """
+        Adjust the subplot layout, as fig.subplots_adjust().
+        In deferred mode the adjustments are merged until apply(), otherwise 
+        the layout is only updated if a value changes.
+
+        Parameters
+        ----------
+        **kwargs
+            left, bottom, right, top, wspace, hspace.
+        """
+        if self.deferred:
+            self._pending_adjust.update(kwargs)
+            return 0
+
+        subplotpars = self.fig.subplotpars
+        if any(value is not None and getattr(subplotpars, key) != value
+                                        for key, value in kwargs.items()):
+            self.fig.subplots_adjust(**kwargs)
+        return 0
+
+    def apply(self):
+        """
+        Apply the recorded layout and operations of deferred mode, in one
+        pass: the figure size, a single subplots_adjust(), then the layout
+        dependent methods in the order they were called.
+        Ends deferred mode; further calls are applied immediately.
+
+        Example
+        -------
+        sf = standard_figure(fig, axes, deferred=True)
+        sf.add_subplot_labels()
+        for ax in axes:
+            sf.schematic_arrow_axis(ax)
+        sf.standard_size_adjust(0.75)
+        sf.apply()
+        """
+        self.deferred = False
+
+        if self._pending_size is not None:
+            self.fig.set_size_inches(self._pending_size)
+            self._pending_size = None
+        if len(self._pending_adjust) > 0:
+            self.subplots_adjust(**self._pending_adjust)
+            self._pending_adjust = {}
+
+        operations = self.operations
+        self.operations = []
+        for method, args, kwargs in operations:
+            method(self, *args, **kwargs)
 
         return 0
 
+    def savefig(self, filename, **kwargs):
+        """
+        Apply any deferred operations and save the figure.
+
+        Parameters
+        ----------
+        filename : str
+            Output filename.
+        **kwargs
+            Passed onto fig.savefig().
+        """
+        self.apply()
+        self.fig.savefig(filename, **kwargs)
+        return 0
+
     def standard_axes_ticks(self):
         """
         Standardise the axes ticks.
@@ -517,7 +922,8 @@ class standard_figure:
                                 columnspacing = columnspacing)
         return 0
 
-    def add_subplot_labels(self, axes=None, adjust=None, fig_adjust_bottom=None):
+    def add_subplot_labels(self, axes=None, adjust=None, fig_adjust_bottom=None,
+                                                                scheme=None):
         """
         Add subplot labels to the axes.
 
@@ -530,6 +936,9 @@ class standard_figure:
             Adjust location.
         fig_adjust_bottom : float
             Adjust the bottom of the figure.
+        scheme : None, str, list, callable
+            Labelling scheme, see subplot_labels(). 
+            Default is "alphabet", a..z, aa, ab, ...
         """
 
         axes = self.argument_axes(axes)
@@ -542,7 +951,7 @@ class standard_figure:
         
         
         # defaults chosen as it works well with default values
-        alphabet = ["a", "b", "c", "d", "e", "f"]
+        alphabet = subplot_labels(len(axes), scheme)
         for i in range(0, len(axes)):
             ax = axes[i]
             letter = alphabet[i]
@@ -553,11 +962,12 @@ class standard_figure:
                             transform = ax.transAxes)
 
         # adjust figure to make visual the subcaptions
-        self.fig.subplots_adjust(bottom=fig_adjust_bottom)
+        self.subplots_adjust(bottom=fig_adjust_bottom)
 
         return 0
 
-    def add_subplot_labels_right(self, axes=None, adjust_x=None, adjust_y=None):
+    def add_subplot_labels_right(self, axes=None, adjust_x=None, adjust_y=None,
+                                                                scheme=None):
         """
         Add subplot labels to the right of the axes.
 
@@ -570,6 +980,9 @@ class standard_figure:
             Adjust x location of the label.
         adjust_y : float
             Adjust y location of the label.
+        scheme : None, str, list, callable
+            Labelling scheme, see subplot_labels(). 
+            Default is "alphabet", a..z, aa, ab, ...
         """
         
         axes = self.argument_axes(axes)
@@ -580,7 +993,7 @@ class standard_figure:
             adjust_y = self.fig_params.adjust_subplot_label_right_y
         
         # defaults chosen as it works well with default values
-        alphabet = ["a", "b", "c", "d", "e", "f"]
+        alphabet = subplot_labels(len(axes), scheme)
         for i in range(0, len(axes)):
             ax = axes[i]
             x_label_px, x_label_py  = ax.xaxis.get_label().get_position()
@@ -646,15 +1059,15 @@ class standard_figure:
         """
 
         if height_percentage is None:
-            height_percentage = self.height_small_percentage
+            height_percentage = self.fig_params.height_small_percentage
         if adjust_bottom is None:
             adjust_bottom = self.fig_params.adjust_bottom
         
-        w, h = self.fig.get_size_inches()
-        self.fig.set_size_inches([w, h * height_percentage])
+        w, h = self.get_size_inches()
+        self.set_size_inches([w, h * height_percentage])
 
-        self.fig.subplots_adjust(left=self.fig_params.adjust_left) 
-        self.fig.subplots_adjust(bottom=adjust_bottom)        
+        self.subplots_adjust(left=self.fig_params.adjust_left, 
+                                                    bottom=adjust_bottom)
 
         return
 
@@ -662,6 +1075,8 @@ class standard_figure:
     def latex_unit(self, unit=None, brackets=None):
         """
         A string which holds the latex defined unit with brackets.
+        If LaTeX is not in use (e.g. draft mode of standard_font), the unit
+        is translated to mathtext.
 
         Parameters
         ----------
@@ -680,6 +1095,17 @@ class standard_figure:
         # if no unit given, return empty string
         if unit is None:
             return ""
+        # without latex, translate the unit to mathtext
+        if matplotlib.rcParams["text.usetex"] == False:
+            # mathtext sizes \left( \right) too small, so use plain brackets
+            unit = si_to_mathtext(unit)
+            if brackets == "round":
+                return "$(" + unit + ")$"
+            elif brackets == "square":
+                return "$[" + unit + "]$"
+            else:
+                raise Exception("Incorrect string for brackets argument.")
+
         # otherwise return unit string
         if brackets == "round":
             return "$\\left( \\si{" + unit + "} \\right)$"
@@ -854,7 +1280,8 @@ class standard_figure:
     # functions below could use some cleaning up and improved reusabilty
     # some code overlaps 
 
-    # could use self.axes here to run over multiple axes
+    # see schematic_arrow_axes() to run over multiple axes
+    @deferrable
     def schematic_arrow_axis(self, ax, xaxis=True, yaxis=True,
                                                         xwidth=0.001, ywidth=0.001,
                                                         remove_defaults=True,
@@ -942,10 +1369,11 @@ class standard_figure:
         if adjust_bottom is None:
             adjust_bottom = self.fig_params.schematic_adjust_bottom_no_ticks
     
-        self.fig.subplots_adjust(bottom = adjust_bottom)
+        self.subplots_adjust(bottom = adjust_bottom)
         return 0 
 
 
+    @deferrable
     def schematic_log_arrow_axis(self, ax, xaxis=True, yaxis=True,
                                             xwidth=0.001, ywidth=0.001,
                                             remove_defaults=True,
@@ -1039,6 +1467,7 @@ class standard_figure:
 
     # this uses very similar code to schematic arrows
     # could reduce this to reuse overlapping code
+    @deferrable
     def vector_arrows_2D(self, ax, xaxis=True, yaxis=True,
                         length=5.0, x_offset=0.0, y_offset=0.0,
                         xlabel="", ylabel="",
@@ -1126,6 +1555,173 @@ class standard_figure:
         
         return 0
 
+    # batched arrows -------------------
+    @deferrable
+    def schematic_arrow_axes(self, axes=None, xaxis=True, yaxis=True,
+                                            remove_defaults=True,
+                                            set_yaxis_zero=None, linewidth=0.5):
+        """
+        Replace axis lines with arrows to represent a schematic diagram,
+        for many axes at once.
+
+        Same arrows as schematic_arrow_axis(), but the geometry of every axes
+        is computed together and all of the arrows are drawn as one line
+        collection (shafts) and one polygon collection (heads) on the figure,
+        which is much faster for figures with many panels.
+
+        The arrows are placed in figure inches, from the axes positions and
+        limits when the figure is drawn, so they follow any later layout
+        change (e.g. standard_size_adjust(), subplots_adjust(), a layout
+        engine, or new limits).
+
+        Parameters
+        ----------
+        axes : None, matplotlib.axes
+            Singluar matplotlib.axes or array of axes objects.
+            Defaults to all axes in a figure.
+        xaxis : True, Bool
+            Turn the x axes into arrows.
+        yaxis : True, Bool
+            Turn the y axes into arrows.
+        remove_defaults, True, Bool
+            Remove the current ticks and axes.
+        set_yaxis_zero : None, float, array
+            Moves the x axis, for all axes or per axes.
+        linewidth : 0.5, float
+            Line width of the arrows.
+
+        Returns
+        -------
+        shafts, heads : LineCollection, PolyCollection
+            The arrow collections, added to the figure.
+
+        Example
+        -------
+        fig, axes = plt.subplots(10, 10)
+        sf = standard_figure(fig, axes.flatten())
+        sf.schematic_arrow_axes()
+        """
+        return self._schematic_arrow_axes(axes, xaxis, yaxis, remove_defaults,
+                                          set_yaxis_zero, linewidth, log=False)
+
+    @deferrable
+    def schematic_log_arrow_axes(self, axes=None, xaxis=True, yaxis=True,
+                                            remove_defaults=True,
+                                            set_yaxis_zero=None, linewidth=0.5):
+        """
+        Replace axis lines with arrows to represent a schematic diagram,
+        for many log axes at once.
+
+        Same arrows as schematic_log_arrow_axis(), drawn as collections,
+        see schematic_arrow_axes().
+
+        Parameters
+        ----------
+        axes : None, matplotlib.axes
+            Singluar matplotlib.axes or array of axes objects.
+            Defaults to all axes in a figure.
+        xaxis : True, Bool
+            Turn the x axes into arrows.
+        yaxis : True, Bool
+            Turn the y axes into arrows.
+        remove_defaults, True, Bool
+            Remove the current ticks and axes.
+        set_yaxis_zero : None, float, array
+            Moves the x axis, for all axes or per axes.
+        linewidth : 0.5, float
+            Line width of the arrows.
+
+        Returns
+        -------
+        shafts, heads : LineCollection, PolyCollection
+            The arrow collections, added to the figure.
+        """
+        return self._schematic_arrow_axes(axes, xaxis, yaxis, remove_defaults,
+                                          set_yaxis_zero, linewidth, log=True)
+
+    def _schematic_arrow_axes(self, axes, xaxis, yaxis, remove_defaults,
+                                                set_yaxis_zero, linewidth, log):
+        axes = list(np.ravel(self.argument_axes(axes)))
+
+        # remove current axes
+        if remove_defaults == True:
+            self.remove_ticks(axes)
+            self.remove_axes(axes)
+
+        def geometry():
+            return axis_arrows(self.fig, axes, xaxis=xaxis, yaxis=yaxis,
+                               set_yaxis_zero=set_yaxis_zero, log=log)
+        return add_arrow_collections(self.fig, geometry, linewidth=linewidth)
+
+    @deferrable
+    def vector_arrows_2D_axes(self, axes=None, xaxis=True, yaxis=True,
+                        length=5.0, x_offset=0.0, y_offset=0.0,
+                        xlabel="", ylabel="",
+                        xlabel_x_offset=0.0, xlabel_y_offset=0.0,
+                        ylabel_x_offset=0.0, ylabel_y_offset=0.0,
+                        linewidth=0.5):
+        """
+        Plot small vector arrows to help define 2D directions,
+        for many axes at once.
+
+        Same arrows as vector_arrows_2D(), drawn as collections,
+        see schematic_arrow_axes(). The arrows start at fixed data
+        coordinates, from the limits when called. The labels are added as text to each axes, the x label at the end 
+        of the x arrow and the y label at the end of the y arrow.
+ 
+        Parameters
+        ----------
+        axes : None, matplotlib.axes
+            Singluar matplotlib.axes or array of axes objects.
+            Defaults to all axes in a figure.
+        xaxis : True, Bool
+            An arrow for the x direction.
+        yaxis : True, Bool
+            An arrow for the y direction.
+        length : 5.0, float
+            Length of the arrows, in data units.
+        x_offset : float, array
+            Base location of the arrows, for all axes or per axes.
+        y_offset : float, array
+            Base location of the arrows, for all axes or per axes.
+        xlabel : str 
+            Label for the x arrow.
+        ylabel : str
+            Label for the y arrow.
+        xlabel_x_offset : float
+            Offset the x label in the x direction.
+        xlabel_y_offset : float
+            Offset the x label in the y direction.
+        ylabel_x_offset : float
+            Offset the y label in the x direction.
+        ylabel_y_offset : float
+            Offset the y label in the y direction.
+        linewidth : 0.5, float
+            Line width of the arrows.
+
+        Returns
+        -------
+        shafts, heads : LineCollection, PolyCollection
+            The arrow collections, added to the figure.
+        """
+        axes = list(np.ravel(self.argument_axes(axes)))
+
+        # bases are fixed in data coordinates, as for vector_arrows_2D()
+        bases = vector_bases(axes, x_offset=x_offset, y_offset=y_offset)
+
+        for ax, (xbase, ybase) in zip(axes, bases):
+            if xaxis == True and xlabel != "":
+                ax.text(xbase + length + xlabel_x_offset, ybase + xlabel_y_offset,
+                                                        xlabel, clip_on=False)
+            if yaxis == True and ylabel != "":
+                ax.text(xbase + ylabel_x_offset, ybase + length + ylabel_y_offset,
+                                                        ylabel, clip_on=False)
+
+        def geometry():
+            return vector_arrows(self.fig, axes, bases, xaxis=xaxis,
+                                 yaxis=yaxis, length=length)
+        return add_arrow_collections(self.fig, geometry, linewidth=linewidth)
+
     def loglog_ticks(self, axes=None, axis_xy=None):
         """
         Sort the display the loglog ticks. 
@@ -1144,15 +1740,18 @@ class standard_figure:
         axes = self.argument_axes(axes)
         axis_xy = self.argument_axis_xy(axis_xy)
 
-        locmin = matplotlib.ticker.LogLocator(base=10.0,subs=(0.2,0.4,0.6,0.8),numticks=10)
+        # locators and formatters are bound to a single axis, 
+        # so each axis needs its own
+        def locmin():
+            return matplotlib.ticker.LogLocator(base=10.0,subs=(0.2,0.4,0.6,0.8),numticks=10)
 
         for ax in axes:
             for xy in axis_xy:
                 if xy == "x":
-                    ax.xaxis.set_minor_locator(locmin)
+                    ax.xaxis.set_minor_locator(locmin())
                     ax.xaxis.set_minor_formatter(matplotlib.ticker.NullFormatter())
                 if xy == "y": 
-                    ax.yaxis.set_minor_locator(locmin)
+                    ax.yaxis.set_minor_locator(locmin())
                     ax.yaxis.set_minor_formatter(matplotlib.ticker.NullFormatter())
 
         return 0
@@ -1174,16 +1773,447 @@ class standard_figure:
         axes = self.argument_axes(axes)
         axis_xy = self.argument_axis_xy(axis_xy)
 
-        formatter = matplotlib.ticker.LogFormatter(labelOnlyBase=True, minor_thresholds=(1,2))
+        def formatter():
+            return matplotlib.ticker.LogFormatter(labelOnlyBase=True, minor_thresholds=(1,2))
+
         for ax in axes:
             for xy in axis_xy:
                 if xy == "x":
-                    ax.get_xaxis().set_minor_formatter(formatter)
+                    ax.get_xaxis().set_minor_formatter(formatter())
                 if xy == "y": 
-                    ax.get_yaxis().set_minor_formatter(formatter)
+                    ax.get_yaxis().set_minor_formatter(formatter())
+
+        return 0
+
+    # dense data -----------------------
+    def plot_downsampled(self, ax, x, y, method="minmax", buckets=None, **kwargs):
+        """
+        Plot a dense series, downsampled to the pixel width of the axis.
+        The series is downsampled again for the visible range whenever the 
+        x limits change, e.g. with move_view().
+
+        Call after the figure size is set (e.g. after standard_size_adjust()),
+        as the pixel width is taken from the figure layout.
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single axis.
+        x : array
+            x values.
+        y : array
+            y values.
+        method : "minmax", "lttb"
+            "minmax" keeps the first, last, minimum and maximum point per 
+            pixel, and looks the same as plotting all of the data.
+            "lttb" keeps one point per pixel, preserving the overall shape.
+        buckets : None, int
+            Number of buckets (pixels). Default is the axis pixel width.
+        **kwargs
+            Passed onto ax.plot().
+
+        Returns
+        -------
+        line : downsampled_line
+            Holds the full series and the plotted line, line.line.
+        """
+        return downsampled_line(ax, x, y, method=method, buckets=buckets, 
+                                                                    **kwargs)
+
+    def scatter_density(self, ax, x, y, bins=None, extent=None, norm="log",
+                        cmap=None, colorbar=False, label=None, 
+                        chunk_size=2**20, **kwargs):
+        """
+        Plot a scatter of many points (millions) as a single image of the
+        number of points in each pixel, binned one chunk at a time.
+
+        Call after the figure size and axis scales are set (e.g. after 
+        standard_size_adjust() and ax.set_xscale("log")), as the bins are
+        taken from the pixel size of the axis, and are log spaced on log axes.
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single axis.
+        x : array
+            x values; anything which can be sliced, e.g. a numpy memmap.
+        y : array
+            y values.
+        bins : None, int, tuple
+            Number of bins, nx or (nx, ny). Default is one bin per pixel.
+        extent : None, tuple
+            (x0, x1, y0, y1). Default is the extent of the points.
+        norm : "log", "linear", matplotlib.colors.Normalize
+            Colour scale of the counts. Empty bins are left transparent.
+        cmap : None, str, matplotlib colormap
+        colorbar : Bool
+            Add a colour bar, next to the axis.
+        label : None, str
+            Label of the colour bar.
+        chunk_size : int
+            Number of points binned at a time.
+        **kwargs
+            Passed onto ax.imshow(), or ax.pcolormesh() for log axes.
+
+        Returns
+        -------
+        image : matplotlib AxesImage, QuadMesh
+        cbar : None, matplotlib Colorbar
+
+        Example
+        -------
+        x = np.load("x.npy", mmap_mode="r")
+        y = np.load("y.npy", mmap_mode="r")
+        image, cbar = sf.scatter_density(ax, x, y, colorbar=True, 
+                                                    label="Counts")
+        """
+        return density_image(ax, x, y, bins=bins, extent=extent, norm=norm,
+                                cmap=cmap, colorbar=colorbar, label=label,
+                                chunk_size=chunk_size, **kwargs)
+
+    def imshow_pyramid(self, ax, data, extent=None, directory=None, name=None,
+                        min_size=256, tile_size=256, origin="lower", **kwargs):
+        """
+        Show a large image (e.g. a 20k x 20k field map) from a pyramid of 
+        halved resolutions. Each draw reads only the level matching the pixel
+        size of the axis, and the tiles of it in view, so zooming with 
+        move_view() does not resample the whole image.
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single axis.
+        data : array, str, image_pyramid
+            2D image, or the filename of a .npy file, which is memory mapped.
+        extent : None, tuple
+            (x0, x1, y0, y1). Default is the column and row indices.
+        directory : None, str
+            Store the levels in this directory as memory mapped files. 
+            Levels of a .npy file are reused until the file changes.
+        name : None, str
+            Name of the stored files, default from the data filename, or 
+            unique for an array.
+        min_size : int
+            Size of the coarsest level.
+        tile_size : int
+            Values are read in tiles of tile_size x tile_size.
+        origin : "lower", "upper"
+            Place row 0 of the image at the bottom or top.
+        **kwargs
+            Passed onto pyramid_imshow(), e.g. cmap, vmin, vmax, aspect.
+
+        Returns
+        -------
+        image : pyramid_image
+
+        Example
+        -------
+        image = sf.imshow_pyramid(ax, "field.npy", extent=(0, 1, 0, 1),
+                                                    directory="cache/")
+        move_view(ax, [0.3, 0.6], 0.01)
+        """
+        return pyramid_imshow(ax, data, extent=extent, directory=directory,
+                                name=name, min_size=min_size, 
+                                tile_size=tile_size, origin=origin, **kwargs)
+
+    def hist_key(self, ax, *args, key, edges=None, bins=50, log=None, 
+                        density=False, histtype="step", chunk_size=2**20, 
+                        workers=None, file_format=None, directory="", 
+                        index=False, **kwargs):
+        """
+        Plot a histogram of a key across saved files, without loading the 
+        files into memory; the counts are accumulated one file and one chunk
+        at a time, see key_histogram().
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single axis.
+        *args : str, multiple str, list of str, array of str etc.
+            The filename(s).
+        key : str
+            Name of the item in each file.
+        edges : None, array
+            Bin edges. Default is chosen from the range of the values.
+        bins : int, "sturges", "rice", "sqrt"
+            Number of bins, or rule for the number of bins, when choosing 
+            edges.
+        log : None, Bool
+            Log spaced bins over the positive values. 
+            Default is log if the x axis is log.
+        density : Bool
+            Normalise the histogram to a probability density.
+        histtype : "step", "stepfilled", "bar"
+            See ax.hist().
+        chunk_size, workers, file_format, directory, index : optional
+            See reduce_key().
+        **kwargs
+            Passed onto ax.hist().
+
+        Returns
+        -------
+        counts : array
+            Number of values in each bin.
+        edges : array
+            Bin edges.
+        patches : list
+            The histogram artists, from ax.hist().
+
+        Example
+        -------
+        ax.set_xscale("log")
+        counts, edges, patches = sf.hist_key(ax, filenames, key="power",
+                                                            workers=8)
+        """
+        if log is None:
+            log = ax.get_xscale() == "log"
+
+        counts, edges = key_histogram(*args, key=key, edges=edges, bins=bins,
+                                        log=log, chunk_size=chunk_size, 
+                                        workers=workers, file_format=file_format,
+                                        directory=directory, index=index)
+
+        # one weighted value per bin, rather than all of the values
+        _, _, patches = ax.hist(edges[:-1], edges, weights=counts, 
+                                density=density, histtype=histtype, **kwargs)
+        return counts, edges, patches
+
+    # summaries ------------------------
+    def limits_from_summary(self, axes=None, x=None, y=None, quantiles=None, 
+                                                    margin=0.05, nice=True):
+        """
+        Set the axis limits from summaries of the data (see load_summary()),
+        without reading the data. Log axes use the positive values.
+        Set the axis scales first.
+
+        Parameters
+        ----------
+        axes : None, matplotlib axis, list of matplotlib axes
+            Default will use all axes of the figure.
+        x : None, dict, list of dict
+            Summary of the x values, or summaries of several series.
+            Default leaves the x limits.
+        y : None, dict, list of dict
+            Summary of the y values, or summaries of several series.
+        quantiles : None, (float, float)
+            Probabilities of the ends of the range, e.g. (0.01, 0.99) to 
+            ignore outliers. Default is the minimum and maximum.
+        margin : float
+            Fraction of the range added to each end, in decades on log axes.
+            Only used without nice.
+        nice : Bool
+            Round the limits out to the major ticks, or whole decades on 
+            log axes.
+
+        Example
+        -------
+        summaries = load_summary(filenames, keys=["time", "power"], merge=True)
+        ax.set_yscale("log")
+        sf.limits_from_summary(ax, x=summaries["time"], y=summaries["power"])
+        """
+        axes = self.argument_axes(axes)
+
+        for ax in axes:
+            for summary, axis, set_limits in [(x, ax.xaxis, ax.set_xlim),
+                                              (y, ax.yaxis, ax.set_ylim)]:
+                if summary is None:
+                    continue
+                log = axis.get_scale() == "log"
+                locator = axis.get_major_locator() if nice else None
+                set_limits(summary_limits(summary, log=log, quantiles=quantiles,
+                                            margin=margin, locator=locator))
 
         return 0
 
+    def norm_from_summary(self, summary, log=False, quantiles=None):
+        """
+        Colour scale from a summary of the data (see load_summary()), 
+        without reading the data, e.g. for imshow() or scatter_density().
+
+        Parameters
+        ----------
+        summary : dict
+            Summary of the values.
+        log : Bool
+            Log colour scale, over the positive values.
+        quantiles : None, (float, float)
+            Probabilities of the ends of the scale, e.g. (0.01, 0.99).
+            Default is the minimum and maximum.
+
+        Returns
+        -------
+        norm : matplotlib.colors.Normalize, matplotlib.colors.LogNorm
+        """
+        vmin, vmax = summary_range(summary, log=log, quantiles=quantiles)
+        if log:
+            return matplotlib.colors.LogNorm(vmin=vmin, vmax=vmax)
+        return matplotlib.colors.Normalize(vmin=vmin, vmax=vmax)
+
+    # export ---------------------------
+    def savefig_rasterized(self, filename, threshold=10000, dpi=300, 
+                                                compare=False, **kwargs):
+        """
+        Save the figure with only heavy data artists rasterized.
+
+        Lines, collections (e.g. scatter) and patches drawing more vertices
+        than the threshold are rasterized at the given dpi, while the axes, 
+        ticks, labels and subplot labels stay as vectors. Useful for vector
+        formats (pdf, svg, eps) of figures with dense data.
+
+        Parameters
+        ----------
+        filename : str
+            Output filename, including the extension.
+        threshold : int
+            Number of vertices (or markers) above which an artist is 
+            rasterized.
+        dpi : float
+            Resolution of the rasterized artists.
+        compare : False, Bool
+            Also save a fully vector version (to a temporary file), to report
+            the size and save time savings.
+        **kwargs
+            Passed onto fig.savefig().
+
+        Returns
+        -------
+        report : dict
+            rasterized (number of artists), vertices, save_time, and size.
+            With compare, also vector_save_time, vector_size, time_saving and
+            size_saving (fractions).
+
+        Example
+        -------
+        report = sf.savefig_rasterized("scatter.pdf", compare=True)
+        print(report["size_saving"])
+        """
+        self.apply()
+        return save_rasterized(self.fig, filename, threshold=threshold, dpi=dpi,
+                                                    compare=compare, **kwargs)
+
+    def savefig_formats(self, filename, formats=(".pdf", ".png"), dpi=300, 
+                                                                **kwargs):
+        """
+        Save the figure in several formats and resolutions from one draw.
+
+        Raster formats (png, jpg, tiff, webp) at the same dpi are all 
+        written from a single Agg draw, the same as savefig() at that dpi,
+        including any layout engine ("constrained", "tight"), which runs at
+        each dpi; vector formats (pdf, svg, eps) are each written by their
+        own backend, as they must be, reusing text from the matplotlib 
+        caches.
+        Options which change the saved area (e.g. bbox_inches="tight") are
+        passed onto savefig() for every format instead, as are all formats 
+        when the savefig rcParams change the output (savefig.bbox, 
+        savefig.facecolor, savefig.edgecolor or savefig.transparent).
+
+        Parameters
+        ----------
+        filename : str
+            Output filename, with or without an extension.
+        formats : list of str
+            Formats to save, e.g. [".pdf", ".png", ".svg"] or ["pdf", "png"].
+        dpi : float, list
+            Resolution, or several resolutions. With several, raster 
+            filenames get a suffix, e.g. figure_300dpi.png, and vector 
+            formats use the last resolution for rasterized artists.
+        **kwargs
+            Passed onto fig.savefig().
+
+        Returns
+        -------
+        report : dict
+            outputs, with the filename, format, dpi, time and size of each
+            file; draw_time of each Agg draw by dpi; and total_time.
+
+        Example
+        -------
+        report = sf.savefig_formats("power", [".pdf", ".png", ".svg"], 
+                                                        dpi=[150, 600])
+        """
+        self.apply()
+        return save_formats(self.fig, filename, formats=formats, dpi=dpi,
+                                                                    **kwargs)
+
+    # live -----------------------------
+    def live(self, margin=0.1):
+        """
+        Create a live_figure, to update streaming data with blitting.
+        Style the figure (labels, ticks, etc.) before adding live lines.
+
+        Parameters
+        ----------
+        margin : float
+            Fractional margin added around the data when rescaling.
+
+        Returns
+        -------
+        live : live_figure
+
+        Example
+        -------
+        live = sf.live()
+        line = live.add_line(ax, capacity=100000)
+        live.append(line, x_new, y_new)
+        live.update()
+        """
+        self.apply()
+        return live_figure(self, margin=margin)
+
+    # animation ------------------------
+    def animate_view(self, ax, points, widths, directory, frames=100, 
+                                heights=None, maintain_aspect_ratio=True,
+                                ease=True, name="frame", dpi=None, workers=None):
+        """
+        Render a zoom / pan animation through key frame views to PNG files.
+
+        The views are computed as a path of windows (see view_path()), 
+        like calling move_view() for each frame, and rendered on one reused
+        canvas, with the PNG files written in parallel (see render_frames()).
+        The axis limits are restored afterwards.
+
+        Parameters
+        ----------
+        ax : matplotlib axis
+            Single matplotlib axis, whose view is moved.
+        points : array, (number of key frames, 2)
+            Centre points [x, y] of the key frame views.
+        widths : float, array
+            Width of the key frame views.
+        directory : str
+            Output directory for the frames.
+        frames : int
+            Total number of frames.
+        heights : None, float, array
+            Height of the key frame views. Default is the widths.
+        maintain_aspect_ratio : True, Bool
+            Retain the axis's current aspect ratio.
+        ease : True, Bool
+            Ease in and out of each key frame.
+        name : str
+            Start of the filenames, e.g. frame_00000.png.
+        dpi : None, float
+            Resolution. Default is the figure dpi.
+        workers : None, int
+            Number of processes drawing frames. Default draws in this process.
+
+        Returns
+        -------
+        filenames : list
+            The frame filenames, in order.
+
+        Example
+        -------
+        sf.animate_view(ax, [[0, 0], [5, 2], [5, 2]], [10, 1, 0.01], "frames",
+                                                                frames=500)
+        """
+        self.apply()
+        limits = view_path(ax, points, widths, frames=frames, heights=heights,
+                            maintain_aspect_ratio=maintain_aspect_ratio, 
+                            ease=ease)
+        return render_frames(self.fig, ax, limits, directory, name=name, 
+                                                    dpi=dpi, workers=workers)
+
 
 
 # Log Plots
@@ -1192,6 +2222,8 @@ def loglog_guide_manual(ax, x, p0, p1, colour="grey", label="", linestyle=":",
                                                 linewidth=1.5, logtype=None):
     """
     Manual log line of form p0 * ( x^(p1) )
+    Also draws many lines at once, from arrays of p0 and p1,
+    e.g. the output of power_law_fit().
 
     Parameters
     ----------
@@ -1199,14 +2231,14 @@ def loglog_guide_manual(ax, x, p0, p1, colour="grey", label="", linestyle=":",
         Single matplotlib axis.
     x : array
         x value data
-    p0 : float
-        Constant
-    p1 : float
-        Power constant
+    p0 : float, array
+        Constant, or constants of each line.
+    p1 : float, array
+        Power constant, or power constants of each line.
     colour : str
         Matplotlib colours
-    label : str
-        Label for the line.
+    label : str, list
+        Label for the line, or a label for each line.
     linestyle : str
         matplotlib style of the line
     linewidth : float
@@ -1218,17 +2250,33 @@ def loglog_guide_manual(ax, x, p0, p1, colour="grey", label="", linestyle=":",
     if logtype is None:
             logtype = "loglog"
 
+    x = np.asarray(x)
+    p0 = np.asarray(p0)
+    p1 = np.asarray(p1)
+    many = p0.ndim > 0 or p1.ndim > 0
+    if many:
+        p0, p1 = np.broadcast_arrays(np.ravel(p0), np.ravel(p1))
+
     if label == "":
-        label_v = '{' + str(p1) + '}'
-        label = r'$r^{}$'.format(label_v)
+        if many:
+            label = [r'$r^{' + str(p) + '}$' for p in np.round(p1, 2)]
+        else:
+            label_v = '{' + str(p1) + '}'
+            label = r'$r^{}$'.format(label_v)
+
+    if many:
+        # one column per line
+        y = p0 * np.power(x[:, np.newaxis], p1)
+    else:
+        y = p0*(np.power(x, p1))
 
     if logtype == "loglog":
-        ax.loglog(x, p0*(np.power(x, p1)),
+        ax.loglog(x, y,
                         linestyle=linestyle, color=colour, 
                         label = label, linewidth = linewidth)
 
     if logtype == "semilogy":
-        ax.semilogy(x, p0*(np.power(x, p1)),
+        ax.semilogy(x, y,
                                 linestyle=linestyle, color=colour, 
                                 label = label, linewidth = linewidth)
 
@@ -1288,6 +2336,117 @@ def loglog_guide(x, y, indices=None):
 
     return y_g, rf_p
 
+def pad_series(series):
+    """
+    Pad a list of series of different lengths into a 2D array.
+
+    Parameters
+    ----------
+    series : list of array
+        Ragged series.
+
+    Returns
+    -------
+    values : array, (number of series, longest length)
+        The series, padded with NaNs.
+    mask : array of Bool
+        True for the values of the series, False for padding.
+    """
+    lengths = np.array([len(values) for values in series], dtype=np.int64)
+    length = int(lengths.max()) if len(lengths) > 0 else 0
+
+    mask = np.arange(length) < lengths[:, np.newaxis]
+    values = np.full(mask.shape, np.nan)
+    if len(lengths) > 0:
+        values[mask] = np.concatenate([np.asarray(s, dtype=float).ravel() 
+                                            for s in series])
+    return values, mask
+
+def power_law_fit(x, y, mask=None):
+    """
+    Least squares fit of many loglog lines at once, of form p0 * ( x^(p1) ).
+
+    Fits a straight line to log(y) against log(x) for every series in one
+    vectorized pass. Points which are zero, negative, or not finite are left
+    out, as are points where mask is False.
+
+    Parameters
+    ----------
+    x : array, list of array
+        x values, 1D (shared by all series) or 2D (one row per series), 
+        or a list of series of different lengths.
+    y : array, list of array
+        y values, 1D (one series), 2D (one row per series), 
+        or a list of series of different lengths.
+    mask : None, array of Bool
+        Points to fit, same shape as y. Default fits all points.
+
+    Returns
+    -------
+    p0 : array
+        Constant of each series.
+    p1 : array
+        Power constant (exponent) of each series.
+    r2 : array
+        Coefficient of determination of each series, in log space.
+        p0, p1, and r2 are NaN for series with fewer than two distinct x.
+
+    Example
+    -------
+    p0, p1, r2 = power_law_fit(x, Y) # Y, (number of series, len(x))
+    loglog_guide_manual(ax, x, p0[:5], p1[:5])
+    """
+
+    def as_array(values):
+        try:
+            return np.asarray(values, dtype=float), None
+        except ValueError:
+            # ragged series
+            return pad_series(values)
+
+    y, y_mask = as_array(y)
+    x, x_mask = as_array(x)
+
+    single = y.ndim == 1
+    y = np.atleast_2d(y)
+    x = np.broadcast_to(x, y.shape)
+
+    valid = np.ones(y.shape, dtype=bool)
+    for m in [x_mask, y_mask, mask]:
+        if m is not None:
+            valid &= np.broadcast_to(np.asarray(m, dtype=bool), y.shape)
+    valid &= np.isfinite(x) & np.isfinite(y) & (x > 0) & (y > 0)
+
+    # logs of the valid points only, others zeroed so they drop out of sums
+    x_log = np.log(x, out=np.zeros(y.shape), where=valid)
+    y_log = np.log(y, out=np.zeros(y.shape), where=valid)
+
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x_log.sum(axis=-1) / n
+        y_mean = y_log.sum(axis=-1) / n
+
+        # centred sums, for accuracy
+        dx = np.where(valid, x_log - x_mean[:, np.newaxis], 0.0)
+        dy = np.where(valid, y_log - y_mean[:, np.newaxis], 0.0)
+        sxx = np.einsum("ij,ij->i", dx, dx)
+        syy = np.einsum("ij,ij->i", dy, dy)
+        sxy = np.einsum("ij,ij->i", dx, dy)
+
+        p1 = sxy / sxx
+        p0 = np.exp(y_mean - p1 * x_mean)
+        # constant y is fitted exactly by a flat line
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), 1.0)
+
+    failed = (n < 2) | ~(sxx > 0)
+    p0[failed] = np.nan
+    p1[failed] = np.nan
+    r2[failed] = np.nan
+
+    if single:
+        return p0[0], p1[0], r2[0]
+    return p0, p1, r2
+
 # Other
 
 def move_view(ax, point, width, height=None, maintain_aspect_ratio=True):
@@ -43,3 +43,33 @@ fig_params_report = {
     # Other
     "brackets" : "round" # "round" (), or "square" []
 }
+
+fig_params_slides = dict(fig_params_report, **{
+    # Slides, beamer presentations -------------------------------------------------
+
+    # \documentclass{beamer}, default 11pt font
+    "font_size" : 10.95,
+
+    # 4:3 paper is 128 mm wide, with 1 cm margins \textwidth is 108 mm, 4.25 inches
+    "width" : 4.25,         # inches
+    "ratio" : 3.0/2.0,
+    "height" : 4.25 / (3.0/2.0),
+
+    # relatively larger text needs more space for the labels
+    "adjust_bottom" : 0.18,
+    "adjust_left" : 0.17,
+    "adjust_subplot_bottom" : 0.24,
+})
+
+fig_params_thesis = dict(fig_params_report, **{
+    # Thesis -----------------------------------------------------------------------
+
+    # \documentclass[11pt,a4paper,twoside]{book}, normal text 10.95pt
+    "font_size" : 10.95,
+
+    # a4 paper with a 1.5 inch binding margin and 1 inch outer margin,
+    # \textwidth of 5.77 inches
+    "width" : 5.7,          # inches
+    "ratio" : 3.0/2.0,
+    "height" : 5.7 / (3.0/2.0),
+})
@@ -0,0 +1,218 @@
+# Figure Parameter Profiles
+#
+# Named sets of figure parameters (report, thesis, slides, ...), validated once
+# when registered, and parameter files parsed once and cached by path
+# and modification time. See get_profile() in plot.py for the cached
+# figure_parameters objects.
+
+import os
+import json
+import logging
+import threading
+
+from .plot_defaults import fig_params_report, fig_params_thesis, fig_params_slides
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+class read_only_dict(dict):
+    """
+    A dictionary which can not be modified, for shared cached parameters.
+    Unlike a mappingproxy it can be pickled (e.g. sent to worker processes)
+    and deep copied.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise Exception("Figure parameters are read only, modify a copy.")
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __reduce__(self):
+        return (read_only_dict, (dict(self),))
+
+# names of the figure parameters, all numbers except brackets
+parameter_names = [
+    "font_size", "width", "ratio", "height", "height_small_percentage",
+    "adjust_bottom", "adjust_left", "adjust_subplot_bottom",
+    "adjust_subplot_label", "adjust_subplot_wspace", "adjust_subplot_hspace",
+    "adjust_subplot_label_right_x", "adjust_subplot_label_right_y",
+    "schematic_adjust_bottom_no_ticks", "brackets",
+]
+
+# parameters which have to be positive
+positive_parameters = ["font_size", "width", "ratio", "height",
+                       "height_small_percentage"]
+
+# parameters which are fractions of the figure
+fraction_parameters = ["height_small_percentage", "adjust_bottom", "adjust_left",
+                       "adjust_subplot_bottom"]
+
+def validate_parameters(parameters, name=""):
+    """
+    Check a dictionary of figure parameters, raising an exception listing
+    every problem found.
+
+    Parameters
+    ----------
+    parameters : dict
+        Figure parameters, see figure_parameters.
+    name : str
+        Name of the profile or file, for the error message.
+
+    Returns
+    -------
+    parameters : read_only_dict
+        A read only copy of the parameters.
+    """
+
+    if not isinstance(parameters, dict):
+        raise Exception("Expecting a dictionary of figure parameters.")
+
+    problems = []
+    for parameter in parameter_names:
+        if parameter not in parameters:
+            problems.append("{} is missing".format(parameter))
+            continue
+        value = parameters[parameter]
+
+        if parameter == "brackets":
+            if value not in ["round", "square"]:
+                problems.append("brackets should be 'round' or 'square'")
+            continue
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            problems.append("{} should be a number".format(parameter))
+            continue
+        if parameter in positive_parameters and not value > 0:
+            problems.append("{} should be positive".format(parameter))
+        if parameter in fraction_parameters and not 0 <= value <= 1:
+            problems.append("{} should be between 0 and 1".format(parameter))
+
+    unknown = [parameter for parameter in parameters
+                    if parameter not in parameter_names]
+    if len(unknown) > 0:
+        logger.info("Unknown figure parameters in %s: %s", name or "profile",
+                                                        ", ".join(unknown))
+
+    if len(problems) > 0:
+        raise Exception("Invalid figure parameters{}: {}.".format(
+                    " in " + name if name else "", "; ".join(problems)))
+
+    return read_only_dict(parameters)
+
+# registry of profiles, name : (version, read only parameters)
+profiles = {}
+_lock = threading.Lock()
+_version = 0
+
+def register_profile(name, parameters):
+    """
+    Register a named profile of figure parameters, validated once.
+    Registering a name again replaces the profile.
+
+    Parameters
+    ----------
+    name : str
+        Name of the profile, e.g. "poster".
+    parameters : dict, str
+        Figure parameters, or a json file of figure parameters.
+
+    Example
+    -------
+    parameters = dict(fig_params_report, width=6.0, height=4.0)
+    register_profile("poster", parameters)
+    sf = standard_figure(fig, axes, "poster")
+    """
+    global _version
+
+    if isinstance(parameters, str):
+        parameters = load_parameters_file(parameters)
+    parameters = validate_parameters(dict(parameters), name)
+
+    with _lock:
+        _version += 1
+        profiles[name] = (_version, parameters)
+    return 0
+
+def profile_names():
+    """
+    Names of the registered profiles.
+    """
+    return list(profiles.keys())
+
+# parsed parameter files, path : (mtime, size, read only parameters)
+_file_cache = {}
+
+def load_parameters_file(filename):
+    """
+    Parse a json file of figure parameters.
+    The result is cached, and the file is only read again when its
+    modification time or size changes.
+
+    Files are not validated, so files with some of the parameters (the 
+    others are None in figure_parameters) still load; register_profile()
+    validates the file.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the json file, e.g. saved by figure_parameters.save_data().
+
+    Returns
+    -------
+    parameters : read_only_dict
+        Read only parameters.
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+
+    cached = _file_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path) as f:
+        parameters = json.load(f)
+    if not isinstance(parameters, dict):
+        raise Exception("Expecting a dictionary of figure parameters in {}."
+                                                            .format(filename))
+    parameters = read_only_dict(parameters)
+
+    _file_cache[path] = (stat.st_mtime_ns, stat.st_size, parameters)
+    logger.debug("Loaded figure parameters from %s.", filename)
+    return parameters
+
+def resolve_profile(profile):
+    """
+    Find a profile by name, or load it from a file.
+
+    Returns
+    -------
+    key : tuple
+        Identifies this version of the profile, for caching.
+    parameters : read_only_dict
+        Read only parameters.
+    """
+    entry = profiles.get(profile)
+    if entry is not None:
+        version, parameters = entry
+        return ("profile", profile, version), parameters
+
+    if os.path.isfile(profile):
+        parameters = load_parameters_file(profile)
+        path = os.path.abspath(profile)
+        mtime, size, _ = _file_cache[path]
+        return ("file", path, mtime, size), parameters
+
+    raise Exception("Unknown figure parameter profile {}, registered profiles "
+                    "are {}.".format(profile, ", ".join(profile_names())))
+
+register_profile("report", fig_params_report)
+register_profile("thesis", fig_params_thesis)
+register_profile("slides", fig_params_slides)
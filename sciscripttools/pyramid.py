@@ -0,0 +1,506 @@
+# Image Pyramids
+#
+# Large 2D images (e.g. 20k x 20k field maps) stored at a series of halved
+# resolutions, optionally as memory mapped files on disk. When drawn, only
+# the part of the level matching the pixel size of the axes and the current
+# view is read, so zooming (e.g. with move_view()) stays fast and the full
+# image never has to be in memory.
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import warnings
+
+import numpy as np
+import matplotlib
+import matplotlib.image
+
+from .locks import temporary_filename
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+# format of the cached pyramid files, increase if the levels change
+pyramid_version = 2
+
+def downsample_block(values):
+    """
+    Halve the resolution of a 2D array, the mean of each 2 x 2 block,
+    ignoring NaNs. Odd edges are averaged over the values available.
+    """
+    dtype = np.result_type(values.dtype, np.float32)
+    values = np.asarray(values, dtype=dtype)
+    ny, nx = values.shape
+
+    if ny % 2 or nx % 2:
+        padded = np.full((ny + ny % 2, nx + nx % 2), np.nan, dtype=dtype)
+        padded[:ny, :nx] = values
+        values = padded
+
+    blocks = values.reshape(values.shape[0] // 2, 2, values.shape[1] // 2, 2)
+    with warnings.catch_warnings():
+        # blocks of only NaNs stay NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(blocks, axis=(1, 3)).astype(dtype, copy=False)
+
+def strip_range(values, low=np.inf, high=-np.inf):
+    """
+    Running minimum and maximum of the finite values of a strip.
+    """
+    values = np.asarray(values)
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return low, high
+    return min(low, float(finite.min())), max(high, float(finite.max()))
+
+def source_key(filename):
+    """
+    Identifies a version of a source file, its path, modification time
+    and size.
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+class image_pyramid:
+    """
+    A 2D image at a series of resolutions, each half the size of the last,
+    down to a minimum size. Level 0 is the image itself.
+
+    With a directory, the levels are written as .npy files and opened as
+    memory maps. If the image is given as a .npy filename, the levels are
+    reused until the file changes. Files of a name which belong to a
+    different image are not overwritten.
+
+    Methods
+    -------
+    build(self)
+        Create the levels, reduced one strip of rows at a time.
+    load(self)
+        Open cached levels, if they match the image.
+    level_for(self, columns, rows, width, height)
+        The coarsest level with at least one value per pixel.
+    value_range(self)
+        Minimum and maximum of the image.
+
+    Class Variables
+    ---------------
+    levels : list of arrays
+        The image at each resolution, levels[0] is the image.
+    shape : tuple
+        Shape of the image, (ny, nx).
+    directory : None, str
+        Directory of the cached levels.
+    name : str
+        Name of the cached files.
+    min_size : int
+        Levels are made until the largest side is at most min_size.
+    range : tuple
+        Minimum and maximum of the finite values of the image, recorded
+        while building the levels.
+    """
+
+    def __init__(self, data, directory=None, name=None, min_size=256,
+                                                        strip_size=2**22):
+        """
+        Parameters
+        ----------
+        data : array, str
+            2D image, or the filename of a .npy file, which is memory mapped.
+        directory : None, str
+            Directory to store the levels in as memory mapped files.
+            Default keeps the levels in memory.
+        name : None, str
+            Name of the stored files.
+            Default is the name of the data file and a hash of its path,
+            or a new unique name for an array.
+        min_size : int
+            Stop when the largest side is at most min_size.
+        strip_size : int
+            Approximate number of values reduced at a time.
+        """
+        self.source = None
+        if isinstance(data, str):
+            self.source = source_key(data)
+            if name is None:
+                # files of the same name in different directories
+                path_hash = hashlib.sha1(self.source[0].encode()).hexdigest()
+                name = "{}_{}".format(
+                    os.path.splitext(os.path.basename(data))[0], path_hash[:8])
+            data = np.load(data, mmap_mode="r")
+
+        if np.ndim(data) != 2:
+            raise Exception("Expected a 2D image, got shape {}.".format(
+                                                            np.shape(data)))
+
+        self.shape = tuple(np.shape(data))
+        self.directory = directory
+        self.name = name
+        self.min_size = max(int(min_size), 1)
+        self.strip_size = strip_size
+        self.levels = [data]
+        self.range = None
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            if self.name is None:
+                self.name = self.reserve_name()
+            elif self.load():
+                return
+            else:
+                self.check_owner()
+        self.build()
+
+    def reserve_name(self):
+        """
+        A new unique name for the files of an array, reserved by creating
+        its metadata file.
+        """
+        descriptor, filename = tempfile.mkstemp(prefix="pyramid_",
+                                        suffix=".json", dir=self.directory)
+        os.close(descriptor)
+        return os.path.splitext(os.path.basename(filename))[0]
+
+    def check_owner(self):
+        """
+        Raise if the stored files of this name belong to a different data
+        file, rather than overwrite them.
+        """
+        try:
+            with open(self.metadata_filename()) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        source = cached.get("source") if isinstance(cached, dict) else None
+        if source is None or self.source is None:
+            # an array, or files of an earlier version of this image
+            if source == self.source:
+                return 0
+        elif source[0] == self.source[0]:
+            return 0
+
+        raise Exception("Pyramid files {} in {} belong to a different image, "
+                        "choose another name.".format(self.name, self.directory))
+
+    def level_filename(self, level):
+        return os.path.join(self.directory, "{}_{}.npy".format(self.name, level))
+
+    def metadata_filename(self):
+        return os.path.join(self.directory, "{}.json".format(self.name))
+
+    def metadata(self, count):
+        return {"version" : pyramid_version, "shape" : list(self.shape),
+                "dtype" : str(self.levels[0].dtype), "min_size" : self.min_size,
+                "levels" : count, "source" : self.source}
+
+    def range_metadata(self):
+        # JSON has no infinity, an image without finite values has no range
+        if not np.all(np.isfinite(self.range)):
+            return None
+        return list(self.range)
+
+    def load(self):
+        """
+        Open cached levels, if they match the image.
+        Only data given as a filename can be matched.
+
+        Returns
+        -------
+        loaded : Bool
+        """
+        if self.source is None:
+            return False
+        try:
+            with open(self.metadata_filename()) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(cached, dict):
+            return False
+        value_range = cached.pop("range", None)
+        if cached != self.metadata(cached.get("levels")):
+            return False
+
+        try:
+            self.levels += [np.load(self.level_filename(level), mmap_mode="r")
+                                for level in range(1, cached["levels"])]
+        except (OSError, ValueError):
+            self.levels = self.levels[:1]
+            return False
+
+        self.range = (np.inf, -np.inf) if value_range is None \
+                                                    else tuple(value_range)
+        logger.debug("Loaded %d cached pyramid levels of %s.",
+                                            len(self.levels), self.name)
+        return True
+
+    def build(self):
+        """
+        Create the levels, reduced one strip of rows at a time, so only
+        a strip of the image is in memory at once. The minimum and maximum
+        of the image are recorded from the strips of level 0, as the other
+        levels only hold block means.
+        """
+        low, high = np.inf, -np.inf
+        image = self.levels[0]
+        rows = max(2 * (self.strip_size // (2 * max(self.shape[1], 1))), 2)
+        if max(self.shape) <= self.min_size:
+            # no levels to build, so the range needs its own pass
+            for start in range(0, self.shape[0], rows):
+                low, high = strip_range(image[start:start + rows], low, high)
+
+        level = 0
+        while max(self.levels[-1].shape) > self.min_size:
+            previous = self.levels[-1]
+            ny, nx = previous.shape
+            shape = ((ny + 1) // 2, (nx + 1) // 2)
+            dtype = np.result_type(previous.dtype, np.float32)
+
+            level += 1
+            if self.directory is None:
+                current = np.empty(shape, dtype=dtype)
+            else:
+                current = np.lib.format.open_memmap(self.level_filename(level),
+                                            mode="w+", dtype=dtype, shape=shape)
+
+            # an even number of rows per strip
+            rows = max(2 * (self.strip_size // (2 * nx)), 2)
+            for start in range(0, ny, rows):
+                strip = np.asarray(previous[start:start + rows])
+                if level == 1:
+                    low, high = strip_range(strip, low, high)
+                current[start // 2:(start + rows + 1) // 2] = \
+                                                    downsample_block(strip)
+
+            if self.directory is not None:
+                current.flush()
+            self.levels.append(current)
+
+        self.range = (low, high)
+
+        # the metadata is written last, marking the levels as complete
+        if self.directory is not None:
+            metadata = self.metadata(len(self.levels))
+            metadata["range"] = self.range_metadata()
+            filename = self.metadata_filename()
+            temporary = temporary_filename(filename)
+            with open(temporary, "w") as f:
+                json.dump(metadata, f)
+            os.replace(temporary, filename)
+
+        logger.debug("Built %d pyramid levels of %s.", len(self.levels),
+                                                                self.name)
+        return 0
+
+    def level_for(self, columns, rows, width, height):
+        """
+        The coarsest level which still has at least one value per pixel.
+
+        Parameters
+        ----------
+        columns, rows : float
+            Number of image columns and rows (at level 0) in view.
+        width, height : float
+            Size of the view in pixels.
+
+        Returns
+        -------
+        level : int
+        """
+        factor = min(columns / max(width, 1), rows / max(height, 1))
+        if factor < 2:
+            return 0
+        level = int(np.floor(np.log2(factor)))
+        return min(level, len(self.levels) - 1)
+
+    def value_range(self):
+        """
+        Minimum and maximum of the finite values of the image, recorded
+        when the levels were built.
+        """
+        if not np.all(np.isfinite(self.range)):
+            return 0.0, 1.0
+        return self.range
+
+class pyramid_image(matplotlib.image.AxesImage):
+    """
+    An image drawn from an image_pyramid. At each draw the level is picked
+    from the pixel size of the axes and the view, and only the tiles of
+    that level in view are read.
+
+    Class Variables
+    ---------------
+    pyramid : image_pyramid
+    full_extent : tuple
+        (x0, x1, y0, y1) of the whole image, in data coordinates.
+    tile_size : int
+        The window read is rounded out to multiples of tile_size values,
+        so small pans reuse the window already read.
+    window : None, tuple
+        The (level, row0, row1, column0, column1) currently shown.
+
+    Methods
+    -------
+    view_window(self, renderer=None)
+        The level and tiles to show for the current view.
+    update_view(self, renderer=None)
+        Read the window for the current view, if it changed.
+    """
+
+    def __init__(self, ax, pyramid, extent, tile_size=256, origin="lower",
+                                                                    **kwargs):
+        super().__init__(ax, origin=origin, **kwargs)
+        self.pyramid = pyramid
+        self.full_extent = tuple(float(e) for e in extent)
+        self.tile_size = max(int(tile_size), 1)
+        self.window = None
+
+        # start with the coarsest level, over the whole image
+        coarse = self.pyramid.levels[-1]
+        self.set_data(np.asarray(coarse))
+        self._extent = self.full_extent
+        self.window = (len(self.pyramid.levels) - 1, 0, coarse.shape[0],
+                                                    0, coarse.shape[1])
+
+    def view_window(self, renderer=None):
+        """
+        The level and tiles to show for the current view.
+
+        Returns
+        -------
+        window : tuple
+            (level, row0, row1, column0, column1), rows from the origin.
+        """
+        ax = self.axes
+        ny, nx = self.pyramid.shape
+        x0, x1, y0, y1 = self.full_extent
+
+        # view in image columns and rows, at level 0
+        fx = (np.array(ax.get_xlim()) - x0) / (x1 - x0)
+        fy = (np.array(ax.get_ylim()) - y0) / (y1 - y0)
+        if self.origin == "upper":
+            fy = 1 - fy
+        columns = np.clip(np.sort(fx * nx), 0, nx)
+        rows = np.clip(np.sort(fy * ny), 0, ny)
+
+        width = ax.bbox.width
+        height = ax.bbox.height
+        level = self.pyramid.level_for(max(columns[1] - columns[0], 1),
+                                       max(rows[1] - rows[0], 1), width, height)
+
+        shape = self.pyramid.levels[level].shape
+        scale = 2**level
+        tile = self.tile_size
+        column0 = int(np.floor(columns[0] / scale / tile)) * tile
+        column1 = min(int(np.ceil(columns[1] / scale / tile)) * tile, shape[1])
+        row0 = int(np.floor(rows[0] / scale / tile)) * tile
+        row1 = min(int(np.ceil(rows[1] / scale / tile)) * tile, shape[0])
+        column1 = max(column1, column0 + 1)
+        row1 = max(row1, row0 + 1)
+        return (level, row0, row1, column0, column1)
+
+    def update_view(self, renderer=None):
+        """
+        Read the window for the current view, if it changed.
+        """
+        window = self.view_window(renderer)
+        if window == self.window:
+            return 0
+
+        level, row0, row1, column0, column1 = window
+        ny, nx = self.pyramid.shape
+        x0, x1, y0, y1 = self.full_extent
+        # size of a value at this level, the last value may overhang the image
+        dx = (x1 - x0) / nx * 2**level
+        dy = (y1 - y0) / ny * 2**level
+
+        if self.origin == "upper":
+            top, bottom = y1 - row0 * dy, y1 - row1 * dy
+        else:
+            bottom, top = y0 + row0 * dy, y0 + row1 * dy
+
+        values = np.asarray(self.pyramid.levels[level][row0:row1, column0:column1])
+        self.set_data(values)
+        # set directly, set_extent() would change the axes limits while drawing
+        self._extent = (x0 + column0 * dx, x0 + column1 * dx, bottom, top)
+        self.window = window
+        logger.debug("Pyramid level %d, window %s.", level, window)
+        return 0
+
+    def draw(self, renderer):
+        self.update_view(renderer)
+        super().draw(renderer)
+
+def pyramid_imshow(ax, data, extent=None, directory=None, name=None,
+                    min_size=256, tile_size=256, origin="lower", cmap=None,
+                    norm=None, vmin=None, vmax=None, aspect=None, **kwargs):
+    """
+    Show a large image from a multi-resolution pyramid, reading only the
+    level and tiles needed for the pixel size of the axes and current view.
+
+    Parameters
+    ----------
+    ax : matplotlib axis
+        Single axis.
+    data : array, str, image_pyramid
+        2D image, the filename of a .npy file (memory mapped), or a pyramid.
+    extent : None, tuple
+        (x0, x1, y0, y1) in data coordinates.
+        Default is the column and row indices, as imshow().
+    directory : None, str
+        Store the levels in this directory as memory mapped files; levels
+        of a .npy file are reused until it changes.
+    name : None, str
+        Name of the stored files, see image_pyramid.
+    min_size : int
+        Size of the coarsest level.
+    tile_size : int
+        Values are read in tiles of tile_size x tile_size.
+    origin : "lower", "upper"
+        Place row 0 of the image at the bottom or top of the extent.
+    cmap, norm, vmin, vmax : optional
+        Colour scale, see imshow(). The default colour limits are the
+        minimum and maximum of the whole image, so colours do not change
+        between views.
+    aspect : None, "equal", "auto", float
+        Axes aspect, see imshow(). Default is rcParams["image.aspect"].
+    **kwargs
+        Passed onto matplotlib AxesImage, e.g. interpolation.
+
+    Returns
+    -------
+    image : pyramid_image
+    """
+    if isinstance(data, image_pyramid):
+        pyramid = data
+    else:
+        pyramid = image_pyramid(data, directory=directory, name=name,
+                                                        min_size=min_size)
+
+    ny, nx = pyramid.shape
+    if extent is None:
+        extent = (-0.5, nx - 0.5, -0.5, ny - 0.5)
+        if origin == "upper":
+            extent = (-0.5, nx - 0.5, ny - 0.5, -0.5)
+
+    if norm is None and (vmin is None or vmax is None):
+        low, high = pyramid.value_range()
+        vmin = low if vmin is None else vmin
+        vmax = high if vmax is None else vmax
+
+    image = pyramid_image(ax, pyramid, extent, tile_size=tile_size,
+                            origin=origin, cmap=cmap, norm=norm, **kwargs)
+    if norm is None:
+        image.set_clim(vmin, vmax)
+
+    ax.add_image(image)
+    # set the axes limits from the whole image
+    image.set_extent(image.full_extent)
+    if aspect is None:
+        aspect = matplotlib.rcParams["image.aspect"]
+    ax.set_aspect(aspect)
+    return image
@@ -0,0 +1,526 @@
+# Out-of-core Reductions
+#
+# Summary statistics of one key across many saved files, read one file
+# and one chunk at a time, so memory use does not grow with the number of
+# files, nor (for .pkl files, and .json files with a key index) with the
+# size of each file.
+
+import logging
+import concurrent.futures
+
+import numpy as np
+
+from .io import prepare_filename, filename_handler, process_filenames
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+class running_statistics:
+    """
+    Accumulate count, mean, variance, minimum and maximum of values,
+    one chunk at a time.
+
+    Chunks are combined with the pairwise update of Chan et al., the
+    numerically stable generalisation of Welford's algorithm, so two
+    accumulators (e.g. from different worker processes) can also be merged.
+    NaNs are counted and otherwise ignored.
+
+    Methods
+    -------
+    update(self, values)
+        Add a chunk of values.
+    merge(self, other)
+        Merge another running_statistics object into this one.
+    empty(self)
+        A new running_statistics object, without values.
+    variance(self, ddof=0)
+        Variance of the values.
+    results(self, ddof=0)
+        Dictionary of the statistics.
+
+    Class Variables
+    ---------------
+    count : int
+        Number of (non NaN) values.
+    nan_count : int
+        Number of NaN values.
+    mean : float
+    m2 : float
+        Sum of squared differences from the mean.
+    min : float
+    max : float
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def combine(self, count, mean, m2, minimum, maximum):
+        """
+        Combine the statistics of another set of values.
+        """
+        if count == 0:
+            return 0
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+        return 0
+
+    def update(self, values):
+        """
+        Add a chunk of values.
+
+        Parameters
+        ----------
+        values : array
+            Values, flattened before use.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+
+        nans = np.isnan(values)
+        nan_count = int(np.count_nonzero(nans))
+        if nan_count > 0:
+            self.nan_count += nan_count
+            values = values[~nans]
+
+        if len(values) == 0:
+            return 0
+
+        mean = values.mean()
+        m2 = np.sum(np.square(values - mean))
+        self.combine(len(values), mean, m2, values.min(), values.max())
+        return 0
+
+    def merge(self, other):
+        """
+        Merge another running_statistics object into this one.
+        """
+        self.nan_count += other.nan_count
+        self.combine(other.count, other.mean, other.m2, other.min, other.max)
+        return 0
+
+    def empty(self):
+        """
+        A new running_statistics object, without values.
+        """
+        return running_statistics()
+
+    def variance(self, ddof=0):
+        """
+        Variance of the values.
+
+        Parameters
+        ----------
+        ddof : int
+            Delta degrees of freedom, 0 for population, 1 for sample.
+        """
+        if self.count - ddof <= 0:
+            return np.nan
+        return float(self.m2 / (self.count - ddof))
+
+    def results(self, ddof=0):
+        """
+        Dictionary of the statistics.
+        """
+        empty = self.count == 0
+        variance = self.variance(ddof)
+        return {
+            "count" : self.count,
+            "nan_count" : self.nan_count,
+            "mean" : np.nan if empty else float(self.mean),
+            "variance" : variance,
+            "std" : float(np.sqrt(variance)),
+            "min" : np.nan if empty else float(self.min),
+            "max" : np.nan if empty else float(self.max),
+            }
+
+class running_histogram:
+    """
+    Accumulate histogram counts on fixed bin edges, one chunk at a time.
+    Values outside of the edges, and NaNs, are counted separately.
+
+    Methods
+    -------
+    update(self, values)
+        Add a chunk of values.
+    merge(self, other)
+        Merge another running_histogram object, with the same edges.
+    empty(self)
+        A new running_histogram object, with the same edges, without values.
+
+    Class Variables
+    ---------------
+    edges : array
+        Bin edges, increasing.
+    counts : array
+        Number of values in each bin.
+    underflow : int
+        Number of values below the first edge.
+    overflow : int
+        Number of values above the last edge.
+    nan_count : int
+        Number of NaN values.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or len(self.edges) < 2:
+            raise Exception("Expected at least two bin edges.")
+
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.nan_count = 0
+
+    def update(self, values):
+        """
+        Add a chunk of values.
+
+        Parameters
+        ----------
+        values : array
+            Values, flattened before use.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+
+        nans = np.isnan(values)
+        self.nan_count += int(np.count_nonzero(nans))
+        values = values[~nans]
+
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+        return 0
+
+    def merge(self, other):
+        """
+        Merge another running_histogram object, with the same edges.
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise Exception("Can only merge histograms with the same edges.")
+
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.nan_count += other.nan_count
+        return 0
+
+    def empty(self):
+        """
+        A new running_histogram object, with the same edges, without values.
+        """
+        return running_histogram(self.edges)
+
+class running_range:
+    """
+    Accumulate the count, minimum, maximum, and smallest positive value of
+    values, one chunk at a time. Used to choose histogram bin edges.
+
+    Methods
+    -------
+    update(self, values)
+        Add a chunk of values.
+    merge(self, other)
+        Merge another running_range object into this one.
+    empty(self)
+        A new running_range object, without values.
+
+    Class Variables
+    ---------------
+    count : int
+        Number of finite values.
+    nan_count : int
+        Number of NaN values.
+    min : float
+    max : float
+    positive_min : float
+        Smallest value above zero, for log bins.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nan_count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.positive_min = np.inf
+
+    def update(self, values):
+        """
+        Add a chunk of values.
+
+        Parameters
+        ----------
+        values : array
+            Values, flattened before use.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+
+        nans = np.isnan(values)
+        self.nan_count += int(np.count_nonzero(nans))
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return 0
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > 0]
+        if len(positive) > 0:
+            self.positive_min = min(self.positive_min, float(positive.min()))
+        return 0
+
+    def merge(self, other):
+        """
+        Merge another running_range object into this one.
+        """
+        self.count += other.count
+        self.nan_count += other.nan_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.positive_min = min(self.positive_min, other.positive_min)
+        return 0
+
+    def empty(self):
+        """
+        A new running_range object, without values.
+        """
+        return running_range()
+
+def histogram_edges(value_range, bins=50, log=False):
+    """
+    Bin edges covering a range of values.
+
+    Parameters
+    ----------
+    value_range : running_range
+        Range of the values, e.g. from reduce_key().
+    bins : int, "sturges", "rice", "sqrt"
+        Number of bins, or a rule for the number of bins from the count.
+    log : Bool
+        Log spaced bins, over the positive values, for log axes.
+
+    Returns
+    -------
+    edges : array
+    """
+    count = max(value_range.count, 1)
+    if bins == "sturges":
+        bins = int(np.ceil(np.log2(count))) + 1
+    elif bins == "rice":
+        bins = int(np.ceil(2 * count**(1.0 / 3.0)))
+    elif bins == "sqrt":
+        bins = int(np.ceil(np.sqrt(count)))
+    elif isinstance(bins, str):
+        raise Exception("Unknown bin rule {}.".format(bins))
+    bins = max(int(bins), 1)
+
+    if value_range.count == 0:
+        raise Exception("No finite values to choose bin edges from.")
+
+    if log:
+        if not np.isfinite(value_range.positive_min):
+            raise Exception("No positive values for log bins.")
+        lower = np.log10(value_range.positive_min)
+        upper = np.log10(value_range.max)
+        if upper == lower:
+            lower -= 0.5
+            upper += 0.5
+        edges = np.logspace(lower, upper, bins + 1)
+        if value_range.max > value_range.positive_min:
+            # exact ends, so rounding does not drop the extreme values
+            edges[0] = value_range.positive_min
+            edges[-1] = value_range.max
+        return edges
+
+    lower = value_range.min
+    upper = value_range.max
+    if upper == lower:
+        lower -= 0.5
+        upper += 0.5
+    return np.linspace(lower, upper, bins + 1)
+
+def reduce_files(filenames, key, reducer, chunk_size=2**20,
+                    file_format=None, directory="", index=False):
+    """
+    Reduce the values of a key across files with a single reducer.
+    Used by reduce_key(), and run within each worker process.
+
+    Returns
+    -------
+    reducer
+        The updated reducer.
+    """
+    for filename in filenames:
+        logger.info("Reading file: %s", filename)
+        filename = prepare_filename(filename, file_format, directory)
+        handler = filename_handler(filename, file_format)
+        for values in handler.iter_values(filename, key, chunk_size,
+                                                                index=index):
+            reducer.update(values)
+
+    return reducer
+
+def reduce_key(*args, key, reducer, chunk_size=2**20, workers=None,
+                    batch_size=64, file_format=None, directory="", index=False):
+    """
+    Reduce the values of a key across a file, or multiple files.
+
+    Files are read one at a time and their values passed to the reducer
+    in chunks. Arrays in .pkl files, and numbers in .json files with 
+    index=True, are read a chunk at a time, so memory use is set by 
+    chunk_size; other items are read whole, then split into chunks.
+    With workers, batches of files are reduced in separate processes, 
+    each into an empty() reducer, and the results merged.
+
+    Parameters
+    ----------
+    *args : str, multiple str, list of str, array of str etc.
+        A string, multiple strings, or collection of strings with the
+        filename(s).
+    key : str
+        Name of the item to reduce in each file.
+    reducer : running_statistics, running_histogram, running_range
+        Reducer object, with update() and merge() methods, and empty() 
+        for workers. It is updated in place, adding to any values it 
+        already holds.
+    chunk_size : int
+        Number of values passed to the reducer at a time.
+    workers : None, int
+        Number of worker processes.
+        Default will reduce in this process.
+    batch_size : int
+        Number of files given to a worker at a time.
+    file_format, directory, index : optional
+        See load_data().
+
+    Returns
+    -------
+    reducer
+        The reducer, holding the result.
+
+    Example
+    -------
+    stats = reduce_key(filenames, key="power", reducer=running_statistics())
+    """
+
+    filenames = process_filenames(args)
+    options = {"chunk_size" : chunk_size, "file_format" : file_format,
+               "directory" : directory, "index" : index}
+
+    if workers is None:
+        return reduce_files(filenames, key, reducer, **options)
+
+    def batches():
+        batch = []
+        for filename in filenames:
+            batch.append(filename)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if len(batch) > 0:
+            yield batch
+
+    # each worker reduces into an empty reducer, so values already in the
+    # reducer are only counted once, when the results are merged into it
+    if not hasattr(reducer, "empty"):
+        raise Exception("Reducers need an empty() method to use workers.")
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        for batch in batches():
+            pending.add(executor.submit(reduce_files, batch, key,
+                                        reducer.empty(), **options))
+            # limit the number of batches in flight
+            if len(pending) >= 2 * workers:
+                finished, pending = concurrent.futures.wait(pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    reducer.merge(future.result())
+
+        for future in concurrent.futures.as_completed(pending):
+            reducer.merge(future.result())
+
+    return reducer
+
+def key_statistics(*args, key, ddof=0, **kwargs):
+    """
+    Count, mean, variance, standard deviation, minimum and maximum of a key
+    across a file, or multiple files.
+
+    See reduce_key() for the other arguments.
+
+    Parameters
+    ----------
+    key : str
+        Name of the item in each file.
+    ddof : int
+        Delta degrees of freedom of the variance.
+
+    Returns
+    -------
+    statistics : dict
+        count, nan_count, mean, variance, std, min, and max.
+
+    Example
+    -------
+    stats = key_statistics("run_01", "run_02", key="power")
+    stats = key_statistics(filenames, key="power", workers=8)
+    """
+    reducer = reduce_key(*args, key=key, reducer=running_statistics(), **kwargs)
+    return reducer.results(ddof)
+
+def key_histogram(*args, key, edges=None, bins=50, log=False, **kwargs):
+    """
+    Histogram of a key across a file, or multiple files.
+
+    Without edges, the files are read twice; first for the range of the
+    values, from which the edges are chosen, and then for the counts.
+
+    See reduce_key() for the other arguments.
+
+    Parameters
+    ----------
+    key : str
+        Name of the item in each file.
+    edges : None, array
+        Bin edges, increasing. Default is chosen from the values.
+    bins : int, "sturges", "rice", "sqrt"
+        Number of bins, or rule for the number of bins, when choosing edges.
+    log : Bool
+        Choose log spaced edges, over the positive values.
+
+    Returns
+    -------
+    counts : array
+        Number of values in each bin.
+    edges : array
+        Bin edges.
+
+    Example
+    -------
+    counts, edges = key_histogram(filenames, key="power",
+                                    edges=np.linspace(0, 1, 51))
+    counts, edges = key_histogram(filenames, key="power", log=True, workers=8)
+    """
+    # read twice, so a generator of filenames is listed first
+    filenames = list(process_filenames(args))
+
+    if edges is None:
+        value_range = reduce_key(filenames, key=key, reducer=running_range(),
+                                                                    **kwargs)
+        edges = histogram_edges(value_range, bins=bins, log=log)
+
+    reducer = reduce_key(filenames, key=key, reducer=running_histogram(edges),
+                                                                **kwargs)
+    return reducer.counts, reducer.edges
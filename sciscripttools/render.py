@@ -0,0 +1,251 @@
+# Batch Figure Rendering
+#
+# Render many standard figures across a pool of worker processes.
+# Each worker sets up the backend and rcParams (with standard_font) once,
+# then renders the figure jobs it is given.
+
+import os
+import time
+import logging
+import traceback
+import concurrent.futures
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from .io import load_dictionary
+from .plot import standard_font, standard_figure
+from .plot_defaults import fig_params_report
+from .figure_cache import unchanged, write_cache
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+class figure_job:
+    """
+    Description of a single figure to render with render_figures().
+
+    The plot callable is called as plot(sf, data), where sf is the
+    standard_figure of the new figure, and should draw onto sf.axes.
+    As jobs are sent to worker processes, plot must be a module level
+    function and data must be picklable; give data as a filename to load
+    it within the worker instead.
+
+    Class Variables
+    ---------------
+    plot : callable
+        Function plot(sf, data) which draws the figure.
+    output : str
+        Filename of the output figure.
+    data : None, str, object
+        Data passed to plot. A string is treated as a filename and loaded
+        with load_dictionary() in the worker.
+    fig_params : str, dict, figure_parameters
+        Parameters for the standard_figure. A profile name (default "report")
+        is only parsed once per worker.
+    nrows, ncols : int
+        Number of rows and columns of subplots.
+    subplots_kw : None, dict
+        Other arguments for plt.subplots(), e.g. {"sharey" : True}.
+    savefig_kw : None, dict
+        Other arguments for fig.savefig(), e.g. {"dpi" : 300}.
+    name : None, str
+        Name for the job in the results. Default is the output filename.
+    files : list of str
+        Other data files read by plot, for skipping unchanged figures.
+
+    Example
+    -------
+    def plot_power(sf, data):
+        sf.axes[0].plot(data["time"], data["power"])
+
+    jobs = [figure_job(plot_power, "figures/run_{}.pdf".format(i),
+                       data="data/run_{}".format(i)) for i in range(1000)]
+    results = render_figures(jobs, workers=8)
+    """
+
+    def __init__(self, plot, output, data=None, fig_params="report",
+                        nrows=1, ncols=1, subplots_kw=None, savefig_kw=None,
+                        name=None, files=()):
+        self.plot = plot
+        self.output = output
+        self.data = data
+        self.fig_params = fig_params
+        self.nrows = nrows
+        self.ncols = ncols
+        self.subplots_kw = subplots_kw
+        self.savefig_kw = savefig_kw
+        self.name = name if name is not None else output
+        self.files = files
+
+    def __repr__(self):
+        return "figure_job({!r})".format(self.name)
+
+def worker_rc_params(font_size):
+    """
+    rcParams the workers render with: those of this process, with
+    standard_font() applied. This process is left unchanged.
+
+    Parameters
+    ----------
+    font_size : float, None
+        Font size for standard_font(). None leaves the fonts as they are.
+
+    Returns
+    -------
+    rc_params : dict
+    """
+    with matplotlib.rc_context():
+        if font_size is not None:
+            standard_font(font_size=font_size)
+        rc_params = dict(matplotlib.rcParams)
+    rc_params.pop("backend", None)
+    return rc_params
+
+def initialise_worker(backend, rc_params):
+    """
+    Set up the backend and rcParams of a worker process, once per process.
+    The rcParams are set in full, so workers render the same whether they
+    are forked from this process or started afresh.
+    """
+    import warnings
+    matplotlib.use(backend)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        matplotlib.rcParams.update(rc_params)
+
+    return 0
+
+def render_job(job):
+    """
+    Render a single figure job.
+
+    Returns
+    -------
+    result : dict
+        name, output, success, error (traceback text), time, pid, and
+        skipped.
+    """
+    start = time.perf_counter()
+    result = {"name" : job.name, "output" : job.output, "success" : False,
+              "error" : None, "pid" : os.getpid(), "skipped" : False}
+
+    fig = None
+    # rcParams set by a job do not carry over to the next job in the worker
+    with matplotlib.rc_context():
+        try:
+            data = job.data
+            if isinstance(data, str):
+                data = load_dictionary(data)
+
+            subplots_kw = job.subplots_kw or {}
+            fig, axes = plt.subplots(job.nrows, job.ncols, **subplots_kw)
+            sf = standard_figure(fig, axes, job.fig_params)
+
+            job.plot(sf, data)
+
+            directory = os.path.dirname(job.output)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            fig.savefig(job.output, **(job.savefig_kw or {}))
+
+            result["success"] = True
+
+        except Exception:
+            logger.warning("Failed to render %s.", job.name)
+            result["error"] = traceback.format_exc()
+
+        finally:
+            if fig is not None:
+                plt.close(fig)
+
+    result["time"] = time.perf_counter() - start
+    return result
+
+def render_figures(jobs, workers=None, backend="Agg",
+                        font_size=fig_params_report["font_size"], chunksize=1,
+                        skip_unchanged=False):
+    """
+    Render a list of figure jobs across a pool of worker processes.
+
+    A failing job does not stop the others; its error is returned in
+    its result.
+
+    The workers render with the rcParams of this process, with 
+    standard_font() applied (see worker_rc_params()), whether they are 
+    forked or started afresh; rcParams set by a job only apply to that job.
+
+    With skip_unchanged, a hash of the inputs of each job (data files, 
+    figure parameters, plot function source, the sciscripttools source, 
+    library versions, the backend and the rcParams of the workers, see 
+    figure_cache.py) is stored next to its output, and jobs whose output 
+    exists with the same hash are not rendered again.
+
+    Parameters
+    ----------
+    jobs : list of figure_job
+        The figures to render.
+    workers : None, int
+        Number of worker processes.
+        Default is the number of processors.
+    backend : "Agg", str
+        Matplotlib backend used by the workers.
+    font_size : float, None
+        Font size for standard_font(), set up once in each worker.
+        None will leave the fonts as they are in this process.
+    chunksize : int
+        Number of jobs sent to a worker at a time.
+        Larger values reduce overhead for many small figures.
+    skip_unchanged : False, Bool
+        Skip jobs whose inputs have not changed since they were rendered.
+
+    Returns
+    -------
+    results : list of dict
+        Result of each job, in the order of jobs.
+        See render_job(); skipped jobs have skipped True.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+    hashes = {}
+    rc_params = worker_rc_params(font_size)
+
+    if skip_unchanged:
+        pending = []
+        # hash the settings applied by the workers, rather than the 
+        # rcParams of this process
+        settings = {"backend" : backend}
+        for i, job in enumerate(jobs):
+            same, digest, known = unchanged(job, settings, rc_params)
+            if same:
+                results[i] = {"name" : job.name, "output" : job.output, 
+                              "success" : True, "error" : None, 
+                              "pid" : os.getpid(), "skipped" : True,
+                              "time" : 0.0}
+            else:
+                pending.append(i)
+                hashes[i] = (digest, known)
+        logger.info("Skipping %d unchanged figures.", len(jobs) - len(pending))
+
+    if len(pending) > 0:
+        with concurrent.futures.ProcessPoolExecutor(
+                            workers, initializer=initialise_worker,
+                            initargs=(backend, rc_params)) as executor:
+            rendered = executor.map(render_job, [jobs[i] for i in pending], 
+                                                        chunksize=chunksize)
+            for i, result in zip(pending, rendered):
+                results[i] = result
+
+    for i, (digest, known) in hashes.items():
+        if results[i]["success"]:
+            write_cache(jobs[i].output, digest, known)
+
+    failed = sum(1 for result in results if not result["success"])
+    if failed > 0:
+        logger.warning("%d of %d figures failed to render.", failed, len(results))
+
+    return results
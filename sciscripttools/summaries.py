@@ -0,0 +1,347 @@
+# Summary Sidecars
+#
+# Small per-key summaries of a data file (count, NaN count, minimum, maximum,
+# smallest positive value, and a coarse quantile sketch), stored next to the
+# file, so plots can be set up (limits, log ranges, colour scales) without
+# reading the data itself.
+
+import os
+import json
+import logging
+
+import numpy as np
+
+from .locks import temporary_filename
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+summary_extension = ".summary"
+summary_version = 2
+
+# probabilities of the quantile sketch
+summary_probabilities = [0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95,
+                         0.99, 1.0]
+
+def summary_filename(filename):
+    """
+    Filename of the summary sidecar of a data file.
+    """
+    return filename + summary_extension
+
+def summarise_item(item):
+    """
+    Summary of the values of an item.
+
+    Parameters
+    ----------
+    item : array, list, number
+        Numeric values. Other items (strings, dictionaries, ...) have no
+        summary.
+
+    Returns
+    -------
+    summary : None, dict
+        count, nan_count, min, max, positive_min, and quantiles (at
+        summary_probabilities), of the finite values; None if the item
+        is not numeric.
+    """
+    try:
+        values = np.asarray(item)
+    except (ValueError, TypeError):
+        return None
+    if values.dtype.kind not in "biuf" or values.size == 0:
+        return None
+
+    values = values.astype(float, copy=False).ravel()
+    nan_count = int(np.count_nonzero(np.isnan(values)))
+    finite = values[np.isfinite(values)]
+
+    summary = {"count" : len(finite), "nan_count" : nan_count,
+               "min" : None, "max" : None, "positive_min" : None,
+               "quantiles" : None}
+    if len(finite) == 0:
+        return summary
+
+    positive = finite[finite > 0]
+    summary["min"] = float(finite.min())
+    summary["max"] = float(finite.max())
+    if len(positive) > 0:
+        summary["positive_min"] = float(positive.min())
+    summary["quantiles"] = [float(q) for q in
+                                np.quantile(finite, summary_probabilities)]
+    return summary
+
+def write_sidecar(filename, summaries, stat=None):
+    """
+    Write the summary sidecar of a data file, recording the modification
+    time, size and inode of the data file.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the data file.
+    summaries : dict
+    stat : None, os.stat_result
+        Of the data file the summaries are of. If another writer has since
+        replaced the file, the sidecar does not match it and is not used.
+        Default is the file now.
+    """
+    if stat is None:
+        stat = os.stat(filename)
+    sidecar = {
+        "version" : summary_version,
+        "mtime" : stat.st_mtime_ns,
+        "size" : stat.st_size,
+        "inode" : stat.st_ino,
+        "probabilities" : summary_probabilities,
+        "keys" : summaries,
+        }
+
+    sidecar_filename = summary_filename(filename)
+    temporary = temporary_filename(sidecar_filename)
+    with open(temporary, "w") as file:
+        json.dump(sidecar, file)
+    os.replace(temporary, sidecar_filename)
+    return 0
+
+def write_summary(filename, data, stat=None):
+    """
+    Write the summary sidecar of a data file, for its numeric items.
+    Call after the data file is written.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the data file.
+    data : dict
+        The data written to the file.
+    stat : None, os.stat_result
+        Of the file the data was written to, see write_sidecar().
+
+    Returns
+    -------
+    summaries : dict
+        key: summary, see summarise_item().
+    """
+    summaries = {}
+    for key, item in data.items():
+        summary = summarise_item(item)
+        if summary is not None:
+            summaries[key] = summary
+
+    write_sidecar(filename, summaries, stat)
+    return summaries
+
+def build_summary(filename, handler):
+    """
+    Summarise a data file by reading it, one item at a time, and write
+    its sidecar. If the sidecar can not be written, the summaries are
+    only returned.
+    """
+    logger.info("Building summary: %s", filename)
+
+    # the file summarised, if another writer replaces it while reading
+    stat = os.stat(filename)
+    summaries = {}
+    for key, item in handler.iter_items(filename, None, index=False):
+        summary = summarise_item(item)
+        if summary is not None:
+            summaries[key] = summary
+
+    try:
+        write_sidecar(filename, summaries, stat)
+    except OSError:
+        logger.warning("Could not write summary for %s.", filename)
+
+    return summaries
+
+def read_summary(filename, handler=None):
+    """
+    Read the summary sidecar of a data file.
+    If it is missing or out of date and a handler is given, the file is
+    read to summarise it again.
+
+    Parameters
+    ----------
+    filename : str
+        Full path of the data file.
+    handler : None, format_handler
+        Handler to read the data file with, if it has to be summarised.
+
+    Returns
+    -------
+    summaries : dict
+        key: summary, see summarise_item().
+    """
+    stat = os.stat(filename)
+
+    try:
+        with open(summary_filename(filename)) as file:
+            sidecar = json.load(file)
+    except (OSError, ValueError):
+        sidecar = None
+
+    if (sidecar is not None
+            and sidecar.get("version") == summary_version
+            and sidecar.get("mtime") == stat.st_mtime_ns
+            and sidecar.get("size") == stat.st_size
+            and sidecar.get("inode") == stat.st_ino):
+        return sidecar["keys"]
+
+    if handler is None:
+        raise Exception("No up to date summary of {}.".format(filename))
+    logger.info("Summary missing or out of date: %s", filename)
+    return build_summary(filename, handler)
+
+def sketch_cdf(summary, values):
+    """
+    Cumulative probability of values, interpolated from the quantile sketch.
+    """
+    quantiles = np.asarray(summary["quantiles"])
+    return np.interp(values, quantiles, summary_probabilities, left=0.0,
+                                                                right=1.0)
+
+def merge_summaries(summaries):
+    """
+    Combine the summaries of a key across files.
+    The quantiles are approximate, from the count weighted quantile sketches.
+
+    Parameters
+    ----------
+    summaries : list of dict
+        Summaries, see summarise_item().
+
+    Returns
+    -------
+    summary : dict
+    """
+    summaries = list(summaries)
+    if len(summaries) == 1:
+        return dict(summaries[0])
+
+    def combine(name, function):
+        values = [s[name] for s in summaries if s.get(name) is not None]
+        return function(values) if len(values) > 0 else None
+
+    summary = {
+        "count" : sum(s["count"] for s in summaries),
+        "nan_count" : sum(s["nan_count"] for s in summaries),
+        "min" : combine("min", min),
+        "max" : combine("max", max),
+        "positive_min" : combine("positive_min", min),
+        "quantiles" : None,
+        }
+
+    sketches = [s for s in summaries if s["count"] > 0]
+    if len(sketches) > 0:
+        # mixture of the sketches, inverted at the sketch probabilities
+        grid = np.unique(np.concatenate([s["quantiles"] for s in sketches]))
+        weights = np.array([s["count"] for s in sketches], dtype=float)
+        cdf = np.array([sketch_cdf(s, grid) for s in sketches])
+        cdf = np.average(cdf, axis=0, weights=weights)
+        quantiles = np.interp(summary_probabilities, cdf, grid)
+        quantiles[0] = summary["min"]
+        quantiles[-1] = summary["max"]
+        summary["quantiles"] = [float(q) for q in quantiles]
+
+    return summary
+
+def summary_quantile(summary, probability):
+    """
+    Value at a probability, interpolated from the quantile sketch.
+    """
+    if summary.get("quantiles") is None:
+        raise Exception("No values in the summary.")
+    return float(np.interp(probability, summary_probabilities,
+                                                    summary["quantiles"]))
+
+def summary_range(summary, log=False, quantiles=None):
+    """
+    Range of the values of a summary.
+
+    Parameters
+    ----------
+    summary : dict
+        See summarise_item().
+    log : Bool
+        Range of the positive values, for log axes.
+    quantiles : None, (float, float)
+        Probabilities of the ends of the range, e.g. (0.01, 0.99) to
+        ignore outliers. Default is the minimum and maximum.
+
+    Returns
+    -------
+    lower, upper : float
+    """
+    if summary.get("count", 0) == 0:
+        raise Exception("No finite values in the summary.")
+
+    if quantiles is None:
+        lower, upper = summary["min"], summary["max"]
+    else:
+        lower = summary_quantile(summary, quantiles[0])
+        upper = summary_quantile(summary, quantiles[1])
+
+    if log:
+        if summary.get("positive_min") is None:
+            raise Exception("No positive values for a log range.")
+        lower = max(lower, summary["positive_min"])
+        upper = max(upper, lower)
+
+    return lower, upper
+
+def summary_limits(summary, log=False, quantiles=None, margin=0.05,
+                                                        locator=None):
+    """
+    Axis limits for the values of a summary.
+
+    Parameters
+    ----------
+    summary : dict, list of dict
+        See summarise_item(); several summaries (e.g. of the keys plotted on
+        one axis) are merged.
+    log : Bool
+        Limits for a log axis, with the margin in decades.
+    quantiles : None, (float, float)
+        Probabilities of the ends of the range, see summary_range().
+    margin : float
+        Fraction of the range added to each end, without a locator.
+    locator : None, matplotlib Locator
+        Round the limits out to the ticks of this locator (e.g. the axis
+        major locator), instead of adding a margin. For log axes the limits
+        are rounded out to whole decades.
+
+    Returns
+    -------
+    lower, upper : float
+    """
+    if isinstance(summary, (list, tuple)):
+        summary = merge_summaries(summary)
+
+    lower, upper = summary_range(summary, log=log, quantiles=quantiles)
+
+    if log:
+        lower, upper = np.log10(lower), np.log10(upper)
+    if upper == lower:
+        # a single value
+        pad = 0.5 if (log or lower == 0) else 0.05 * abs(lower)
+        lower, upper = lower - pad, upper + pad
+    elif locator is None:
+        pad = margin * (upper - lower)
+        lower, upper = lower - pad, upper + pad
+
+    if log:
+        if locator is not None:
+            lower, upper = np.floor(lower), np.ceil(upper)
+        return float(10**lower), float(10**upper)
+
+    if locator is not None:
+        ticks = np.asarray(locator.tick_values(lower, upper))
+        below = ticks[ticks <= lower]
+        above = ticks[ticks >= upper]
+        if len(below) > 0:
+            lower = below.max()
+        if len(above) > 0:
+            upper = above.min()
+    return float(lower), float(upper)
@@ -0,0 +1,300 @@
+# Tracing
+#
+# Opt-in timing of the public functions of the io, conversion and plot
+# modules (and LaTeX renders), recorded as nested spans and exported in the
+# Chrome trace event format, to open in a trace viewer (e.g. Perfetto or
+# chrome://tracing).
+#
+# Functions are only wrapped while tracing is enabled, and restored when it
+# is disabled, so there is no overhead otherwise.
+
+import os
+import sys
+import json
+import time
+import inspect
+import logging
+import functools
+import threading
+import contextlib
+
+# setup logging
+logger = logging.getLogger(__name__)
+
+# modules traced by default
+default_modules = ["io", "conversion", "plot"]
+
+# recorded events, and the originals of the wrapped functions
+_events = []
+_patches = []
+_enabled = False
+_start = 0
+_io_file = "/proc/self/io"
+_io_overhead = 0 # bytes read from _io_file itself
+
+def io_counters():
+    """
+    Bytes read and written by this process so far, or None where not
+    available (only Linux has /proc/self/io).
+    """
+    global _io_file, _io_overhead
+    if _io_file is None:
+        return None
+    try:
+        with open(_io_file) as f:
+            content = f.read()
+        counters = dict(line.split(": ") for line in content.splitlines())
+        # not counting the reads of the counters
+        counts = (int(counters["rchar"]) - _io_overhead, int(counters["wchar"]))
+        _io_overhead += len(content)
+        return counts
+    except (OSError, KeyError, ValueError):
+        _io_file = None
+        return None
+
+def record(name, category, start, end, before, after, error=None):
+    """
+    Add a complete ("X") event for a span.
+    """
+    arguments = {}
+    if before is not None and after is not None:
+        arguments["bytes_read"] = after[0] - before[0]
+        arguments["bytes_written"] = after[1] - before[1]
+    if error is not None:
+        arguments["error"] = repr(error)
+
+    _events.append({"name" : name, "cat" : category, "ph" : "X",
+                    "ts" : (start - _start) / 1000.0,
+                    "dur" : (end - start) / 1000.0,
+                    "pid" : os.getpid(), "tid" : threading.get_ident(),
+                    "args" : arguments})
+    return 0
+
+@contextlib.contextmanager
+def span(name, category="user"):
+    """
+    Record a span around a block of code, while tracing is enabled.
+
+    Example
+    -------
+    with span("load runs"):
+        data = load_data(filenames)
+    """
+    if not _enabled:
+        yield
+        return
+
+    before = io_counters()
+    start = time.perf_counter_ns()
+    error = None
+    try:
+        yield
+    except BaseException as exception:
+        error = exception
+        raise
+    finally:
+        record(name, category, start, time.perf_counter_ns(), before,
+                                                    io_counters(), error)
+
+def traced(function, name, category):
+    """
+    Wrap a function to record a span for each call.
+    Generator functions are timed from the first to the last item.
+    """
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def generator_wrapper(*args, **kwargs):
+            with span(name, category):
+                yield from function(*args, **kwargs)
+        return generator_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with span(name, category):
+            return function(*args, **kwargs)
+    return wrapper
+
+def public_functions(module):
+    """
+    Public functions and methods defined in a module.
+
+    Yields
+    ------
+    owner : module, class
+    attribute : str
+    value
+        The function, or classmethod / staticmethod object.
+    name : str
+        Name of the span.
+    """
+    for attribute, value in list(vars(module).items()):
+        if attribute.startswith("_"):
+            continue
+        if getattr(value, "__module__", None) != module.__name__:
+            continue
+
+        if inspect.isfunction(value):
+            yield module, attribute, value, attribute
+
+        elif inspect.isclass(value):
+            for method_name, method in list(vars(value).items()):
+                if method_name.startswith("_") and method_name != "__init__":
+                    continue
+                if isinstance(method, (classmethod, staticmethod)):
+                    method_function = method.__func__
+                else:
+                    method_function = method
+                if inspect.isfunction(method_function):
+                    yield (value, method_name, method,
+                                        "{}.{}".format(attribute, method_name))
+
+def patch(owner, attribute, value):
+    """
+    Set an attribute, remembering the original.
+    """
+    _patches.append((owner, attribute, vars(owner)[attribute]))
+    setattr(owner, attribute, value)
+    return 0
+
+def enable_tracing(modules=None, latex=True):
+    """
+    Start tracing the public functions of modules of the package.
+
+    The functions are wrapped in place, including where they are imported
+    into other modules of the package (e.g. sciscripttools.load_data).
+
+    Parameters
+    ----------
+    modules : None, list of str
+        Names of the modules, e.g. ["io", "plot", "reductions"].
+        Default is io, conversion and plot.
+    latex : Bool
+        Also trace matplotlib's LaTeX renders (TexManager.make_dvi).
+    """
+    global _enabled, _start
+
+    if _enabled:
+        raise Exception("Tracing is already enabled.")
+    if modules is None:
+        modules = default_modules
+
+    package = __name__.rsplit(".", 1)[0]
+    imported = [m for name, m in list(sys.modules.items())
+                    if m is not None and (name == package
+                                            or name.startswith(package + "."))]
+
+    unknown = [m for m in modules if package + "." + m not in sys.modules]
+    if len(unknown) > 0:
+        raise Exception("Unknown modules to trace: {}.".format(", ".join(unknown)))
+
+    for module_name in modules:
+        module = sys.modules[package + "." + module_name]
+        for owner, attribute, value, name in public_functions(module):
+            if isinstance(value, (classmethod, staticmethod)):
+                wrapped = type(value)(traced(value.__func__, name, module_name))
+                patch(owner, attribute, wrapped)
+                continue
+
+            wrapped = traced(value, name, module_name)
+            patch(owner, attribute, wrapped)
+            if owner is not module:
+                continue
+            # where the function is imported into other modules
+            for other in imported:
+                if other is not module and vars(other).get(attribute) is value:
+                    patch(other, attribute, wrapped)
+
+    if latex:
+        from matplotlib.texmanager import TexManager
+        method = vars(TexManager).get("make_dvi")
+        if isinstance(method, classmethod):
+            patch(TexManager, "make_dvi",
+                    classmethod(traced(method.__func__, "latex render", "latex")))
+        elif inspect.isfunction(method):
+            patch(TexManager, "make_dvi", traced(method, "latex render", "latex"))
+
+    _start = time.perf_counter_ns()
+    _enabled = True
+    logger.info("Tracing enabled for %s.", ", ".join(modules))
+    return 0
+
+def disable_tracing():
+    """
+    Stop tracing, restoring the original functions.
+    The recorded events are kept until clear_trace().
+    """
+    global _enabled
+
+    while len(_patches) > 0:
+        owner, attribute, value = _patches.pop()
+        setattr(owner, attribute, value)
+
+    _enabled = False
+    return 0
+
+def clear_trace():
+    """
+    Remove the recorded events.
+    """
+    del _events[:]
+    return 0
+
+def trace_events():
+    """
+    The recorded events, in the Chrome trace event format, with the
+    process and thread names.
+    """
+    events = list(_events)
+
+    names = []
+    for pid, tid in sorted({(e["pid"], e["tid"]) for e in events}):
+        names.append({"name" : "thread_name", "ph" : "M", "pid" : pid,
+                      "tid" : tid, "args" : {"name" : "thread {}".format(tid)}})
+    for pid in sorted({e["pid"] for e in events}):
+        names.append({"name" : "process_name", "ph" : "M", "pid" : pid,
+                      "args" : {"name" : "sciscripttools {}".format(pid)}})
+
+    return names + events
+
+def export_trace(filename):
+    """
+    Write the recorded events as a Chrome trace event json file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the json file, open with a trace viewer,
+        e.g. https://ui.perfetto.dev or chrome://tracing.
+    """
+    with open(filename, "w") as f:
+        json.dump({"traceEvents" : trace_events(),
+                   "displayTimeUnit" : "ms"}, f)
+    logger.info("Wrote %d trace events to %s.", len(_events), filename)
+    return 0
+
+@contextlib.contextmanager
+def trace(filename=None, modules=None, latex=True):
+    """
+    Trace a block of code, and export the trace.
+
+    Parameters
+    ----------
+    filename : None, str
+        Chrome trace event json file to write.
+        Default keeps the events, see trace_events().
+    modules, latex : optional
+        See enable_tracing().
+
+    Example
+    -------
+    with trace("report_trace.json"):
+        build_report()
+    """
+    clear_trace()
+    enable_tracing(modules=modules, latex=latex)
+    try:
+        yield
+    finally:
+        disable_tracing()
+        if filename is not None:
+            export_trace(filename)
@@ -14,6 +14,11 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="",
     packages=setuptools.find_packages(),
+    entry_points={
+        "console_scripts": [
+            "sciscripttools-migrate=sciscripttools.migrate:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
@@ -0,0 +1,46 @@
+# Tests of zoom / pan animation frames
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from sciscripttools.animate import view_path, render_frames
+
+def make_figure():
+    fig, ax = plt.subplots(figsize=(3, 2), dpi=50)
+    x = np.linspace(0, 10, 200)
+    ax.plot(x, np.sin(x))
+    ax.set_xlim(0, 10)
+    ax.set_ylim(-10, 10)
+    return fig, ax
+
+def test_view_path_key_frames():
+    fig, ax = make_figure()
+    limits = view_path(ax, [[0, 0], [5, 1]], [10, 0.1], frames=21,
+                                                maintain_aspect_ratio=False)
+    assert limits.shape == (21, 4)
+    assert np.allclose(limits[0], [-5, 5, -5, 5])
+    assert np.allclose(limits[-1], [4.95, 5.05, 0.95, 1.05])
+    # widths change geometrically, the middle frame is the geometric mean
+    assert np.isclose(limits[10, 1] - limits[10, 0], 1.0)
+    plt.close(fig)
+
+def test_frames_match_savefig(tmp_path):
+    fig, ax = make_figure()
+    limits = view_path(ax, [[2, 0], [6, 0.5]], [4, 1], frames=6)
+
+    serial = render_frames(fig, ax, limits, str(tmp_path / "serial"))
+    parallel = render_frames(fig, ax, limits, str(tmp_path / "parallel"), 
+                                                                workers=2)
+    assert ax.get_xlim() == (0, 10) and ax.get_ylim() == (-10, 10)
+
+    for i, (xmin, xmax, ymin, ymax) in enumerate(limits):
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        fig.savefig(str(tmp_path / "reference.png"))
+        expected = np.asarray(Image.open(tmp_path / "reference.png"))
+        assert np.array_equal(np.asarray(Image.open(serial[i])), expected)
+        assert np.array_equal(np.asarray(Image.open(parallel[i])), expected)
+    plt.close(fig)
@@ -0,0 +1,45 @@
+# Tests of the batched arrows
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools import standard_figure
+
+def test_arrows_follow_axes():
+    fig, axes = plt.subplots(2, 2)
+    sf = standard_figure(fig, axes.flatten())
+    shafts, heads = sf.schematic_arrow_axes()
+
+    fig.subplots_adjust(left=0.3)
+    fig.canvas.draw()
+
+    # x axis arrows start at the left edge of each axes, in inches
+    starts = np.array([segment[0] for segment in shafts.get_segments()])
+    width, height = fig.get_size_inches()
+    for ax, start in zip(axes.flatten(), starts[:4]):
+        x0, y0 = ax.get_position().x0 * width, ax.get_position().y0 * height
+        assert np.allclose(start, [x0, y0])
+
+    # and the heads end at the right edge
+    tip = heads.get_paths()[0].vertices[1]
+    assert np.isclose(tip[0], axes.flatten()[0].get_position().x1 * width)
+    plt.close(fig)
+
+def test_vector_arrows_fixed_in_data():
+    fig, ax = plt.subplots()
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    sf = standard_figure(fig, ax)
+    shafts, heads = sf.vector_arrows_2D_axes(ax, length=2.0)
+
+    ax.set_xlim(-10, 10)
+    fig.canvas.draw()
+
+    # the base stays at the data point (0, 0)
+    start = shafts.get_segments()[0][0]
+    expected = fig.dpi_scale_trans.inverted().transform(
+                                            ax.transData.transform((0, 0)))
+    assert np.allclose(start, expected)
+    plt.close(fig)
@@ -0,0 +1,61 @@
+# Tests of the deferred mode of standard_figure
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from sciscripttools import standard_figure
+from sciscripttools.plot import deferrable
+
+class probe_figure(standard_figure):
+
+    @deferrable
+    def record(self, name):
+        self.calls.append((name, tuple(self.fig.get_size_inches()),
+                           self.fig.subplotpars.bottom))
+        return 0
+
+def test_apply_order():
+    fig, ax = plt.subplots(figsize=(2, 2))
+    sf = probe_figure(fig, ax, deferred=True)
+    sf.calls = []
+
+    sf.record("first")
+    sf.set_size_inches([5, 3])
+    sf.subplots_adjust(bottom=0.3)
+    sf.record("second")
+    sf.subplots_adjust(bottom=0.25)
+
+    # nothing applied yet
+    assert sf.calls == []
+    assert tuple(fig.get_size_inches()) == (2, 2)
+    assert tuple(sf.get_size_inches()) == (5, 3)
+
+    # the final size and layout first, then the operations in call order
+    sf.apply()
+    assert sf.calls == [("first", (5, 3), 0.25), ("second", (5, 3), 0.25)]
+    assert sf.operations == [] and not sf.deferred
+
+    # applied immediately afterwards
+    sf.record("third")
+    assert sf.calls[-1][0] == "third"
+    plt.close(fig)
+
+def draw(tmp_path, name, deferred):
+    fig, axes = plt.subplots(1, 2)
+    for ax in axes:
+        ax.plot([0, 1], [0, 1])
+    sf = standard_figure(fig, axes, deferred=deferred)
+    sf.schematic_arrow_axes()
+    sf.set_size_inches([4, 2])
+    sf.subplots_adjust(bottom=0.3, wspace=0.4)
+    filename = str(tmp_path / name)
+    sf.savefig(filename, dpi=80)
+    plt.close(fig)
+    return np.asarray(Image.open(filename))
+
+def test_deferred_matches_immediate(tmp_path):
+    assert np.array_equal(draw(tmp_path, "deferred.png", True),
+                          draw(tmp_path, "immediate.png", False))
@@ -0,0 +1,63 @@
+# Tests of density-binned scatter plots
+
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools.density import density_counts, running_density, density_image
+
+def grid_points(n, bins, seed=0):
+    # points away from the bin edges, so any binning agrees
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, bins, n) + rng.uniform(0.1, 0.9, n),
+            rng.integers(0, bins, n) + rng.uniform(0.1, 0.9, n))
+
+def test_counts_match_histogram2d():
+    x, y = grid_points(100000, 40)
+    density = density_counts(x, y, extent=(0, 40, 0, 40), shape=(40, 40),
+                                                            chunk_size=7919)
+    expected, _, _ = np.histogram2d(x, y, bins=40, range=[[0, 40], [0, 40]])
+    # counts have rows in y
+    assert np.array_equal(density.counts, expected.T)
+    assert density.outside == 0 and density.nan_count == 0
+
+def test_log_axes_and_invalid_points():
+    u, v = grid_points(50000, 30, seed=1)
+    x = 10 ** (u / 10)
+    y = 10 ** (v / 10)
+    x[:10] = -1.0      # not on a log axis
+    y[10:15] = np.nan
+    x[15:20] = 1e6     # outside of the extent
+
+    density = density_counts(x, y, extent=(1, 1000, 1, 1000), shape=(30, 30),
+                                            log=(True, True), chunk_size=4096)
+    expected, _, _ = np.histogram2d(u[20:], v[20:], bins=30, 
+                                                range=[[0, 30], [0, 30]])
+    assert np.array_equal(density.counts, expected.T)
+    assert density.nan_count == 15 and density.outside == 5
+
+    xedges, yedges = density.edges()
+    assert np.allclose(xedges, np.logspace(0, 3, 31))
+
+def test_merge():
+    x, y = grid_points(20000, 10)
+    whole = density_counts(x, y, extent=(0, 10, 0, 10), shape=(10, 10))
+    first = running_density((0, 10, 0, 10), (10, 10))
+    second = running_density((0, 10, 0, 10), (10, 10))
+    first.update(x[:5000], y[:5000])
+    second.update(x[5000:], y[5000:])
+    first.merge(second)
+    assert np.array_equal(first.counts, whole.counts)
+
+    with pytest.raises(Exception):
+        first.merge(running_density((0, 10, 0, 10), (5, 5)))
+
+def test_density_image():
+    x, y = grid_points(10000, 20)
+    fig, ax = plt.subplots()
+    image, cbar = density_image(ax, x, y, bins=20, colorbar=True)
+    assert image.get_array().sum() == len(x)
+    assert cbar is not None
+    plt.close(fig)
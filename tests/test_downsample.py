@@ -0,0 +1,69 @@
+# Tests of downsampling for line plots
+
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools.downsample import (minmax_indices, lttb_indices,
+                                       downsample, downsampled_line)
+
+def series(n=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 10, n))
+    y = np.cumsum(rng.normal(size=n))
+    return x, y
+
+def test_minmax_buckets():
+    x, y = series()
+    buckets = 200
+    indices = minmax_indices(x, y, buckets)
+
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert len(indices) <= 4 * buckets
+
+    # first, last, minimum and maximum of every bucket
+    bucket = np.clip(((x - x[0]) * (buckets / (x[-1] - x[0]))).astype(int),
+                                                            0, buckets - 1)
+    kept = set(indices.tolist())
+    for b in np.unique(bucket):
+        members = np.flatnonzero(bucket == b)
+        assert members[0] in kept and members[-1] in kept
+        assert members[np.argmin(y[members])] in kept
+        assert members[np.argmax(y[members])] in kept
+
+def test_lttb_endpoints():
+    x, y = series()
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+    # short series are kept whole
+    assert np.array_equal(lttb_indices(x[:10], y[:10], 500), np.arange(10))
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_unsorted(method):
+    x, y = series(10000)
+    order = np.random.default_rng(1).permutation(len(x))
+    x_down, y_down = downsample(x[order], y[order], 100, method=method)
+    assert x_down[0] == x[0] and x_down[-1] == x[-1]
+    assert np.all(np.diff(x_down) >= 0)
+    if method == "minmax":
+        assert y_down.min() == y.min() and y_down.max() == y.max()
+
+def test_downsampled_line_zoom():
+    x, y = series()
+    fig, ax = plt.subplots()
+    line = downsampled_line(ax, x, y, buckets=100)
+    assert len(line.line.get_xdata()) <= 400
+
+    # zooming in shows the full detail of the view
+    ax.set_xlim(5.0, 5.01)
+    x_view = line.line.get_xdata()
+    visible = np.count_nonzero((x >= 5.0) & (x <= 5.01))
+    assert len(x_view) == visible + 2
+    assert x_view[0] < 5.0 and x_view[-1] > 5.01
+    plt.close(fig)
@@ -0,0 +1,69 @@
+# Tests of saving figures in several formats, and rasterized export
+
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from sciscripttools import standard_figure
+from sciscripttools.export import save_formats, heavy_artists
+
+def make_figure(layout):
+    fig, axes = plt.subplots(2, 2, layout=layout)
+    for ax in axes.flat:
+        ax.plot(np.arange(10) ** 2)
+        ax.set_title("title")
+        ax.set_xlabel("x label")
+    return fig
+
+@pytest.mark.parametrize("layout", [None, "constrained", "tight"])
+def test_raster_matches_savefig(tmp_path, layout):
+    fig = make_figure(layout)
+    save_formats(fig, str(tmp_path / "figure"), [".png", ".pdf"], dpi=[100, 200])
+    plt.close(fig)
+
+    reference = make_figure(layout)
+    for dpi in [100, 200]:
+        reference.savefig(str(tmp_path / "reference.png"), dpi=dpi)
+        saved = np.asarray(Image.open(tmp_path / "figure_{}dpi.png".format(dpi)))
+        expected = np.asarray(Image.open(tmp_path / "reference.png"))
+        assert np.array_equal(saved, expected)
+    plt.close(reference)
+
+@pytest.mark.parametrize("rc", [{"savefig.bbox" : "tight"},
+                                {"savefig.bbox" : "tight", "savefig.pad_inches" : 0.5},
+                                {"savefig.facecolor" : "yellow"},
+                                {"savefig.transparent" : True}])
+def test_raster_matches_savefig_rc(tmp_path, rc):
+    with matplotlib.rc_context(rc):
+        fig = make_figure(None)
+        save_formats(fig, str(tmp_path / "figure.png"), [".png"], dpi=100)
+        fig.savefig(str(tmp_path / "reference.png"), dpi=100)
+        plt.close(fig)
+
+    saved = np.asarray(Image.open(tmp_path / "figure.png"))
+    expected = np.asarray(Image.open(tmp_path / "reference.png"))
+    assert saved.shape == expected.shape
+    assert np.array_equal(saved, expected)
+
+def test_savefig_rasterized(tmp_path):
+    fig, ax = plt.subplots()
+    sf = standard_figure(fig, ax)
+    rng = np.random.default_rng(0)
+    dense = ax.scatter(rng.normal(size=20000), rng.normal(size=20000), s=1)
+    light, = ax.plot([0, 1], [0, 1])
+
+    assert [artist for artist, _ in heavy_artists(fig, 10000)] == [dense]
+
+    report = sf.savefig_rasterized(str(tmp_path / "scatter.pdf"), dpi=100,
+                                                                compare=True)
+    assert report["rasterized"] == 1
+    assert report["vertices"] >= 20000
+    assert report["size"] < report["vector_size"]
+    assert report["size"] == (tmp_path / "scatter.pdf").stat().st_size
+
+    # the artists are left as they were
+    assert not dense.get_rasterized() and not light.get_rasterized()
+    plt.close(fig)
@@ -0,0 +1,46 @@
+# Tests of skipping unchanged figures
+
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+
+from sciscripttools import figure_cache
+from sciscripttools.render import figure_job, render_figures, worker_rc_params
+
+def plot_line(sf, data):
+    sf.axes[0].plot([0, 1, 2], [0, 1, 4])
+
+def render(jobs, **kwargs):
+    # font_size None, as LaTeX may not be installed
+    results = render_figures(jobs, workers=1, font_size=None, 
+                             skip_unchanged=True, **kwargs)
+    assert all(result["success"] for result in results)
+    return [result["skipped"] for result in results]
+
+def test_skip_unchanged(tmp_path):
+    jobs = [figure_job(plot_line, str(tmp_path / "line.png"))]
+    assert render(jobs) == [False]
+    assert render(jobs) == [True]
+
+def test_worker_rc_params_invalidate(tmp_path):
+    jobs = [figure_job(plot_line, str(tmp_path / "line.png"))]
+    render(jobs)
+    with matplotlib.rc_context({"lines.linewidth" : 3.0}):
+        assert render(jobs) == [False]
+        assert render(jobs) == [True]
+
+    # the font size set up in the workers, not the rcParams of this process
+    job = jobs[0]
+    settings = {"backend" : "Agg"}
+    font_size = matplotlib.rcParams["font.size"]
+    assert figure_cache.job_hash(job, {}, settings, worker_rc_params(10)) != \
+           figure_cache.job_hash(job, {}, settings, worker_rc_params(12))
+    assert matplotlib.rcParams["font.size"] == font_size
+
+def test_package_source_invalidates(tmp_path, monkeypatch):
+    jobs = [figure_job(plot_line, str(tmp_path / "line.png"))]
+    render(jobs)
+    # e.g. an edit to plot.py, which plot_line does not mention
+    monkeypatch.setattr(figure_cache, "package_digest", lambda: "edited")
+    assert render(jobs) == [False]
+    assert render(jobs) == [True]
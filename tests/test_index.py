@@ -0,0 +1,57 @@
+# Tests of the key index of json files
+
+import os
+import json
+
+import pytest
+
+from sciscripttools import index, save_data, load_data, load_dictionary
+
+data = {"id" : "wire_001",
+        "note" : "quoted \" brace { and comma , in a string",
+        "nested" : {"a" : [1, 2, {"b" : "]"}], "c" : None},
+        "values" : [0.5, 1.5, 2.5]}
+
+def test_index_matches_json(tmp_path):
+    save_data("wire", data, directory=str(tmp_path))
+    filename = str(tmp_path / "wire.json")
+
+    assert set(index.load_index(filename)) == set(data)
+    assert dict(index.read_indexed_items(filename)) == data
+    assert os.path.exists(index.index_filename(filename))
+
+    key, item = load_data("wire", keys="nested", directory=str(tmp_path), 
+                                                                index=True)
+    assert item == data["nested"]
+
+def test_sidecar_reused(tmp_path, monkeypatch):
+    save_data("wire", data, directory=str(tmp_path))
+    filename = str(tmp_path / "wire.json")
+    index.load_index(filename)
+
+    # as in a new process, the index is read from the sidecar, not the file
+    index._index_cache.clear()
+    def scan(*args, **kwargs):
+        raise AssertionError("json file scanned again")
+    monkeypatch.setattr(index, "scan_json_keys", scan)
+    assert dict(index.read_indexed_items(filename, ["values"])) == \
+                                            {"values" : data["values"]}
+
+def test_index_invalidated(tmp_path):
+    directory = str(tmp_path)
+    save_data("wire", data, directory=directory)
+    filename = str(tmp_path / "wire.json")
+    index.load_index(filename)
+
+    changed = dict(data, id="a much longer wire identifier", extra=[7])
+    save_data("wire", changed, directory=directory)
+
+    # rebuilt in this process, and from the out of date sidecar
+    assert load_dictionary("wire", keys=["id", "extra"], directory=directory,
+                        index=True) == {"id" : changed["id"], "extra" : [7]}
+    index._index_cache.clear()
+    assert dict(index.read_indexed_items(filename)) == changed
+
+    with open(index.index_filename(filename)) as f:
+        sidecar = json.load(f)
+    assert sidecar["size"] == os.path.getsize(filename)
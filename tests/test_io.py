@@ -0,0 +1,34 @@
+# Tests of the io functions
+
+import os
+import json
+
+from sciscripttools import save_data, load_data, load_item
+
+def test_dotted_filename(tmp_path):
+    directory = str(tmp_path)
+    save_data("power_1.5", [1, 2, 3], directory=directory)
+    assert os.path.exists(os.path.join(directory, "power_1.5.json"))
+    assert load_item("power_1.5", directory=directory) == [1, 2, 3]
+
+    save_data("power_2.5", [4, 5], file_format=".pkl", directory=directory)
+    key, data = load_data("power_2.5", directory=directory)
+    assert list(data) == [4, 5]
+
+def test_existing_file_with_suffix(tmp_path):
+    directory = str(tmp_path)
+    with open(os.path.join(directory, "data.txt"), "w") as f:
+        json.dump({"values" : [1, 2]}, f)
+
+    # an existing file is read as it is, as json by default
+    assert load_item("data.txt", directory=directory) == [1, 2]
+
+    # and written as it is
+    save_data("data.txt", {"values" : [3]}, directory=directory)
+    assert load_item("data.txt", directory=directory) == [3]
+    assert not os.path.exists(os.path.join(directory, "data.txt.json"))
+
+    # otherwise the suffix is part of the name
+    save_data("other.txt", {"values" : [4]}, directory=directory)
+    assert os.path.exists(os.path.join(directory, "other.txt.json"))
+    assert load_item("other.txt", directory=directory) == [4]
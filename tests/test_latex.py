@@ -0,0 +1,57 @@
+# Tests of the TeX cache and the mathtext draft mode
+
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools import standard_figure, standard_font
+from sciscripttools.latex import (si_to_mathtext, latex_available, warm_up,
+                                  set_tex_cache, get_tex_cache)
+
+@pytest.mark.parametrize("unit, mathtext", [
+    ("\\meter\\per\\second", "\\mathrm{m}\\,{\\mathrm{s}}^{-1}"),
+    ("\\kilo\\watt", "\\mathrm{kW}"),
+    ("\\micro\\meter", "\\mu\\mathrm{m}"),
+    ("\\square\\meter", "{\\mathrm{m}}^{2}"),
+    ("\\meter\\tothe{3}", "{\\mathrm{m}}^{3}"),
+    ("\\kHz", "\\mathrm{kHz}"),
+    ])
+def test_si_to_mathtext(unit, mathtext):
+    assert si_to_mathtext(unit) == mathtext
+
+def test_draft_mode(tmp_path):
+    with matplotlib.rc_context():
+        standard_font(font_size=10, draft=True)
+        assert matplotlib.rcParams["text.usetex"] == False
+
+        fig, ax = plt.subplots()
+        sf = standard_figure(fig, ax)
+        label = "Speed " + sf.latex_unit("\\meter\\per\\second")
+        assert label == "Speed $(\\mathrm{m}\\,{\\mathrm{s}}^{-1})$"
+
+        # drawn with mathtext, without LaTeX
+        ax.set_ylabel(label)
+        fig.savefig(str(tmp_path / "draft.png"))
+        plt.close(fig)
+
+def test_tex_cache(tmp_path):
+    original = get_tex_cache()
+    try:
+        set_tex_cache(str(tmp_path / "tex"))
+        assert get_tex_cache() == str(tmp_path / "tex")
+        assert (tmp_path / "tex").is_dir()
+    finally:
+        set_tex_cache(original)
+
+@pytest.mark.skipif(not latex_available(), reason="LaTeX not installed")
+def test_warm_up(tmp_path):
+    original = get_tex_cache()
+    try:
+        with matplotlib.rc_context():
+            standard_font(font_size=10)
+            assert warm_up(["Power", "Time"], workers=2, 
+                        cache_directory=str(tmp_path / "tex")) == 3
+        assert len(list((tmp_path / "tex").rglob("*.dvi"))) >= 3
+    finally:
+        set_tex_cache(original)
@@ -0,0 +1,36 @@
+# Tests of lazy loading of dictionaries
+
+import numpy as np
+import pytest
+
+from sciscripttools import save_data, load_dictionary
+
+@pytest.mark.parametrize("file_format", [".json", ".pkl"])
+def test_lazy_dictionary(tmp_path, file_format):
+    directory = str(tmp_path)
+    data = {"id" : "run_01", "power" : [1.0, 2.0, 3.0], "time" : [0, 1, 2]}
+    save_data("run", data, file_format=file_format, directory=directory)
+
+    lazy = load_dictionary("run", directory=directory, lazy=True)
+    assert list(lazy) == list(data)
+    assert len(lazy) == 3 and "power" in lazy
+    assert lazy.loaded == {}
+
+    # only the accessed item is read
+    assert np.array_equal(lazy["power"], data["power"])
+    assert list(lazy.loaded) == ["power"]
+    assert lazy["id"] == "run_01"
+    assert set(lazy.loaded) == {"power", "id"}
+
+    with pytest.raises(KeyError):
+        lazy["missing"]
+
+    assert {key : list(np.atleast_1d(value)) for key, value in lazy.items()} \
+        == {key : list(np.atleast_1d(value)) for key, value in data.items()}
+
+def test_lazy_keys(tmp_path):
+    directory = str(tmp_path)
+    save_data("run", {"a" : 1, "b" : 2, "c" : 3}, directory=directory)
+    lazy = load_dictionary("run", keys=["c", "a"], directory=directory, lazy=True)
+    assert list(lazy) == ["c", "a"]
+    assert dict(lazy) == {"c" : 3, "a" : 1}
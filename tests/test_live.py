@@ -0,0 +1,50 @@
+# Tests of the live figures
+
+import time
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools import standard_figure
+from sciscripttools.live import live_figure
+
+def append_time(live, line, start, count=50, size=100):
+    times = []
+    for i in range(count):
+        x = start + i * size + np.arange(size, dtype=float)
+        begin = time.perf_counter()
+        live.append(line, x, np.sin(x))
+        times.append(time.perf_counter() - begin)
+    return min(times)
+
+def test_append_cost_flat():
+    fig, ax = plt.subplots()
+    sf = standard_figure(fig, ax)
+    live = live_figure(sf)
+    line = live.add_line(ax, capacity=1000)
+    live.update()
+
+    early = append_time(live, line, 0)
+    # a long run, through many frozen buffers
+    for start in range(5000, 2000000, 100000):
+        x = start + np.arange(100000, dtype=float)
+        live.append(line, x, np.sin(x))
+    late = append_time(live, line, 2000000)
+
+    entry = live.lines[line]
+    # only the last buffer is set on the line being appended to
+    assert len(entry["line"].get_xdata()) <= 1000
+    assert late < 5 * early + 1e-4
+
+    # every point is drawn, with each buffer continuing from the last
+    points = np.concatenate([chunk.get_xdata() for chunk in entry["chunks"]]
+                            + [entry["line"].get_xdata()])
+    assert np.array_equal(np.unique(points), np.arange(2005000, dtype=float))
+    for chunk, after in zip(entry["chunks"], entry["chunks"][1:]):
+        assert chunk.get_xdata()[-1] == after.get_xdata()[0]
+        assert chunk.get_color() == after.get_color()
+
+    live.update()
+    plt.close(fig)
@@ -0,0 +1,74 @@
+# Tests of concurrent writers
+
+import os
+import concurrent.futures
+
+import numpy as np
+import pytest
+
+from sciscripttools import save_data, load_item, load_summary
+from sciscripttools.formats import format_handler, register_format
+from sciscripttools.locks import link_unique_filename
+
+def save_unique(directory, value):
+    return save_data("run", {"values" : np.full(10000, float(value))},
+                        directory=directory, unique=True)[0]
+
+def save_with_summary(directory, value):
+    save_data("shared", {"values" : np.full(1000 + value, float(value))},
+                        directory=directory, summary=True)
+    return 0
+
+def test_concurrent_unique_writers(tmp_path):
+    directory = str(tmp_path)
+    with concurrent.futures.ProcessPoolExecutor(4) as executor:
+        filenames = list(executor.map(save_unique, [directory] * 16, range(16)))
+
+    assert len(set(filenames)) == 16
+    values = set()
+    for filename in filenames:
+        data = load_item(filename, keys="values")
+        assert len(data) == 10000
+        values.add(data[0])
+    assert values == set(float(v) for v in range(16))
+
+    # only the data files, no temporary or placeholder files left
+    assert sorted(os.listdir(directory)) == sorted(os.path.basename(f)
+                                                        for f in filenames)
+
+def test_summary_matches_data(tmp_path):
+    directory = str(tmp_path)
+    with concurrent.futures.ProcessPoolExecutor(4) as executor:
+        list(executor.map(save_with_summary, [directory] * 16, range(16)))
+
+    data = load_item("shared", keys="values", directory=directory)
+    summary = load_summary("shared", directory=directory)["values"]
+    assert summary["count"] == len(data)
+    assert summary["max"] == max(data)
+
+class failing_handler(format_handler):
+    extension = ".fail"
+
+    def encode(self, data, file):
+        file.write("partial")
+        raise Exception("Failed to encode.")
+
+def test_failed_unique_write(tmp_path):
+    register_format(failing_handler())
+    with pytest.raises(Exception):
+        save_data("run", {"values" : [1]}, file_format=".fail",
+                            directory=str(tmp_path), unique=True)
+    assert os.listdir(str(tmp_path)) == []
+
+def test_link_never_overwrites(tmp_path):
+    existing = str(tmp_path / "run.json")
+    with open(existing, "w") as f:
+        f.write("existing")
+    temporary = str(tmp_path / "temporary")
+    with open(temporary, "w") as f:
+        f.write("new")
+
+    filename = link_unique_filename(temporary, existing)
+    assert filename == str(tmp_path / "run_1.json")
+    assert open(existing).read() == "existing"
+    assert not os.path.exists(temporary)
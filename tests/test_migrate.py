@@ -0,0 +1,61 @@
+# Tests of the archive migration
+
+import os
+import json
+
+import numpy as np
+
+from sciscripttools import load_dictionary
+from sciscripttools.migrate import (convert_file, values_equal, migrate,
+                                    find_files, journal_default)
+
+def test_convert_nested_dictionary(tmp_path):
+    original = {"a" : [1.0, 2.0, 3.0], "d" : {"e" : [[1, 2], [3, 4]],
+                                             "f" : {"g" : [5, 6, 7]}}}
+    filename = os.path.join(str(tmp_path), "nested.json")
+    with open(filename, "w") as f:
+        json.dump(original, f)
+
+    result = convert_file(filename, ".pkl", verify=True, remove=True)
+    assert result["status"] == "ok", result["error"]
+    assert not os.path.exists(filename)
+
+    converted = load_dictionary(result["target"])
+    assert isinstance(converted["d"], dict)
+    assert isinstance(converted["d"]["f"], dict)
+    np.testing.assert_array_equal(converted["d"]["e"], [[1, 2], [3, 4]])
+    np.testing.assert_array_equal(converted["d"]["f"]["g"], [5, 6, 7])
+
+def test_values_equal_object_arrays():
+    assert values_equal([1, None], np.array([1, None], dtype=object))
+    assert not values_equal([1, None], np.array([2, None], dtype=object))
+    assert values_equal([[1, 2], [3]], np.array([[1, 2], [3]], dtype=object))
+    assert not values_equal([1, None], [1, None, 3])
+
+def test_journal_resume(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "sub"))
+    for i, name in enumerate(["a", "b", os.path.join("sub", "c"), 
+                                            os.path.join("sub", "d")]):
+        with open(os.path.join(root, name + ".json"), "w") as f:
+            json.dump({"values" : [i, i + 1]}, f)
+
+    # an interrupted run: two files converted, one failed, a line cut short
+    filenames = sorted(find_files(root, ".json"))
+    journal = os.path.join(root, journal_default)
+    with open(journal, "w") as f:
+        for filename in filenames[:2]:
+            f.write(json.dumps(convert_file(filename, ".pkl")) + "\n")
+        f.write(json.dumps({"source" : filenames[2], "status" : "failed"}) + "\n")
+        f.write('{"source" : "')
+
+    summary = migrate(root, ".pkl", workers=2)
+    assert summary["skipped"] == 2
+    assert summary["converted"] == 2 and summary["failed"] == 0
+    for filename in filenames:
+        target = os.path.splitext(filename)[0] + ".pkl"
+        assert load_dictionary(target) is not None
+
+    # nothing left to do
+    summary = migrate(root, ".pkl", workers=2)
+    assert summary["skipped"] == 4 and summary["converted"] == 0
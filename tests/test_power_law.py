@@ -0,0 +1,56 @@
+# Tests of batch power-law fitting
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools.plot import power_law_fit, loglog_guide_manual
+
+def test_matches_polyfit():
+    rng = np.random.default_rng(0)
+    x = np.logspace(0, 3, 50)
+    p0 = rng.uniform(0.5, 5, 20)
+    p1 = rng.uniform(-2, 2, 20)
+    Y = p0[:, np.newaxis] * x**p1[:, np.newaxis] \
+                * np.exp(rng.normal(scale=0.1, size=(20, 50)))
+
+    fit_p0, fit_p1, r2 = power_law_fit(x, Y)
+    for i in range(20):
+        slope, intercept = np.polyfit(np.log(x), np.log(Y[i]), 1)
+        assert np.isclose(fit_p1[i], slope)
+        assert np.isclose(fit_p0[i], np.exp(intercept))
+        assert 0.0 < r2[i] <= 1.0
+
+    # a single series gives scalars
+    single = power_law_fit(x, Y[3])
+    assert np.allclose(single, (fit_p0[3], fit_p1[3], r2[3]))
+
+def test_ragged_masked_and_invalid():
+    x = [np.array([1.0, 2.0, 4.0]), np.array([1.0, 10.0]), np.array([5.0])]
+    y = [2 * x[0]**1.5, 3 * x[1]**-1.0, np.array([1.0])]
+    p0, p1, r2 = power_law_fit(x, y)
+    assert np.allclose(p0[:2], [2.0, 3.0])
+    assert np.allclose(p1[:2], [1.5, -1.0])
+    assert np.allclose(r2[:2], 1.0)
+    # fewer than two points
+    assert np.isnan(p0[2]) and np.isnan(p1[2]) and np.isnan(r2[2])
+
+    # zero, negative and masked points are left out
+    x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    y = 2 * x**2
+    y[1] = 0.0
+    y[2] = -1.0
+    mask = np.array([True, True, True, True, False])
+    y_outlier = y.copy()
+    y_outlier[4] = 1e6
+    p0, p1, r2 = power_law_fit(x, y_outlier, mask=mask)
+    assert np.isclose(p0, 2.0) and np.isclose(p1, 2.0)
+
+def test_guide_lines():
+    fig, ax = plt.subplots()
+    loglog_guide_manual(ax, np.logspace(0, 2, 10), [1.0, 2.0, 3.0], 
+                                                   [1.0, 0.5, -1.0])
+    assert len(ax.lines) == 3
+    assert np.allclose(ax.lines[1].get_ydata(), 2.0 * np.logspace(0, 2, 10)**0.5)
+    plt.close(fig)
@@ -0,0 +1,49 @@
+# Tests of the figure parameter profiles
+
+import copy
+import json
+import pickle
+
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools import figure_parameters, get_profile, standard_figure
+
+def test_profile_pickle_and_copy():
+    fig_params = get_profile("slides")
+    loaded = pickle.loads(pickle.dumps(fig_params))
+    assert loaded.width == fig_params.width
+    assert copy.deepcopy(fig_params).create_dictionary() == \
+                                            fig_params.create_dictionary()
+
+    with pytest.raises(Exception):
+        fig_params.width = 1.0
+    with pytest.raises(Exception):
+        fig_params.parameters_dictionary["width"] = 1.0
+
+def test_partial_parameter_file(tmp_path):
+    filename = str(tmp_path / "partial.json")
+    with open(filename, "w") as f:
+        json.dump({"width" : 4.0, "height" : None}, f)
+
+    fig_params = figure_parameters(filename)
+    assert fig_params.width == 4.0
+    assert fig_params.height is None
+    assert fig_params.font_size is None
+
+def test_default_parameters_modifiable():
+    fig, ax = plt.subplots()
+    sf = standard_figure(fig, ax)
+    sf.fig_params.width = 3.0
+    assert get_profile("report").width != 3.0
+
+    other = standard_figure(fig, ax, "report")
+    assert other.fig_params is not sf.fig_params
+    assert other.fig_params.width == get_profile("report").width
+    plt.close(fig)
+
+def test_thesis_profile():
+    fig_params = get_profile("thesis")
+    assert fig_params.width > get_profile("report").width
@@ -0,0 +1,57 @@
+# Tests of the image pyramids
+
+import os
+
+import numpy as np
+import pytest
+
+from sciscripttools.pyramid import image_pyramid
+
+def test_value_range_of_peaks(tmp_path):
+    image = np.zeros((2048, 2048))
+    image[100, 200] = 100.0
+    image[5, 7] = -3.0
+
+    pyramid = image_pyramid(image, min_size=64, strip_size=2**16)
+    assert pyramid.value_range() == (-3.0, 100.0)
+
+    # recorded in the metadata of cached levels
+    filename = str(tmp_path / "image.npy")
+    np.save(filename, image)
+    image_pyramid(filename, directory=str(tmp_path / "cache"), min_size=64)
+    cached = image_pyramid(filename, directory=str(tmp_path / "cache"),
+                                                                min_size=64)
+    assert len(cached.levels) > 1
+    assert cached.value_range() == (-3.0, 100.0)
+
+    # images at most min_size have no levels to build
+    small = image_pyramid(image[:50, :50], min_size=64)
+    assert small.value_range() == (-3.0, 0.0)
+
+def test_arrays_do_not_share_files(tmp_path):
+    directory = str(tmp_path)
+    first = image_pyramid(np.ones((512, 512)), directory=directory, min_size=64)
+    second = image_pyramid(np.full((512, 512), 2.0), directory=directory,
+                                                                min_size=64)
+    assert first.name != second.name
+    assert np.all(np.asarray(first.levels[-1]) == 1.0)
+    assert np.all(np.asarray(second.levels[-1]) == 2.0)
+
+def test_other_source_not_overwritten(tmp_path):
+    cache = str(tmp_path / "cache")
+    filenames = []
+    for i in range(2):
+        os.makedirs(str(tmp_path / str(i)))
+        filename = str(tmp_path / str(i) / "field.npy")
+        np.save(filename, np.full((512, 512), float(i)))
+        filenames.append(filename)
+
+    # the default names of files include their path
+    first = image_pyramid(filenames[0], directory=cache, min_size=64)
+    second = image_pyramid(filenames[1], directory=cache, min_size=64)
+    assert first.name != second.name
+    assert np.all(np.asarray(first.levels[-1]) == 0.0)
+
+    image_pyramid(filenames[0], directory=cache, name="field", min_size=64)
+    with pytest.raises(Exception):
+        image_pyramid(filenames[1], directory=cache, name="field", min_size=64)
@@ -0,0 +1,130 @@
+# Tests of the out-of-core reductions
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from sciscripttools import save_data
+from sciscripttools.index import load_index
+from sciscripttools.reductions import (running_statistics, running_range,
+                                       running_histogram, histogram_edges,
+                                       reduce_key, key_statistics,
+                                       key_histogram)
+
+def save_runs(directory, file_format, count=3, size=1000):
+    rng = np.random.default_rng(1)
+    arrays = []
+    filenames = []
+    for i in range(count):
+        values = rng.normal(i, 1 + i, size)
+        values[::97] = np.nan
+        arrays.append(values)
+        name = "run_{}".format(i)
+        save_data(name, {"power" : values}, file_format=file_format,
+                                                        directory=directory)
+        filenames.append(name)
+    return filenames, np.concatenate(arrays)
+
+@pytest.mark.parametrize("file_format, index", [(".pkl", False),
+                                    (".json", False), (".json", True)])
+def test_statistics_match_numpy(tmp_path, file_format, index):
+    filenames, values = save_runs(str(tmp_path), file_format)
+    stats = key_statistics(filenames, key="power", ddof=1, chunk_size=100,
+                file_format=file_format, directory=str(tmp_path), index=index)
+
+    finite = values[~np.isnan(values)]
+    assert stats["count"] == len(finite)
+    assert stats["nan_count"] == np.count_nonzero(np.isnan(values))
+    assert np.isclose(stats["mean"], finite.mean())
+    assert np.isclose(stats["variance"], finite.var(ddof=1))
+    assert stats["min"] == finite.min() and stats["max"] == finite.max()
+
+def test_merge_matches_numpy():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(10, 3, n) for n in [1, 10, 1000, 0, 50]]
+    total = running_statistics()
+    for part in parts:
+        single = running_statistics()
+        single.update(part)
+        total.merge(single)
+
+    values = np.concatenate(parts)
+    assert total.count == len(values)
+    assert np.isclose(total.mean, values.mean())
+    assert np.isclose(total.variance(), values.var())
+
+@pytest.mark.parametrize("file_format, index", [(".pkl", False),
+                                                (".json", True)])
+def test_chunked_memory(tmp_path, file_format, index):
+    size = 2**20
+    save_data("large", {"power" : np.arange(size, dtype=float)},
+                            file_format=file_format, directory=str(tmp_path))
+    if index:
+        # the key index is built once, by its own chunked scan
+        load_index(str(tmp_path / "large.json"))
+
+    tracemalloc.start()
+    stats = key_statistics("large", key="power", chunk_size=2**14,
+                file_format=file_format, directory=str(tmp_path), index=index)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert stats["count"] == size
+    # much less than the 8 MB of the values
+    assert peak < 4 * 2**20
+
+def test_workers_count_reducer_once(tmp_path):
+    filenames, values = save_runs(str(tmp_path), ".pkl", count=4)
+
+    reducer = running_statistics()
+    reducer.update([1000.0, 2000.0])
+    reduce_key(filenames, key="power", reducer=reducer, workers=2,
+                                    batch_size=1, directory=str(tmp_path))
+
+    finite = values[~np.isnan(values)]
+    assert reducer.count == len(finite) + 2
+    assert np.isclose(reducer.mean,
+                        np.concatenate([finite, [1000.0, 2000.0]]).mean())
+
+def test_histogram_of_generator(tmp_path):
+    filenames, values = save_runs(str(tmp_path), ".pkl")
+
+    counts, edges = key_histogram((name for name in filenames), key="power",
+                                        bins=20, directory=str(tmp_path))
+    finite = values[~np.isnan(values)]
+    expected, expected_edges = np.histogram(finite, bins=20)
+    assert np.allclose(edges, expected_edges)
+    assert np.array_equal(counts, expected)
+
+@pytest.mark.parametrize("file_format, workers", [(".json", None), (".pkl", 2)])
+def test_histogram_fixed_edges(tmp_path, file_format, workers):
+    filenames, values = save_runs(str(tmp_path), file_format)
+    edges = np.linspace(-2, 4, 13)
+
+    histogram = reduce_key(filenames, key="power", workers=workers,
+                reducer=running_histogram(edges), chunk_size=128,
+                file_format=file_format, directory=str(tmp_path))
+    finite = values[~np.isnan(values)]
+    assert np.array_equal(histogram.counts, np.histogram(finite, edges)[0])
+    assert histogram.underflow == np.count_nonzero(finite < -2)
+    assert histogram.overflow == np.count_nonzero(finite > 4)
+    assert histogram.nan_count == np.count_nonzero(np.isnan(values))
+
+    counts, _ = key_histogram(filenames, key="power", edges=edges,
+                            file_format=file_format, directory=str(tmp_path))
+    assert np.array_equal(counts, histogram.counts)
+
+def test_histogram_edge_rules():
+    value_range = running_range()
+    value_range.update([-1.0, 0.0, 0.01, 10.0, 100.0, np.nan])
+    assert len(histogram_edges(value_range, bins="sturges")) == 5
+    assert len(histogram_edges(value_range, bins="sqrt")) == 4
+
+    # log edges over the positive values
+    edges = histogram_edges(value_range, bins=4, log=True)
+    assert np.isclose(edges[0], 0.01) and np.isclose(edges[-1], 100.0)
+    assert np.allclose(np.diff(np.log10(edges)), 1.0)
+
+    with pytest.raises(Exception):
+        histogram_edges(value_range, bins="unknown")
@@ -0,0 +1,37 @@
+# Tests of parallel batch figure rendering
+
+import os
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+
+from sciscripttools import save_data
+from sciscripttools.render import figure_job, render_figures
+
+def plot_power(sf, data):
+    sf.axes[0].plot(data["time"], data["power"])
+
+def plot_fails(sf, data):
+    raise ValueError("bad data")
+
+def test_render_figures(tmp_path):
+    directory = str(tmp_path)
+    for i in range(3):
+        save_data("run_{}".format(i), {"time" : np.arange(10),
+                  "power" : np.arange(10) * i}, directory=directory)
+
+    jobs = [figure_job(plot_power, os.path.join(directory, "run_{}.png".format(i)),
+                       data=os.path.join(directory, "run_{}".format(i)))
+            for i in range(3)]
+    jobs.insert(1, figure_job(plot_fails, os.path.join(directory, "fails.png")))
+
+    # font_size None, as LaTeX may not be installed
+    results = render_figures(jobs, workers=2, font_size=None)
+
+    # in the order of the jobs, a failure does not stop the others
+    assert [result["name"] for result in results] == [job.name for job in jobs]
+    assert [result["success"] for result in results] == [True, False, True, True]
+    assert "bad data" in results[1]["error"]
+    for job, result in zip(jobs, results):
+        assert os.path.exists(job.output) == result["success"]
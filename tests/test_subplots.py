@@ -0,0 +1,50 @@
+# Tests of standard subplot grids and subplot labels
+
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from sciscripttools import standard_subplots, get_profile
+from sciscripttools.plot import subplot_labels
+
+def test_subplot_label_schemes():
+    labels = subplot_labels(703)
+    assert labels[:3] == ["a", "b", "c"]
+    assert labels[25:28] == ["z", "aa", "ab"]
+    assert labels[701:] == ["zz", "aaa"]
+    assert len(set(labels)) == 703
+
+    assert subplot_labels(4, "ROMAN") == ["I", "II", "III", "IV"]
+    assert subplot_labels(3, "number") == ["1", "2", "3"]
+    assert subplot_labels(2, lambda i: "p{}".format(i)) == ["p0", "p1"]
+    assert subplot_labels(2, ["x", "y", "z"]) == ["x", "y"]
+
+    with pytest.raises(Exception):
+        subplot_labels(3, ["x", "y"])
+    with pytest.raises(Exception):
+        subplot_labels(3, "greek")
+
+def test_standard_subplots_grid():
+    fig_params = get_profile("report")
+    fig, axes, sf = standard_subplots(6, 6, sharex=True)
+
+    assert axes.shape == (6, 6)
+    assert sf.axes == list(axes.ravel())
+    assert np.allclose(fig.get_size_inches(), 
+                       (fig_params.width, fig_params.height))
+    assert fig.subplotpars.left == fig_params.adjust_left
+    assert fig.subplotpars.bottom == fig_params.adjust_bottom
+
+    # standard ticks from the start, on every axes
+    for ax in [axes[0, 0], axes[-1, -1]]:
+        ticks = ax.xaxis.get_major_ticks()[0]
+        assert ticks.get_tickdir() == "in"
+        assert ticks.tick2line.get_visible()
+
+    sf.add_subplot_labels()
+    texts = [ax.texts[0].get_text() for ax in sf.axes]
+    assert texts[0] == "(a)" and texts[26] == "(aa)"
+    assert len(set(texts)) == 36
+    plt.close(fig)
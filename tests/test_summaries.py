@@ -0,0 +1,69 @@
+# Tests of the summary sidecars
+
+import numpy as np
+import pytest
+
+from sciscripttools import save_data, load_summary, formats
+from sciscripttools.summaries import (summarise_item, merge_summaries,
+                                      summary_limits, summary_probabilities)
+
+def test_summarise_item():
+    values = np.array([-2.0, 0.0, 0.5, 3.0, np.nan, np.inf, 8.0])
+    summary = summarise_item(values)
+    finite = values[np.isfinite(values)]
+    assert summary["count"] == 5 and summary["nan_count"] == 1
+    assert (summary["min"], summary["max"]) == (-2.0, 8.0)
+    assert summary["positive_min"] == 0.5
+    assert np.allclose(summary["quantiles"], 
+                       np.quantile(finite, summary_probabilities))
+
+    assert summarise_item("text") is None
+    assert summarise_item({"a" : 1}) is None
+
+def test_load_summary_without_reading_data(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(i, 1, 2000) for i in range(3)]
+    filenames = []
+    for i, part in enumerate(parts):
+        save_data("run_{}".format(i), {"power" : part, "name" : "run"},
+                                        directory=directory, summary=True)
+        filenames.append("run_{}".format(i))
+
+    def read(*args, **kwargs):
+        raise AssertionError("data file read")
+    monkeypatch.setattr(formats.json_handler, "decode", read)
+    monkeypatch.setattr(formats, "read_indexed_items", read)
+
+    summaries = load_summary(filenames, directory=directory)
+    assert [list(summary) for summary in summaries] == [["power"]] * 3
+
+    merged = load_summary(filenames, keys="power", directory=directory,
+                                                                merge=True)
+    values = np.concatenate(parts)
+    assert merged["power"]["count"] == len(values)
+    assert merged["power"]["min"] == values.min()
+    assert merged["power"]["max"] == values.max()
+    # the merged sketch is close to the quantiles of all of the values
+    assert np.allclose(merged["power"]["quantiles"][1:-1],
+                np.quantile(values, summary_probabilities[1:-1]), atol=0.2)
+
+def test_stale_summary_rebuilt(tmp_path):
+    directory = str(tmp_path)
+    save_data("run", {"power" : [1.0, 2.0]}, directory=directory, summary=True)
+    # replaced without a summary
+    save_data("run", {"power" : [5.0, 6.0, 7.0]}, directory=directory)
+
+    summary = load_summary("run", directory=directory)["power"]
+    assert summary["count"] == 3 and summary["max"] == 7.0
+
+def test_summary_limits():
+    summary = summarise_item(np.linspace(1.0, 1000.0, 1000))
+    lower, upper = summary_limits(summary, margin=0.1)
+    assert np.isclose(lower, 1.0 - 99.9) and np.isclose(upper, 1000.0 + 99.9)
+
+    lower, upper = summary_limits(summary, log=True, margin=0.0)
+    assert np.isclose(lower, 1.0) and np.isclose(upper, 1000.0)
+
+    with pytest.raises(Exception):
+        summary_limits(summarise_item([np.nan]))
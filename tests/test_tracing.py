@@ -0,0 +1,67 @@
+# Tests of tracing
+
+import json
+
+import pytest
+from matplotlib.texmanager import TexManager
+
+import sciscripttools
+from sciscripttools import io, plot, load_item, trace, span
+from sciscripttools.tracing import trace_events
+
+def snapshot():
+    return {"load_data" : (io.load_data, sciscripttools.load_data),
+            "iter_data" : io.iter_data,
+            "standard_figure" : vars(plot.standard_figure)["__init__"],
+            "make_dvi" : vars(TexManager)["make_dvi"]}
+
+def test_patch_and_restore(tmp_path):
+    before = snapshot()
+    filename = str(tmp_path / "trace.json")
+
+    with trace(filename):
+        # wrapped, where defined and where imported
+        assert io.load_data is not before["load_data"][0]
+        assert sciscripttools.load_data is io.load_data
+        assert vars(TexManager)["make_dvi"] is not before["make_dvi"]
+
+        # through the package, names imported before tracing are not wrapped
+        sciscripttools.save_data("run", {"power" : [1, 2, 3]}, 
+                                                directory=str(tmp_path))
+        assert sciscripttools.load_item("run", keys="power", 
+                                        directory=str(tmp_path)) == [1, 2, 3]
+        assert len(list(sciscripttools.iter_data("run", 
+                                        directory=str(tmp_path)))) == 1
+        with span("analysis"):
+            pass
+
+    assert snapshot() == before
+
+    with open(filename) as f:
+        events = json.load(f)["traceEvents"]
+    names = [e["name"] for e in events if e["ph"] == "X"]
+    for name in ["save_data", "load_item", "load_data", "iter_data", "analysis"]:
+        assert name in names
+    spans = [e for e in events if e["ph"] == "X"]
+    assert all(e["dur"] >= 0 for e in spans)
+
+    # nothing recorded once restored
+    count = len(trace_events())
+    load_item("run", keys="power", directory=str(tmp_path))
+    assert len(trace_events()) == count
+
+def test_restore_after_error(tmp_path):
+    before = snapshot()
+    with pytest.raises(ValueError):
+        with trace():
+            with span("failing"):
+                raise ValueError("failed")
+    assert snapshot() == before
+
+    failing = [e for e in trace_events() if e["name"] == "failing"]
+    assert "ValueError" in failing[0]["args"]["error"]
+
+    # can be enabled again
+    with trace():
+        pass
+    assert snapshot() == before